@@ -1,21 +1,197 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
 import json
 import hashlib
+import os
 from datetime import datetime, timedelta
 
-from db.models import get_db, WeatherData, TideData, User
-from services.unified_data_service import UnifiedDataService
+from db.models import get_db, SessionLocal, WeatherData, TideData, User
+from services.async_unified_data_service import AsyncUnifiedDataService
 from services.simple_alert_service import SimpleAlertService
 from services.flood_prediction_service import FloodPredictionService
+from services.tide_service import TideService
+from services.single_flight import SingleFlight
+from services.prefetch_scheduler import PrefetchScheduler
+from services.retrain_jobs import RetrainJobManager
+from services.flood_forecast_service import FloodForecastService
+from services.scenario_engine import ScenarioEngine
+from services.flood_sweep_service import FloodSweepService
 
 router = APIRouter(prefix="/api", tags=["coastal-threats"])
 
 # Initialize simplified services
-data_service = UnifiedDataService()
-alert_service = SimpleAlertService()
+data_service = AsyncUnifiedDataService()
 flood_predictor = FloodPredictionService()
+alert_service = SimpleAlertService(flood_predictor=flood_predictor)
+tide_service = TideService(data_service.tide_series, data_service.station_catalog, data_service.tide_engine)
+
+flood_forecaster = FloodForecastService(flood_predictor, data_service.tide_engine)
+flood_sweeper = FloodSweepService(flood_predictor)
+
+# Monte Carlo storm scenarios, scored by a process pool (shut down from main.shutdown_event)
+scenario_engine = ScenarioEngine(flood_predictor, data_service.tide_engine)
+
+# Flood model retraining runs in a worker process (shut down from main.shutdown_event)
+retrain_jobs = RetrainJobManager(flood_predictor)
+
+# Concurrent identical location requests share one in-flight computation
+request_coalescer = SingleFlight()
+
+# Upper bound on locations accepted by /data/batch
+BATCH_MAX_LOCATIONS = int(os.getenv("BATCH_MAX_LOCATIONS", "50"))
+
+class BatchDataRequest(BaseModel):
+    locations: List[str]
+
+# Upper bound on condition sets accepted by /flood-prediction/batch
+FLOOD_BATCH_MAX_ROWS = int(os.getenv("FLOOD_BATCH_MAX_ROWS", "10000"))
+
+class FloodConditions(BaseModel):
+    weather: Dict = {}
+    tide: Dict = {}
+    ocean: Dict = {}
+
+class FloodBatchRequest(BaseModel):
+    conditions: List[FloodConditions] = []
+    locations: List[str] = []
+
+class ScenarioRequest(BaseModel):
+    locations: List[str] = ["kandla"]
+    samples: int = 10000
+    profile: Dict[str, float] = {}
+    window_hours: float = 24
+    seed: Optional[int] = None
+
+def _location_key(location: str) -> str:
+    """Normalize a location path parameter for request coalescing"""
+    return " ".join(location.lower().split())
+
+async def _get_comprehensive_data(location: str) -> Dict:
+    """Comprehensive data for a location, shared by concurrent identical requests"""
+    comprehensive_data, _ = await request_coalescer.do(
+        ("comprehensive", _location_key(location)), data_service.get_comprehensive_data, location
+    )
+    return comprehensive_data
+
+def _add_readings(db: Session, comprehensive_data: Dict):
+    """Add the weather and tide readings of one location to the session"""
+    if comprehensive_data.get("weather"):
+        weather_data_filtered = {k: v for k, v in comprehensive_data["weather"].items() 
+                               if k in ["timestamp", "location", "temperature", "humidity", 
+                                       "wind_speed", "wind_direction", "pressure", "description", "source"]}
+        weather_db = WeatherData(**weather_data_filtered)
+        db.add(weather_db)
+    
+    if comprehensive_data.get("tide"):
+        tide_data_filtered = {k: v for k, v in comprehensive_data["tide"].items() 
+                            if k in ["timestamp", "location", "tide_height", "tide_type", "source"]}
+        tide_db = TideData(**tide_data_filtered)
+        db.add(tide_db)
+
+def _store_prefetched_readings(entries: List[Dict]):
+    """Persist the readings of one prefetch cycle in a single transaction"""
+    db = SessionLocal()
+    try:
+        for entry in entries:
+            _add_readings(db, entry["data"])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# Keeps an in-memory snapshot of every registered coastal city (started from main.startup_event)
+prefetch_scheduler = PrefetchScheduler(
+    data_service, alert_service, flood_predictor, on_cycle=_store_prefetched_readings
+)
+
+def _live_freshness() -> Dict:
+    """Freshness metadata for data computed on demand"""
+    return {"served_from": "live", "refreshed_at": datetime.utcnow().isoformat(), "age_seconds": 0.0}
+
+async def _compute_location_data(location: str):
+    """Fetch data for a location and generate its alerts"""
+    snapshot = prefetch_scheduler.get(location)
+    if snapshot is not None:
+        return snapshot["data"], snapshot["alerts"], prefetch_scheduler.freshness(snapshot)
+    
+    comprehensive_data = await _get_comprehensive_data(location)
+    
+    # Generate alerts based on the data
+    alerts = alert_service.generate_alerts_from_data(
+        comprehensive_data.get("weather"),
+        comprehensive_data.get("tide"),
+        comprehensive_data.get("ocean"),
+        comprehensive_data.get("pollution")
+    )
+    return comprehensive_data, alerts, _live_freshness()
+
+async def _compute_flood_prediction(location: str):
+    """Fetch data for a location and run the AI flood prediction on it"""
+    snapshot = prefetch_scheduler.get(location)
+    if snapshot is not None:
+        return snapshot["data"], snapshot["flood_prediction"], prefetch_scheduler.freshness(snapshot)
+    
+    comprehensive_data = await _get_comprehensive_data(location)
+    
+    flood_prediction = flood_predictor.predict_flood(
+        comprehensive_data.get("weather", {}),
+        comprehensive_data.get("tide", {}),
+        comprehensive_data.get("ocean", {})
+    )
+    return comprehensive_data, flood_prediction, _live_freshness()
+
+def _snapshot_prediction(location: str, freshness: Dict) -> Optional[Dict]:
+    """Flood prediction of the snapshot a location's data was served from, if any"""
+    if freshness["served_from"] != "prefetch_snapshot":
+        return None
+    snapshot = prefetch_scheduler.get(location)
+    return snapshot["flood_prediction"] if snapshot is not None else None
+
+def _flood_conditions(comprehensive_data: Dict) -> Dict:
+    """Model inputs of one location for predict_flood_batch"""
+    return {
+        "weather": comprehensive_data.get("weather") or {},
+        "tide": comprehensive_data.get("tide") or {},
+        "ocean": comprehensive_data.get("ocean") or {}
+    }
+
+async def _forecast_site(location: str) -> Dict:
+    """Current conditions and harmonic tide gauge of a location, as a FloodForecastService site"""
+    (comprehensive_data, _, freshness), _ = await request_coalescer.do(
+        ("data", _location_key(location)), _compute_location_data, location
+    )
+    location_info = await data_service.get_location_info(location)
+    return {
+        "location": location,
+        "city_name": comprehensive_data.get("city_name", location),
+        "conditions": _flood_conditions(comprehensive_data),
+        "station_id": data_service.nearest_harmonic_station(location_info),
+        "data_freshness": freshness
+    }
+
+async def _scenario_site(location: str) -> Dict:
+    """Resolved location and harmonic tide gauge for a ScenarioEngine run"""
+    location_info = await data_service.get_location_info(location)
+    if location_info.get("lat") is None:
+        raise HTTPException(status_code=404, detail=f"Location {location} not found")
+    return {
+        "location": location,
+        "city_name": location_info.get("name", location),
+        "station_id": data_service.nearest_harmonic_station(location_info)
+    }
+
+def _unique_locations(locations: List[str]) -> List[str]:
+    """Drop blanks and duplicates from a list of locations, keeping the requested order"""
+    unique_locations = {}
+    for location in locations:
+        if location.strip():
+            unique_locations.setdefault(_location_key(location), location.strip())
+    return list(unique_locations.values())
 
 # Authentication routes
 @router.post("/auth/register")
@@ -142,9 +318,19 @@ async def root():
                 "users": "/api/auth/users - Get all users"
             },
             "data": "/api/data/{location} - Get coastal data for specific Gujarat location",
+            "data_batch": "/api/data/batch - Get data, alerts and flood predictions for several locations (POST)",
             "locations": "/api/locations - Get available Gujarat coastal cities",
+            "location_search": "/api/locations/search?q= - Autocomplete Gujarat coastal place names",
+            "tide_stations": "/api/tides/stations?location= - Tide gauges near a location",
+            "tide_extremes": "/api/tides/{location}/extremes?days=N - High/low water times ('all' for every station)",
             "alerts": "/api/alerts - Get active alerts",
             "flood_prediction": "/api/flood-prediction/{location} - Get AI flood prediction for location",
+            "flood_forecast": "/api/flood-prediction/{location}/forecast?hours=N - Hourly flood risk timeline and peak ('all' for every city)",
+            "flood_sweep": "/api/flood-prediction/{location}/sweep?x=tide_height&y=wind_speed - Flood risk over a feature grid with risk threshold crossings",
+            "flood_prediction_batch": "/api/flood-prediction/batch - Score many condition sets or locations in one model call (POST)",
+            "flood_model_retrain": "/api/flood-prediction/model/retrain - Start background retraining (POST); poll /retrain/{job_id}",
+            "scenario": "/api/simulate/scenario - Monte Carlo storm what-if: flood risk percentiles per location (POST)",
+            "cache": "/api/cache/stats - Provider, geocoding and flood prediction cache statistics",
             "health": "/api/health - System health check"
         }
     }
@@ -156,32 +342,16 @@ async def get_data_for_location(
 ):
     """Get comprehensive coastal data for ANY specific location"""
     try:
-        # Get comprehensive data from unified service
-        comprehensive_data = data_service.get_comprehensive_data(location)
-        
-        # Generate alerts based on the data
-        alerts = alert_service.generate_alerts_from_data(
-            comprehensive_data.get("weather"),
-            comprehensive_data.get("tide"),
-            comprehensive_data.get("ocean"),
-            comprehensive_data.get("pollution")
+        # Get comprehensive data and alerts, joining an identical in-flight request if any
+        (comprehensive_data, alerts, freshness), shared = await request_coalescer.do(
+            ("data", _location_key(location)), _compute_location_data, location
         )
         
-        # Store weather and tide data in database
-        if comprehensive_data.get("weather"):
-            weather_data_filtered = {k: v for k, v in comprehensive_data["weather"].items() 
-                                   if k in ["timestamp", "location", "temperature", "humidity", 
-                                           "wind_speed", "wind_direction", "pressure", "description", "source"]}
-            weather_db = WeatherData(**weather_data_filtered)
-            db.add(weather_db)
-        
-        if comprehensive_data.get("tide"):
-            tide_data_filtered = {k: v for k, v in comprehensive_data["tide"].items() 
-                                if k in ["timestamp", "location", "tide_height", "tide_type", "source"]}
-            tide_db = TideData(**tide_data_filtered)
-            db.add(tide_db)
-        
-        db.commit()
+        # Store weather and tide data in database (once per shared computation;
+        # prefetched snapshots are persisted by the scheduler)
+        if not shared and freshness["served_from"] == "live":
+            _add_readings(db, comprehensive_data)
+            db.commit()
         
         return {
             "status": "success",
@@ -192,12 +362,84 @@ async def get_data_for_location(
             "timezone": comprehensive_data["timezone"],
             "data": comprehensive_data,
             "alerts_generated": len(alerts),
+            "data_freshness": freshness,
             "source": "unified_data_service"
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data for location {location}: {str(e)}")
 
+@router.post("/data/batch")
+async def get_data_for_locations(
+    request: BatchDataRequest,
+    db: Session = Depends(get_db)
+):
+    """Get comprehensive data, alerts and flood predictions for several locations in one call"""
+    locations = _unique_locations(request.locations)
+    if not locations:
+        raise HTTPException(status_code=400, detail="At least one location is required")
+    if len(locations) > BATCH_MAX_LOCATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_LOCATIONS} locations per batch")
+    
+    # Fetch all locations concurrently; each joins identical in-flight requests, including
+    # single-location /data requests for the same place
+    outcomes = await asyncio.gather(
+        *[request_coalescer.do(("data", _location_key(location)), _compute_location_data, location)
+          for location in locations],
+        return_exceptions=True
+    )
+    
+    results = []
+    try:
+        # Locations without a snapshot prediction are scored together in one model call
+        snapshot_predictions = [
+            None if isinstance(outcome, Exception) else _snapshot_prediction(location, outcome[0][2])
+            for location, outcome in zip(locations, outcomes)
+        ]
+        live_predictions = iter(flood_predictor.predict_flood_batch([
+            _flood_conditions(outcome[0][0])
+            for outcome, prediction in zip(outcomes, snapshot_predictions)
+            if not isinstance(outcome, Exception) and prediction is None
+        ]))
+        
+        for location, outcome, flood_prediction in zip(locations, outcomes, snapshot_predictions):
+            if isinstance(outcome, Exception):
+                results.append({"location": location, "status": "error", "error": str(outcome)})
+                continue
+            
+            (comprehensive_data, alerts, freshness), shared = outcome
+            if flood_prediction is None:
+                flood_prediction = next(live_predictions)
+            if not shared and freshness["served_from"] == "live":
+                _add_readings(db, comprehensive_data)
+            
+            results.append({
+                "location": location,
+                "status": "success",
+                "city_name": comprehensive_data.get("city_name", location),
+                "data": comprehensive_data,
+                "alerts": alerts,
+                "alerts_generated": len(alerts),
+                "flood_prediction": flood_prediction,
+                "data_freshness": freshness
+            })
+        
+        # Readings of every location go to the database in a single transaction
+        db.commit()
+        
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing batch data: {str(e)}")
+    
+    return {
+        "status": "success",
+        "timestamp": datetime.utcnow().isoformat(),
+        "total_locations": len(locations),
+        "successful": sum(1 for result in results if result["status"] == "success"),
+        "results": results,
+        "source": "unified_data_service"
+    }
+
 @router.get("/locations")
 async def get_available_locations():
     """Get list of available Gujarat coastal locations"""
@@ -210,6 +452,76 @@ async def get_available_locations():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching locations: {str(e)}")
 
+@router.get("/locations/search")
+async def search_locations(q: str, limit: int = 10):
+    """Autocomplete coastal Gujarat locations from the offline gazetteer"""
+    try:
+        limit = max(1, min(limit, 50))
+        results = data_service.search_locations(q, limit)
+        return {
+            "status": "success",
+            "query": q,
+            "results": results,
+            "total_results": len(results),
+            "source": "gazetteer"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching locations: {str(e)}")
+
+@router.get("/tides/stations")
+async def get_tide_stations(location: str, radius_km: float = None, limit: int = 10):
+    """Get tide gauges near a location from the station catalog"""
+    try:
+        location_info = await data_service.get_location_info(location)
+        if location_info.get("lat") is None:
+            raise HTTPException(status_code=404, detail=f"Location {location} not found")
+        
+        stations = data_service.get_nearest_tide_stations(
+            location_info["lat"], location_info["lon"], radius_km, max(1, min(limit, 100))
+        )
+        return {
+            "status": "success",
+            "location": location_info["name"],
+            "radius_km": radius_km or data_service.tide_station_max_km,
+            "stations": stations,
+            "total_stations": len(stations)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding tide stations: {str(e)}")
+
+@router.get("/tides/{location}/extremes")
+async def get_tide_extremes(location: str, days: float = 1):
+    """Get high/low water times and heights for a location, or every tide station with 'all'"""
+    try:
+        if not 0 < days <= 31:
+            raise HTTPException(status_code=400, detail="days must be between 0 and 31")
+        
+        if location.lower() == "all":
+            station_ids = None
+        else:
+            location_info = await data_service.get_location_info(location)
+            station_id = data_service.nearest_harmonic_station(location_info)
+            if station_id is None:
+                raise HTTPException(status_code=404, detail=f"No tide station with harmonic constants near {location}")
+            station_ids = [station_id]
+        
+        stations = tide_service.get_tide_extremes(station_ids, days)
+        return {
+            "status": "success",
+            "location": location,
+            "days": days,
+            "stations": stations,
+            "total_stations": len(stations),
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "harmonic_prediction"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing tide extremes: {str(e)}")
+
 @router.get("/alerts")
 async def get_alerts():
     """Get currently active alerts"""
@@ -242,24 +554,44 @@ async def deactivate_alert(alert_id: str):
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
+    providers = data_service.get_provider_status()
+    # Open breakers mean some data is being simulated instead of fetched
+    degraded = any(status["state"] != "closed" for status in providers.values())
     return {
         "status": "healthy",
         "service": "Gujarat Coastal Threat Alert System",
         "version": "2.0.0",
         "timestamp": datetime.utcnow().isoformat(),
         "components": {
-            "data_service": "operational",
+            "data_service": "degraded" if degraded else "operational",
             "alert_service": "operational",
             "database": "operational"
-        }
+        },
+        "providers": providers,
+        "prefetch_scheduler": prefetch_scheduler.get_status()
     }
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get provider/geocoding cache, request coalescing and prediction cache counters"""
+    try:
+        return {
+            "status": "success",
+            "cache": data_service.get_cache_stats(),
+            "request_coalescing": request_coalescer.get_stats(),
+            "prediction_cache": (flood_predictor.prediction_cache.get_stats()
+                                 if flood_predictor.prediction_cache is not None else None),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting cache stats: {str(e)}")
+
 @router.get("/demo/{location}")
 async def get_demo_data(location: str):
     """Get demo data for presentation purposes"""
     try:
         # Get comprehensive data
-        data = data_service.get_comprehensive_data(location)
+        data = await _get_comprehensive_data(location)
         
         # Add some demo alerts
         demo_alerts = [
@@ -305,14 +637,9 @@ async def get_ml_system_info():
 async def get_flood_prediction(location: str):
     """Get AI-powered flood prediction for a specific location"""
     try:
-        # Get current data for the location
-        comprehensive_data = data_service.get_comprehensive_data(location)
-        
-        # Make flood prediction using AI
-        flood_prediction = flood_predictor.predict_flood(
-            comprehensive_data.get("weather", {}),
-            comprehensive_data.get("tide", {}),
-            comprehensive_data.get("ocean", {})
+        # Get current data and the AI flood prediction, joining an identical in-flight request if any
+        (comprehensive_data, flood_prediction, freshness), _ = await request_coalescer.do(
+            ("flood", _location_key(location)), _compute_flood_prediction, location
         )
         
         return {
@@ -325,6 +652,7 @@ async def get_flood_prediction(location: str):
                 "tide": comprehensive_data.get("tide", {}),
                 "ocean": comprehensive_data.get("ocean", {})
             },
+            "data_freshness": freshness,
             "timestamp": datetime.utcnow().isoformat(),
             "source": "ai_flood_prediction_service"
         }
@@ -332,6 +660,182 @@ async def get_flood_prediction(location: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting flood prediction: {str(e)}")
 
+@router.get("/flood-prediction/{location}/forecast")
+async def get_flood_forecast(location: str, hours: int = 24):
+    """Get an hourly flood probability timeline and the time of peak risk, or for every coastal city with 'all'"""
+    if not 1 <= hours <= flood_forecaster.max_hours:
+        raise HTTPException(status_code=400, detail=f"hours must be between 1 and {flood_forecaster.max_hours}")
+    
+    try:
+        if location.lower() == "all":
+            locations = list(data_service.coastal_cities)
+        else:
+            locations = [location]
+        sites = await asyncio.gather(*[_forecast_site(name) for name in locations])
+        
+        result = flood_forecaster.forecast(sites, hours)
+        for site, forecast in zip(sites, result["forecasts"]):
+            forecast["data_freshness"] = site["data_freshness"]
+        
+        return {
+            "status": "success",
+            "location": location,
+            **result,
+            "total_locations": len(result["forecasts"]),
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "ai_flood_forecast"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting flood forecast: {str(e)}")
+
+@router.get("/flood-prediction/{location}/sweep")
+async def get_flood_sweep(
+    location: str,
+    x: str = "tide_height",
+    x_min: Optional[float] = None,
+    x_max: Optional[float] = None,
+    x_steps: int = 50,
+    y: Optional[str] = None,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+    y_steps: int = 25
+):
+    """
+    Vary one or two features over a grid around the current conditions of a location
+    Returns the flood probability curve (or surface) and where it crosses each risk threshold
+    """
+    try:
+        (comprehensive_data, _, freshness), _ = await request_coalescer.do(
+            ("data", _location_key(location)), _compute_location_data, location
+        )
+        sweep = flood_sweeper.sweep(
+            _flood_conditions(comprehensive_data), x, x_min, x_max, x_steps, y, y_min, y_max, y_steps
+        )
+        
+        return {
+            "status": "success",
+            "location": location,
+            "city_name": comprehensive_data.get("city_name", location),
+            **sweep,
+            "data_freshness": freshness,
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "ai_flood_prediction_service"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing flood sweep: {str(e)}")
+
+@router.post("/flood-prediction/batch")
+async def get_flood_predictions_batch(request: FloodBatchRequest):
+    """
+    Score many condition sets (and/or locations) with one vectorized model call
+    Condition sets are scored as given; locations are resolved to their current conditions first
+    """
+    locations = _unique_locations(request.locations)
+    if not request.conditions and not locations:
+        raise HTTPException(status_code=400, detail="At least one condition set or location is required")
+    if len(request.conditions) > FLOOD_BATCH_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {FLOOD_BATCH_MAX_ROWS} condition sets per batch")
+    if len(locations) > BATCH_MAX_LOCATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_LOCATIONS} locations per batch")
+    
+    try:
+        # Current conditions of every location, fetched concurrently (snapshot when available)
+        outcomes = await asyncio.gather(
+            *[request_coalescer.do(("data", _location_key(location)), _compute_location_data, location)
+              for location in locations],
+            return_exceptions=True
+        )
+        
+        rows = [
+            {"weather": conditions.weather, "tide": conditions.tide, "ocean": conditions.ocean}
+            for conditions in request.conditions
+        ]
+        location_rows = []
+        for location, outcome in zip(locations, outcomes):
+            if not isinstance(outcome, Exception):
+                location_rows.append(len(rows))
+                rows.append(_flood_conditions(outcome[0][0]))
+            else:
+                location_rows.append(None)
+        
+        predictions = flood_predictor.predict_flood_batch(rows)
+        
+        location_results = []
+        for location, outcome, row in zip(locations, outcomes, location_rows):
+            if row is None:
+                location_results.append({"location": location, "status": "error", "error": str(outcome)})
+                continue
+            comprehensive_data, _, freshness = outcome[0]
+            location_results.append({
+                "location": location,
+                "status": "success",
+                "city_name": comprehensive_data.get("city_name", location),
+                "flood_prediction": predictions[row],
+                "data_freshness": freshness
+            })
+        
+        return {
+            "status": "success",
+            "predictions": [
+                {"index": index, **prediction}
+                for index, prediction in enumerate(predictions[:len(request.conditions)])
+            ],
+            "locations": location_results,
+            "total_scored": len(predictions),
+            "model_version": flood_predictor.registry.get_info()["model_version"],
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "ai_flood_prediction_service"
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting batch flood predictions: {str(e)}")
+
+@router.post("/simulate/scenario")
+async def simulate_scenario(request: ScenarioRequest):
+    """
+    Monte Carlo what-if analysis of a storm profile
+    Draws `samples` perturbed condition sets per location and returns flood risk percentiles,
+    risk level shares and threat severity distributions ('all' in locations = every coastal city)
+    """
+    locations = _unique_locations(request.locations)
+    if any(location.lower() == "all" for location in locations):
+        locations = list(data_service.coastal_cities)
+    if not locations:
+        raise HTTPException(status_code=400, detail="At least one location is required")
+    if len(locations) > BATCH_MAX_LOCATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_LOCATIONS} locations per scenario")
+    if not 0 < request.window_hours <= 168:
+        raise HTTPException(status_code=400, detail="window_hours must be between 0 and 168")
+    
+    try:
+        sites = await asyncio.gather(*[_scenario_site(location) for location in locations])
+        
+        # CPU-bound: keep the event loop free while the samples are scored
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None, scenario_engine.run, sites, request.samples, request.profile, request.window_hours, request.seed
+        )
+        
+        return {
+            "status": "success",
+            **result,
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "monte_carlo_scenario_engine"
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error simulating scenario: {str(e)}")
+
 @router.get("/flood-prediction/model/info")
 async def get_flood_model_info():
     """Get information about the trained flood prediction model"""
@@ -346,16 +850,31 @@ async def get_flood_model_info():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting model info: {str(e)}")
 
-@router.post("/flood-prediction/model/retrain")
+@router.post("/flood-prediction/model/retrain", status_code=202)
 async def retrain_flood_model():
-    """Retrain the flood prediction model with current data"""
+    """Start retraining the flood prediction model in the background; poll the returned job"""
     try:
-        result = flood_predictor.retrain_model()
+        job = retrain_jobs.submit()
         return {
-            "status": "success",
-            "retraining_result": result,
-            "message": "Flood prediction model retraining initiated",
+            "status": "accepted",
+            "job": job,
+            "status_url": f"/api/flood-prediction/model/retrain/{job['job_id']}",
+            "message": ("Flood prediction model retraining already in progress" if job.get("already_running")
+                        else "Flood prediction model retraining initiated"),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retraining model: {str(e)}")
+
+@router.get("/flood-prediction/model/retrain/{job_id}")
+async def get_retrain_job(job_id: str):
+    """Get stage, progress, metrics and validation result of a retraining job"""
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Retraining job {job_id} not found")
+    return {
+        "status": "success",
+        "job": job,
+        "serving_model": flood_predictor.registry.get_info(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
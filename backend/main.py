@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router
+from api.routes import router, data_service, prefetch_scheduler, retrain_jobs, scenario_engine
 from db.models import create_tables
 import uvicorn
 
@@ -29,6 +29,7 @@ async def startup_event():
     print("🚀 Starting Coastal Threat Alert System...")
     create_tables()
     print("✅ Database tables created")
+    await prefetch_scheduler.start()
     print("✅ Services initialized")
     print("✅ Ready to receive requests")
 
@@ -36,6 +37,10 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("🛑 Shutting down Coastal Threat Alert System...")
+    await prefetch_scheduler.stop()
+    await data_service.aclose()
+    retrain_jobs.shutdown()
+    scenario_engine.shutdown()
 
 if __name__ == "__main__":
     uvicorn.run(
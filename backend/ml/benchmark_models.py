@@ -0,0 +1,157 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import joblib
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from services.compiled_forest import CompiledForest
+from services.flood_training import RANDOM_STATE, load_training_sample
+from synthetic_flood_data import SyntheticFloodData
+
+# Candidate models; rf_100_d10 is the production configuration
+CANDIDATES = {
+    "rf_25_d8": lambda: RandomForestClassifier(n_estimators=25, max_depth=8, random_state=RANDOM_STATE, n_jobs=-1),
+    "rf_50_d10": lambda: RandomForestClassifier(n_estimators=50, max_depth=10, random_state=RANDOM_STATE, n_jobs=-1),
+    "rf_100_d10": lambda: RandomForestClassifier(n_estimators=100, max_depth=10, random_state=RANDOM_STATE, n_jobs=-1),
+    "rf_200_d14": lambda: RandomForestClassifier(n_estimators=200, max_depth=14, random_state=RANDOM_STATE, n_jobs=-1),
+    "hist_gb": lambda: HistGradientBoostingClassifier(max_iter=200, random_state=RANDOM_STATE),
+    "logistic": lambda: LogisticRegression(max_iter=1000)
+}
+
+COLUMNS = [
+    ("dataset", "{}"), ("model", "{}"), ("train_s", "{:.2f}"), ("size_kb", "{:,.0f}"),
+    ("accuracy", "{:.4f}"), ("roc_auc", "{:.4f}"), ("p50_ms", "{:.3f}"), ("p95_ms", "{:.3f}"),
+    ("rows_per_s", "{:,.0f}")
+]
+
+def _model_size(model) -> int:
+    """Bytes of the model as it would be stored with joblib"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+def _latency_ms(score: Callable[[np.ndarray], np.ndarray], rows: np.ndarray, calls: int) -> Dict:
+    """Median and p95 latency of scoring one row at a time"""
+    for row in rows[:5]:
+        score(row[np.newaxis, :])
+    timings = []
+    for index in range(calls):
+        row = rows[index % len(rows)][np.newaxis, :]
+        started = time.perf_counter()
+        score(row)
+        timings.append(time.perf_counter() - started)
+    return {"p50_ms": float(np.median(timings) * 1000), "p95_ms": float(np.percentile(timings, 95) * 1000)}
+
+def _throughput(score: Callable[[np.ndarray], np.ndarray], rows: np.ndarray, batch_rows: int) -> float:
+    """Rows per second when scoring one batch (best of three)"""
+    batch = np.resize(rows, (batch_rows, rows.shape[1]))
+    best = min(_timed(score, batch) for _ in range(3))
+    return batch_rows / best
+
+def _timed(score: Callable[[np.ndarray], np.ndarray], batch: np.ndarray) -> float:
+    started = time.perf_counter()
+    score(batch)
+    return time.perf_counter() - started
+
+def benchmark_dataset(csv_path: str, candidates: List[str], sample_rows: Optional[int] = None,
+                      calls: int = 200, batch_rows: int = 10000) -> List[Dict]:
+    """Train every candidate on one dataset and measure it on the holdout"""
+    dataset = os.path.basename(csv_path)
+    scaler, (X_train, y_train), (X_test, y_test), stats = load_training_sample(csv_path, sample_rows)
+    print(f"📊 {dataset}: {stats['total_rows']:,} rows, fitting on {len(y_train):,}, holdout {len(y_test):,}")
+    X_train_scaled = scaler.transform(X_train)
+    
+    results = []
+    for name in candidates:
+        model = CANDIDATES[name]()
+        started = time.perf_counter()
+        model.fit(X_train_scaled, y_train)
+        train_seconds = time.perf_counter() - started
+        
+        # Scored the way the service does: raw features in, flood probability out
+        scorers = {name: (lambda features, model=model: model.predict_proba(scaler.transform(features))[:, 1])}
+        sizes = {name: _model_size(model) + _model_size(scaler)}
+        if isinstance(model, RandomForestClassifier):
+            compiled = CompiledForest.from_sklearn(model, scaler)
+            scorers[f"{name}_compiled"] = compiled.predict_positive
+            sizes[f"{name}_compiled"] = sum(np.asarray(getattr(compiled, array)).nbytes for array in CompiledForest.ARRAYS)
+        
+        for label, score in scorers.items():
+            probabilities = score(X_test)
+            result = {
+                "dataset": dataset,
+                "model": label,
+                "train_s": train_seconds,
+                "size_kb": sizes[label] / 1024,
+                "accuracy": float(accuracy_score(y_test, probabilities >= 0.5)),
+                "roc_auc": float(roc_auc_score(y_test, probabilities)) if len(np.unique(y_test)) > 1 else float("nan"),
+                **_latency_ms(score, X_test, calls),
+                "rows_per_s": _throughput(score, X_test, batch_rows)
+            }
+            results.append(result)
+            print(f"   {label}: accuracy {result['accuracy']:.4f}, p50 {result['p50_ms']:.3f} ms")
+    return results
+
+def format_table(results: List[Dict]) -> str:
+    """Results as an aligned text table"""
+    cells = [[name for name, _ in COLUMNS]] + [
+        [template.format(result[name]) for name, template in COLUMNS] for result in results
+    ]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(COLUMNS))]
+    lines = []
+    for position, row in enumerate(cells):
+        lines.append("  ".join(
+            cell.ljust(width) if index < 2 else cell.rjust(width)
+            for index, (cell, width) in enumerate(zip(row, widths))
+        ))
+        if position == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare flood model candidates on accuracy, latency, throughput, training time and size")
+    parser.add_argument('--data', nargs='*', default=[os.path.join(BACKEND_DIR, 'flood_data_1000.csv')],
+                        help="CSV files to benchmark on (flood CSV schema)")
+    parser.add_argument('--synthetic-rows', nargs='*', type=int, default=[],
+                        help="also benchmark on synthetic datasets of these sizes (generated once into --workdir)")
+    parser.add_argument('--workdir', default='benchmark_data', help="where synthetic datasets are kept")
+    parser.add_argument('--models', nargs='*', choices=list(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument('--sample-rows', type=int, default=None, help="training sample size (TRAINING_SAMPLE_ROWS)")
+    parser.add_argument('--calls', type=int, default=200, help="single-row predictions timed per model")
+    parser.add_argument('--batch-rows', type=int, default=10000, help="rows per batch for throughput")
+    parser.add_argument('--json', default=None, help="also write the results to this JSON file")
+    args = parser.parse_args()
+    
+    datasets = list(args.data)
+    if args.synthetic_rows:
+        os.makedirs(args.workdir, exist_ok=True)
+        generator = SyntheticFloodData(os.path.join(BACKEND_DIR, 'flood_data_1000.csv'))
+        for rows in args.synthetic_rows:
+            path = os.path.join(args.workdir, f"flood_synthetic_{rows}.csv")
+            if not os.path.exists(path):
+                generator.write_csv(path, rows)
+            datasets.append(path)
+    
+    results = []
+    for csv_path in datasets:
+        results.extend(benchmark_dataset(csv_path, args.models, args.sample_rows, args.calls, args.batch_rows))
+    
+    print()
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
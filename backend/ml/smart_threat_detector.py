@@ -1,6 +1,6 @@
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import math
 
 class SmartThreatDetector:
@@ -25,6 +25,24 @@ class SmartThreatDetector:
             'normal': {'wind_multiplier': 1.0, 'tide_multiplier': 1.0}
         }
     
+    # Severity ranks used by the batch helpers (0 = no threat)
+    SEVERITY_RANKS = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+    
+    # Descriptions of the threshold threats, formatted with the reading
+    THREAT_DESCRIPTIONS = {
+        'wind_critical': "Critical wind speed: {} m/s. Immediate evacuation recommended.",
+        'wind_high': "High wind speed: {} m/s. Exercise extreme caution.",
+        'wind_medium': "Moderate wind speed: {} m/s. Stay alert.",
+        'tide_critical': "Critical tide height: {}m. Flooding risk extremely high.",
+        'tide_high': "High tide: {}m. Monitor coastal areas closely.",
+        'storm_critical': "Critical low pressure: {} hPa. Major storm system detected.",
+        'storm_high': "Low pressure system: {} hPa. Storm development likely."
+    }
+    
+    # Threat kind of the batch helpers and the reading it is detected from, in the
+    # order _basic_threshold_detection reports them
+    BATCH_KINDS = {'wind': 'wind_speed', 'tide': 'tide_height', 'storm': 'pressure'}
+    
     def detect_threats(self, current_data: Dict, historical_data: List[Dict] = None) -> List[Dict]:
         """
         Detect threats using smart ML with minimal data requirements
@@ -60,36 +78,154 @@ class SmartThreatDetector:
             wind_speed = data['wind_speed']
             if wind_speed > self.adaptive_thresholds['wind_speed']['critical']:
                 threats.append(self._create_threat('wind_critical', 'critical', data, 
-                    f"Critical wind speed: {wind_speed} m/s. Immediate evacuation recommended."))
+                    self.THREAT_DESCRIPTIONS['wind_critical'].format(wind_speed)))
             elif wind_speed > self.adaptive_thresholds['wind_speed']['high']:
                 threats.append(self._create_threat('wind_high', 'high', data,
-                    f"High wind speed: {wind_speed} m/s. Exercise extreme caution."))
+                    self.THREAT_DESCRIPTIONS['wind_high'].format(wind_speed)))
             elif wind_speed > self.adaptive_thresholds['wind_speed']['medium']:
                 threats.append(self._create_threat('wind_medium', 'medium', data,
-                    f"Moderate wind speed: {wind_speed} m/s. Stay alert."))
+                    self.THREAT_DESCRIPTIONS['wind_medium'].format(wind_speed)))
         
         # Tide height threats
         if 'tide_height' in data:
             tide_height = data['tide_height']
             if tide_height > self.adaptive_thresholds['tide_height']['critical']:
                 threats.append(self._create_threat('tide_critical', 'critical', data,
-                    f"Critical tide height: {tide_height}m. Flooding risk extremely high."))
+                    self.THREAT_DESCRIPTIONS['tide_critical'].format(tide_height)))
             elif tide_height > self.adaptive_thresholds['tide_height']['high']:
                 threats.append(self._create_threat('tide_high', 'high', data,
-                    f"High tide: {tide_height}m. Monitor coastal areas closely."))
+                    self.THREAT_DESCRIPTIONS['tide_high'].format(tide_height)))
         
         # Pressure-based storm detection
         if 'pressure' in data:
             pressure = data['pressure']
             if pressure < self.adaptive_thresholds['pressure']['critical']:
                 threats.append(self._create_threat('storm_critical', 'critical', data,
-                    f"Critical low pressure: {pressure} hPa. Major storm system detected."))
+                    self.THREAT_DESCRIPTIONS['storm_critical'].format(pressure)))
             elif pressure < self.adaptive_thresholds['pressure']['high']:
                 threats.append(self._create_threat('storm_high', 'high', data,
-                    f"Low pressure system: {pressure} hPa. Storm development likely."))
+                    self.THREAT_DESCRIPTIONS['storm_high'].format(pressure)))
+        
+        return threats
+    
+    def threat_levels_batch(self, columns: Dict[str, np.ndarray], location: str = '') -> Dict[str, np.ndarray]:
+        """
+        Vectorized threshold detection and seasonal adjustment for many readings at once
+        columns maps wind_speed / tide_height / pressure to arrays of readings; returns the
+        severity rank (0 = no threat, see SEVERITY_RANKS) of the wind, tide and storm
+        threat of every reading, the same severities detect_threats would report
+        """
+        levels = self._threshold_levels_batch(columns)
+        if self._determine_season(datetime.now().month, location) in ['monsoon', 'hurricane']:
+            levels = self._escalate_levels_batch(levels, np.ones(len(next(iter(levels.values()), [])), dtype=bool))
+        return levels
+    
+    def detect_threats_batch(self, columns: Dict[str, np.ndarray],
+                             locations: Optional[Union[str, Sequence[str]]] = None) -> List[List[Dict]]:
+        """
+        Threshold detection for many stations or timesteps at once
+        columns maps reading names (wind_speed, tide_height, pressure, temperature) to
+        arrays with one entry per row; NaN marks a missing reading. locations is one
+        location for every row or one per row. Returns the threats of every row, built
+        like detect_threats without history builds them (_create_threat shape,
+        seasonally adjusted severity); only rows with a threat cost Python work
+        """
+        n = len(next(iter(columns.values()), []))
+        threats = [[] for _ in range(n)]
+        basic = self._threshold_levels_batch(columns)
+        if not basic:
+            return threats
+        
+        rows = np.nonzero(np.maximum.reduce(list(basic.values())))[0]
+        basic = {kind: levels[rows] for kind, levels in basic.items()}
+        if isinstance(locations, str) or locations is None:
+            row_locations = [locations or ''] * len(rows)
+        else:
+            row_locations = np.asarray(locations)[rows].tolist()
+        
+        # Seasonal escalation is decided once per distinct location
+        month = datetime.now().month
+        seasons = {}
+        for location in row_locations:
+            if location not in seasons:
+                seasons[location] = self._determine_season(month, location) in ['monsoon', 'hurricane']
+        adjusted = self._escalate_levels_batch(basic, np.array([seasons[location] for location in row_locations], dtype=bool))
+        
+        # Data completeness per row, as _calculate_confidence counts it
+        data_fields = ['temperature', 'wind_speed', 'pressure', 'tide_height']
+        present = np.zeros(len(rows), dtype=np.int64)
+        for field in data_fields:
+            if field in columns:
+                present += ~np.isnan(np.asarray(columns[field], dtype=float)[rows])
+        present = present.tolist()
+        
+        severities = {rank: name for name, rank in self.SEVERITY_RANKS.items()}
+        timestamp = datetime.now().isoformat()
+        for kind, field in self.BATCH_KINDS.items():
+            if kind not in basic:
+                continue
+            hits = np.nonzero(basic[kind])[0]
+            readings = np.asarray(columns[field])[rows[hits]].tolist()
+            for hit, row, reading, rank, adjusted_rank in zip(
+                hits.tolist(), rows[hits].tolist(), readings, basic[kind][hits].tolist(), adjusted[kind][hits].tolist()
+            ):
+                severity = severities[rank]
+                threat_type = f"{kind}_{severity}"
+                threats[row].append({
+                    'type': threat_type,
+                    'severity': severities[adjusted_rank],
+                    'description': self.THREAT_DESCRIPTIONS[threat_type].format(reading),
+                    'location': row_locations[hit] or 'Unknown',
+                    'timestamp': timestamp,
+                    'data_source': 'smart_ml_detector',
+                    'confidence': self._severity_confidence(severity, present[hit] / len(data_fields))
+                })
         
         return threats
     
+    def _threshold_levels_batch(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Severity rank of every reading per threat kind, before seasonal adjustment"""
+        ranks = self.SEVERITY_RANKS
+        levels = {}
+        
+        if 'wind_speed' in columns:
+            wind_speed = np.asarray(columns['wind_speed'], dtype=float)
+            thresholds = self.adaptive_thresholds['wind_speed']
+            levels['wind'] = np.select(
+                [wind_speed > thresholds['critical'], wind_speed > thresholds['high'], wind_speed > thresholds['medium']],
+                [ranks['critical'], ranks['high'], ranks['medium']], 0
+            ).astype(np.int8)
+        
+        if 'tide_height' in columns:
+            tide_height = np.asarray(columns['tide_height'], dtype=float)
+            thresholds = self.adaptive_thresholds['tide_height']
+            levels['tide'] = np.select(
+                [tide_height > thresholds['critical'], tide_height > thresholds['high']],
+                [ranks['critical'], ranks['high']], 0
+            ).astype(np.int8)
+        
+        if 'pressure' in columns:
+            pressure = np.asarray(columns['pressure'], dtype=float)
+            thresholds = self.adaptive_thresholds['pressure']
+            levels['storm'] = np.select(
+                [pressure < thresholds['critical'], pressure < thresholds['high']],
+                [ranks['critical'], ranks['high']], 0
+            ).astype(np.int8)
+        
+        return levels
+    
+    def _escalate_levels_batch(self, levels: Dict[str, np.ndarray], seasonal: np.ndarray) -> Dict[str, np.ndarray]:
+        """Same escalation as _apply_seasonal_factors, for the rows where seasonal is set"""
+        ranks = self.SEVERITY_RANKS
+        escalated = dict(levels)
+        if 'wind' in levels:
+            escalate = seasonal & ((levels['wind'] == ranks['medium']) | (levels['wind'] == ranks['high']))
+            escalated['wind'] = levels['wind'] + escalate.astype(np.int8)
+        if 'tide' in levels:
+            escalate = seasonal & ((levels['tide'] == ranks['low']) | (levels['tide'] == ranks['medium']))
+            escalated['tide'] = levels['tide'] + escalate.astype(np.int8)
+        return escalated
+    
     def _detect_anomalies(self, current: Dict, historical: List[Dict]) -> List[Dict]:
         """
         Detect anomalies using statistical analysis
@@ -231,6 +367,14 @@ class SmartThreatDetector:
     
     def _calculate_confidence(self, severity: str, data: Dict) -> float:
         """Calculate confidence level based on data quality and severity"""
+        # Adjust confidence based on data completeness
+        data_fields = ['temperature', 'wind_speed', 'pressure', 'tide_height']
+        completeness = sum(1 for field in data_fields if field in data) / len(data_fields)
+        
+        return self._severity_confidence(severity, completeness)
+    
+    def _severity_confidence(self, severity: str, completeness: float) -> float:
+        """Confidence of a threat of the given severity from data of the given completeness (0-1)"""
         base_confidence = 0.8
         
         # Higher confidence for more severe threats
@@ -241,10 +385,6 @@ class SmartThreatDetector:
             'critical': 0.95
         }
         
-        # Adjust confidence based on data completeness
-        data_fields = ['temperature', 'wind_speed', 'pressure', 'tide_height']
-        completeness = sum(1 for field in data_fields if field in data) / len(data_fields)
-        
         return min(0.99, base_confidence * severity_multiplier.get(severity, 0.8) * completeness)
     
     def get_ml_stats(self) -> Dict:
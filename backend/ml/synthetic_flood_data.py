@@ -0,0 +1,135 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = [
+    'Temperature (°C)', 'Humidity (%)', 'Wind Speed (km/h)',
+    'Pressure (hPa)', 'Tide Height (m)', 'Ocean Wave Height (m)'
+]
+EVENT_COLUMNS = ['Duration of Flood (days)', 'Flood Magnitude', 'Area Covered (sq km)']
+TARGET_COLUMN = 'Flood Occurred'
+
+# Decimals each feature is recorded with in the seed CSV
+FEATURE_DECIMALS = [1, 0, 0, 0, 2, 2]
+
+class SyntheticFloodData:
+    """
+    Synthetic flood observations in the schema of flood_data_1000.csv
+    Learns the seed data once (flood rate, per-class mean and covariance of the
+    weather/tide/ocean features, city frequencies, flood event sizes) and then draws
+    any number of rows chunk by chunk, so 10M+ row files can be written with
+    bounded memory for training benchmarks
+    """
+    
+    def __init__(self, seed_csv: str, random_state: int = 0):
+        seed = pd.read_csv(seed_csv)
+        self.columns = list(seed.columns)
+        self.rng = np.random.default_rng(random_state)
+        
+        flooded = seed[TARGET_COLUMN].to_numpy(dtype=bool)
+        self.flood_rate = float(flooded.mean())
+        features = seed[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        self.feature_min = features.min(axis=0)
+        self.feature_max = features.max(axis=0)
+        self.class_stats = {
+            label: (features[flooded == label].mean(axis=0), np.cov(features[flooded == label], rowvar=False))
+            for label in (False, True)
+        }
+        
+        cities = seed.groupby('City').agg(Lat=('Lat', 'first'), Long=('Long', 'first'), rows=('City', 'size'))
+        self.cities = cities.index.to_numpy()
+        self.city_coords = cities[['Lat', 'Long']].to_numpy()
+        self.city_weights = (cities['rows'] / cities['rows'].sum()).to_numpy()
+        
+        # Event sizes are drawn as whole rows so duration, magnitude and area stay consistent
+        self.flood_events = seed.loc[flooded, EVENT_COLUMNS].reset_index(drop=True)
+    
+    def chunk(self, start: int, rows: int) -> pd.DataFrame:
+        """Rows start .. start + rows - 1 (names continue the FloodEvent_N numbering)"""
+        flooded = self.rng.random(rows) < self.flood_rate
+        features = np.empty((rows, len(FEATURE_COLUMNS)))
+        for label in (False, True):
+            mask = flooded == label
+            mean, cov = self.class_stats[label]
+            features[mask] = self.rng.multivariate_normal(mean, cov, size=int(mask.sum()), method='cholesky')
+        features = np.clip(features, self.feature_min, self.feature_max)
+        
+        city = self.rng.choice(len(self.cities), size=rows, p=self.city_weights)
+        picks = self.rng.integers(0, len(self.flood_events), size=int(flooded.sum()))
+        events = {}
+        for column in EVENT_COLUMNS:
+            observed = self.flood_events[column].to_numpy()
+            values = np.zeros(rows, dtype=observed.dtype)
+            values[flooded] = observed[picks]
+            events[column] = values
+        
+        data = {
+            'Name': 'FloodEvent_' + pd.Series(np.arange(start + 1, start + rows + 1)).astype(str),
+            'City': self.cities[city],
+            'Lat': self.city_coords[city, 0],
+            'Long': self.city_coords[city, 1],
+            **events
+        }
+        for index, (column, decimals) in enumerate(zip(FEATURE_COLUMNS, FEATURE_DECIMALS)):
+            values = np.round(features[:, index], decimals)
+            data[column] = values.astype(np.int64) if decimals == 0 else values
+        data[TARGET_COLUMN] = flooded
+        return pd.DataFrame(data)[self.columns]
+    
+    def write_csv(self, output: str, rows: int, chunk_rows: int = 1_000_000):
+        """Write rows to a CSV one chunk at a time"""
+        started = time.monotonic()
+        temp_path = f"{output}.tmp"
+        for start in range(0, rows, chunk_rows):
+            self.chunk(start, min(chunk_rows, rows - start)).to_csv(
+                temp_path, mode='w' if start == 0 else 'a', header=start == 0, index=False
+            )
+            print(f"📝 {min(start + chunk_rows, rows):,}/{rows:,} rows written")
+        os.replace(temp_path, output)
+        size_mb = os.path.getsize(output) / (1 << 20)
+        print(f"✅ Wrote {rows:,} synthetic flood rows to {output} ({size_mb:,.0f} MB, {time.monotonic() - started:.1f}s)")
+
+def _peak_memory_mb() -> float:
+    """Peak resident memory of this process (Unix only)"""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Generate synthetic flood training data and benchmark training on it")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="rows to generate (default 10,000,000)")
+    parser.add_argument('--output', default='flood_data_synthetic.csv', help="CSV to write")
+    parser.add_argument('--seed-csv', default=os.path.join(backend_dir, 'flood_data_1000.csv'),
+                        help="CSV whose schema and distributions are reproduced")
+    parser.add_argument('--random-state', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="rows generated per chunk")
+    parser.add_argument('--train', action='store_true',
+                        help="train the flood model on the generated file and report time and peak memory")
+    parser.add_argument('--sample-rows', type=int, default=None, help="training sample size (TRAINING_SAMPLE_ROWS)")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.output):
+        SyntheticFloodData(args.seed_csv, args.random_state).write_csv(args.output, args.rows, args.chunk_rows)
+    else:
+        print(f"♻️ {args.output} exists, skipping generation")
+    
+    if args.train:
+        sys.path.append(backend_dir)
+        from services.flood_training import fit_flood_model
+        
+        for run in ("first run", "second run (columnar cache)"):
+            _, _, metrics, _ = fit_flood_model(args.output, args.sample_rows)
+            print(f"⏱️ {run}: read {metrics['read_seconds']:.1f}s, total {metrics['training_seconds']:.1f}s, "
+                  f"{metrics['total_rows']:,} rows ({metrics['train_rows']:,} fitted), "
+                  f"accuracy {metrics['accuracy']:.2%}, peak memory {_peak_memory_mb():,.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+
+from .unified_data_service import UnifiedDataService
+
+class AsyncUnifiedDataService(UnifiedDataService):
+    """
+    Asyncio variant of the Gujarat Coastal Monitoring Service
+    Reuses the request building, parsing, caching and simulation of UnifiedDataService,
+    but performs all provider I/O on a pooled keep-alive httpx client so route
+    handlers can await it without stalling the event loop
+    """
+    
+    def __init__(self):
+        super().__init__()
+        
+        # Connection pool sizing for the shared async client
+        self.max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+        self.max_connections_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+        
+        self._client = None
+        self._host_limits = {}
+        self._background_tasks = set()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared async HTTP client, created lazily inside the running event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": self.session.headers["User-Agent"]},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=30.0
+                ),
+                timeout=httpx.Timeout(10.0)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled client (called on application shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _get(self, url: str, params: Optional[Dict] = None, timeout: float = 10) -> httpx.Response:
+        """GET through the shared pool, limited to max_connections_per_host per upstream host"""
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        
+        async with semaphore:
+            return await self.client.get(url, params=params, timeout=timeout)
+    
+    async def _call_provider(self, provider: str, url: str, params: Optional[Dict] = None) -> Optional[httpx.Response]:
+        """
+        GET an upstream provider through its circuit breaker, bounded by its latency budget
+        Returns None without any network call while the breaker is open
+        """
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            return None
+        
+        started = time.monotonic()
+        try:
+            response = await self._get(url, params=params, timeout=breaker.latency_budget)
+        except asyncio.CancelledError:
+            # Cancelled by the fan-out deadline: the call did not finish within budget
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        
+        self._record_provider_response(breaker, response.status_code, time.monotonic() - started)
+        return response
+    
+    async def _cached_fetch(self, source: str, location_info: Dict) -> Dict:
+        """
+        Serve a source from the provider cache
+        Stale entries are returned immediately while one refresh task runs on the loop
+        """
+        cached, state = self.provider_cache.lookup(source, location_info)
+        if state == "fresh":
+            return self._with_location(cached, location_info)
+        
+        if state == "stale":
+            if self.provider_cache.begin_refresh(source, location_info):
+                task = asyncio.ensure_future(self._refresh_source(source, location_info))
+                # Keep a reference so the refresh is not garbage collected mid-flight
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return self._with_location(cached, location_info)
+        
+        data = await self._source_fetchers()[source](location_info)
+        self.provider_cache.store(source, location_info, data)
+        return data
+    
+    async def _refresh_source(self, source: str, location_info: Dict):
+        """Background refresh of a stale cache entry"""
+        try:
+            data = await self._source_fetchers()[source](location_info)
+            self.provider_cache.store(source, location_info, data)
+        except Exception as e:
+            print(f"Error refreshing {source} data: {e}")
+        finally:
+            self.provider_cache.end_refresh(source, location_info)
+    
+    async def get_location_info(self, location_input: str) -> Dict:
+        """Get location information locally when possible, otherwise from external APIs"""
+        try:
+            local_info = self._resolve_local_location(location_input)
+            if local_info is not None:
+                return local_info
+            
+            # Free-text names: answer from the geocoding cache before going to the network
+            cached_info = self.geocode_cache.get(location_input)
+            if cached_info is not None:
+                return cached_info
+            
+            location_info, cacheable = await self._geocode_location(location_input)
+            self._cache_geocode_result(location_input, location_info, cacheable)
+            return location_info
+            
+        except Exception as e:
+            print(f"Error getting location info: {e}")
+            return self.coastal_cities["kandla"]
+    
+    async def _geocode_location(self, location_input: str) -> Tuple[Dict, bool]:
+        """
+        Resolve a free-text location via Nominatim, then Google Geocoding
+        Returns the location info and whether it may be cached (no provider errored)
+        """
+        lookup_failed = False
+        
+        print(f"Searching for location: {location_input}")
+        
+        # Try OpenStreetMap Nominatim API for location search
+        try:
+            url, params = self._nominatim_request(location_input)
+            response = await self._call_provider("nominatim", url, params)
+            if response is not None and response.status_code == 200:
+                location_info = self._parse_nominatim(location_input, response.json())
+                if location_info is not None:
+                    return location_info, True
+            else:
+                lookup_failed = True
+        except Exception as e:
+            print(f"Error calling Nominatim API: {e}")
+            lookup_failed = True
+        
+        # Try Google Geocoding API as fallback (if API key available)
+        try:
+            google_request = self._google_geocode_request(location_input)
+            if google_request:
+                url, params = google_request
+                response = await self._call_provider("google_geocoding", url, params)
+                if response is not None and response.status_code == 200:
+                    location_info = self._parse_google_geocode(location_input, response.json())
+                    if location_info is not None:
+                        return location_info, True
+                else:
+                    lookup_failed = True
+        except Exception as e:
+            print(f"Error calling Google Geocoding API: {e}")
+            lookup_failed = True
+        
+        # If no API results, return error
+        print(f"Location '{location_input}' not found via APIs.")
+        return self._location_not_found(location_input), not lookup_failed
+    
+    async def get_weather_data(self, location_input: str = "kandla") -> Dict:
+        """Get realistic weather data based on location and time"""
+        location_info = await self.get_location_info(location_input)
+        return await self._cached_fetch("weather", location_info)
+    
+    async def _fetch_weather(self, location_info: Dict) -> Dict:
+        """Fetch weather data for an already resolved location"""
+        try:
+            request = self._weather_request(location_info)
+            if request:
+                url, params = request
+                response = await self._call_provider("openweather", url, params)
+                if response is not None and response.status_code == 200:
+                    return self._parse_weather(location_info, response.json())
+            
+            # Fallback to realistic simulation
+            return self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info)
+            
+        except Exception as e:
+            print(f"Error getting weather data: {e}")
+            return self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info)
+    
+    async def get_tide_data(self, location_input: str = "kandla") -> Dict:
+        """Get realistic tide data based on location and time"""
+        location_info = await self.get_location_info(location_input)
+        return await self._cached_fetch("tide", location_info)
+    
+    async def _fetch_tide(self, location_info: Dict) -> Dict:
+        """Fetch tide data for an already resolved location"""
+        try:
+            station_id = self._tide_station(location_info)
+            if station_id:
+                series = self.tide_series.get(station_id)
+                if series is None:
+                    url, params = self._tide_request(station_id)
+                    response = await self._call_provider("noaa", url, params)
+                    if response is not None and response.status_code == 200:
+                        series = self.tide_series.store_noaa(station_id, response.json())
+                if series is not None:
+                    return self._tide_from_series(location_info, series)
+            
+            # Fallback to realistic simulation
+            return self._generate_realistic_tide(location_info)
+            
+        except Exception as e:
+            print(f"Error getting tide data: {e}")
+            return self._generate_realistic_tide(location_info)
+    
+    async def get_ocean_data(self, location_input: str = "kandla") -> Dict:
+        """Get realistic ocean data based on location and time"""
+        location_info = await self.get_location_info(location_input)
+        return await self._cached_fetch("ocean", location_info)
+    
+    async def _fetch_ocean(self, location_info: Dict) -> Dict:
+        """Ocean data is simulated locally, so no I/O is awaited"""
+        return super()._fetch_ocean(location_info)
+    
+    async def get_pollution_data(self, location_input: str = "kandla") -> Dict:
+        """Get realistic pollution data based on location and time"""
+        location_info = await self.get_location_info(location_input)
+        return await self._cached_fetch("pollution", location_info)
+    
+    async def _fetch_pollution(self, location_info: Dict) -> Dict:
+        """Fetch pollution data for an already resolved location"""
+        try:
+            request = self._pollution_request(location_info)
+            if request:
+                url, params = request
+                response = await self._call_provider("waqi", url, params)
+                if response is not None and response.status_code == 200:
+                    pollution_data = self._parse_pollution(location_info, response.json())
+                    if pollution_data is not None:
+                        return pollution_data
+            
+            # Fallback to realistic simulation
+            return self._generate_realistic_pollution(location_info)
+            
+        except Exception as e:
+            print(f"Error getting pollution data: {e}")
+            return self._generate_realistic_pollution(location_info)
+    
+    async def get_comprehensive_data(self, location_input: str = "kandla") -> Dict:
+        """Get comprehensive coastal data for any location"""
+        location_info = await self.get_location_info(location_input)
+        try:
+            source_data = await self._fetch_all_sources(location_info)
+            return self._assemble_comprehensive_data(location_info, source_data)
+            
+        except Exception as e:
+            print(f"Error getting comprehensive data: {e}")
+            return self._simulated_comprehensive_data(location_info)
+    
+    async def _fetch_all_sources(self, location_info: Dict) -> Dict:
+        """
+        Run the provider fetches concurrently on the event loop
+        Sources still pending at the deadline are cancelled and simulated instead
+        """
+        tasks = {
+            source: asyncio.ensure_future(self._cached_fetch(source, location_info))
+            for source in self._source_fetchers()
+        }
+        
+        done, _ = await asyncio.wait(tasks.values(), timeout=self.fetch_deadline)
+        
+        results = {}
+        for source, task in tasks.items():
+            if task in done and task.exception() is None:
+                results[source] = task.result()
+            else:
+                if task not in done:
+                    task.cancel()
+                    print(f"⏱️ {source} data missed the {self.fetch_deadline}s deadline, using simulation")
+                else:
+                    print(f"Error getting {source} data: {task.exception()}")
+                results[source] = self._simulate_source(source, location_info)
+        
+        return results
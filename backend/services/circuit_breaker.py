@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class CircuitBreaker:
+    """
+    Circuit breaker and latency budget for one upstream provider
+    closed    - calls flow normally; outcomes are tracked over a rolling window
+    open      - calls are refused so callers go straight to their simulated fallback
+    half_open - after the cooldown a probe call decides whether to close or re-open
+    Calls slower than the latency budget count as failures, and the budget is also
+    the request timeout callers should use
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, latency_budget: Optional[float] = None,
+                 failure_threshold: Optional[int] = None, error_rate_threshold: Optional[float] = None,
+                 window_size: Optional[int] = None, min_calls: Optional[int] = None,
+                 cooldown_seconds: Optional[float] = None, half_open_max_calls: int = 1):
+        self.name = name
+        self.latency_budget = latency_budget or float(
+            os.getenv(f"PROVIDER_LATENCY_BUDGET_{name.upper()}", os.getenv("PROVIDER_LATENCY_BUDGET", "3.0"))
+        )
+        self.failure_threshold = failure_threshold or int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+        self.error_rate_threshold = error_rate_threshold or float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+        self.window_size = window_size or int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+        self.min_calls = min_calls or int(os.getenv("BREAKER_MIN_CALLS", "5"))
+        self.cooldown_seconds = cooldown_seconds or float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+        self.half_open_max_calls = half_open_max_calls
+        
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=self.window_size)  # (succeeded, latency_seconds)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "times_opened": 0}
+    
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now; False means use the fallback immediately"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    self.stats["rejected"] += 1
+                    return False
+                # Cooldown elapsed: let probe calls through
+                self.state = self.HALF_OPEN
+                self._probes_in_flight = 0
+            
+            if self.state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_calls:
+                    self.stats["rejected"] += 1
+                    return False
+                self._probes_in_flight += 1
+            
+            self.stats["calls"] += 1
+            return True
+    
+    def record_success(self, latency: float):
+        """Record a completed call; calls over the latency budget count as failures"""
+        if latency > self.latency_budget:
+            with self._lock:
+                self.stats["slow_calls"] += 1
+            self.record_failure(latency)
+            return
+        
+        with self._lock:
+            self._outcomes.append((True, latency))
+            self._consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                # Probe succeeded: start over with a clean window
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                self._probes_in_flight = 0
+    
+    def record_failure(self, latency: Optional[float] = None):
+        """Record a failed call (error, bad status or timeout)"""
+        with self._lock:
+            self.stats["failures"] += 1
+            self._outcomes.append((False, latency if latency is not None else self.latency_budget))
+            self._consecutive_failures += 1
+            
+            if self.state == self.HALF_OPEN or self._should_open():
+                self._open()
+    
+    def _should_open(self) -> bool:
+        """Open after repeated consecutive failures or a high error rate over the window"""
+        if self.state != self.CLOSED:
+            return False
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self._outcomes) >= self.min_calls:
+            return self._error_rate() >= self.error_rate_threshold
+        return False
+    
+    def _open(self):
+        """Trip the breaker (lock must be held)"""
+        if self.state != self.OPEN:
+            self.stats["times_opened"] += 1
+            print(f"⚡ Circuit breaker for {self.name} opened; using fallback for {self.cooldown_seconds:.0f}s")
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+    
+    def _error_rate(self) -> float:
+        """Share of failed calls in the rolling window"""
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for succeeded, _ in self._outcomes if not succeeded) / len(self._outcomes)
+    
+    def get_status(self) -> Dict:
+        """Get breaker state, error rate and latency for health reporting"""
+        with self._lock:
+            latencies = sorted(latency for _, latency in self._outcomes)
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": self.state,
+                "error_rate": round(self._error_rate(), 3),
+                "avg_latency_ms": round(1000 * sum(latencies) / len(latencies), 1) if latencies else None,
+                "p95_latency_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+                "latency_budget_ms": round(1000 * self.latency_budget),
+                "retry_in_seconds": retry_in,
+                **self.stats
+            }
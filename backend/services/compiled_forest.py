@@ -0,0 +1,184 @@
+import copy
+import os
+from typing import Dict, Optional
+import numpy as np
+
+class CompiledForest:
+    """
+    NumPy-only evaluator for a fitted RandomForestClassifier and its StandardScaler
+    Every tree is flattened into shared node arrays (leaves point at themselves), so a
+    prediction is max_depth rounds of gathers over a (rows x trees) node matrix with no
+    branching and none of sklearn's per-call validation or thread-pool dispatch. Tree
+    probabilities are added in estimator order, which is exactly what predict_proba
+    computes; verify() checks that on probe rows before the compiled path is used.
+    Saved arrays load (memory-mapped) with NumPy alone, so scoring processes never
+    import sklearn and workers share one page-cached copy
+    """
+    
+    # Rows traversed together; keeps the (rows x trees) index arrays cache-sized
+    CHUNK_ROWS = 256
+    
+    # Node fields are stored per slot: node n owns slots 2n (right) and 2n + 1 (left),
+    # so the next slot is next_slot[slot + went_left] and every array is used as saved
+    ARRAYS = ("mean", "scale", "roots", "feature", "threshold", "next_slot", "missing_left", "value", "classes")
+    
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, roots: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, next_slot: np.ndarray, missing_left: np.ndarray, value: np.ndarray,
+                 classes: np.ndarray, max_depth: int):
+        self.mean = mean
+        self.scale = scale
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.next_slot = next_slot
+        self.missing_left = missing_left
+        self.value = value
+        self.classes = classes
+        self.max_depth = int(max_depth)
+        self.n_features = len(mean)
+        self.n_trees = len(roots)
+        self.n_nodes = len(feature) // 2
+        self._has_missing = bool(np.any(missing_left))
+    
+    @classmethod
+    def from_sklearn(cls, model, scaler) -> "CompiledForest":
+        """Export a fitted forest (binary or multiclass, single output) and scaler"""
+        import sklearn
+        # Before 1.4 tree values were sample counts and predict_proba normalized them per leaf
+        normalize = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) < (1, 4)
+        
+        n_features = model.n_features_in_
+        mean = np.asarray(scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features), dtype=np.float64)
+        scale = np.asarray(scaler.scale_ if scaler.scale_ is not None else np.ones(n_features), dtype=np.float64)
+        
+        roots, features, thresholds, next_slots, missing, values = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            
+            roots.append(2 * offset)
+            features.append(np.repeat(np.where(is_leaf, 0, tree.feature), 2))
+            thresholds.append(np.repeat(np.where(is_leaf, np.inf, tree.threshold), 2))
+            next_slots.append(2 * (np.column_stack([
+                np.where(is_leaf, node_ids, tree.children_right),
+                np.where(is_leaf, node_ids, tree.children_left)
+            ]).ravel() + offset))
+            missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(np.repeat(
+                np.zeros(tree.node_count, dtype=bool) if missing_go_to_left is None
+                else np.asarray(missing_go_to_left, dtype=bool) & ~is_leaf, 2
+            ))
+            
+            proba = np.array(tree.value[:, 0, :model.n_classes_], dtype=np.float64)
+            if normalize:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+            values.append(np.repeat(proba, 2, axis=0))
+            offset += tree.node_count
+        
+        return cls(
+            mean=mean,
+            scale=scale,
+            roots=np.array(roots, dtype=np.intp),
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            next_slot=np.concatenate(next_slots).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values),
+            classes=np.asarray(model.classes_),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_)
+        )
+    
+    def _leaf_slots(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Leaf slot reached by every (row, tree) pair, shape (rows, trees)"""
+        n_rows = features_scaled.shape[0]
+        if n_rows > self.CHUNK_ROWS:
+            return np.concatenate([
+                self._leaf_slots(features_scaled[start:start + self.CHUNK_ROWS])
+                for start in range(0, n_rows, self.CHUNK_ROWS)
+            ])
+        
+        # float32 -> float64 is exact, and keeps the comparison below single-typed
+        flat = features_scaled.ravel().astype(np.float64)
+        slots = np.repeat(np.asarray(self.roots)[None, :], n_rows, axis=0)
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None] if n_rows > 1 else None
+        
+        for _ in range(self.max_depth):
+            columns = self.feature[slots]
+            x = flat[columns if row_offsets is None else columns + row_offsets]
+            went_left = x <= self.threshold[slots]
+            if self._has_missing:
+                went_left |= np.isnan(x) & self.missing_left[slots]
+            slots = self.next_slot[slots + went_left.astype(np.intp)]
+        return slots
+    
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """Scale in float64 like StandardScaler, then cast to float32 like the trees do"""
+        features = np.asarray(features, dtype=np.float64).reshape(-1, self.n_features)
+        return ((features - self.mean) / self.scale).astype(np.float32)
+    
+    def _average(self, leaf_values: np.ndarray) -> np.ndarray:
+        """Mean over trees (axis 1), added in estimator order like predict_proba"""
+        # accumulate is strictly sequential, unlike sum's pairwise reduction
+        return np.add.accumulate(leaf_values, axis=1)[:, -1] / self.n_trees
+    
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw (unscaled) features, shape (rows, classes)"""
+        slots = self._leaf_slots(self._scale(features))
+        return self._average(self.value[slots])
+    
+    def predict_positive(self, features: np.ndarray) -> np.ndarray:
+        """Probability of the last class (flood) for raw features"""
+        slots = self._leaf_slots(self._scale(features))
+        return self._average(self.value[:, -1][slots])
+    
+    def verify(self, model, scaler, features: Optional[np.ndarray] = None, n_rows: int = 2000) -> Dict:
+        """
+        Compare against scaler.transform + model.predict_proba on probe rows
+        Probe rows default to random draws around the scaler's mean; the reference runs
+        with n_jobs=1 so sklearn also adds the trees in estimator order
+        """
+        if features is None:
+            rng = np.random.default_rng(0)
+            features = self.mean + self.scale * rng.normal(0.0, 2.0, size=(n_rows, self.n_features))
+        reference_model = copy.copy(model)
+        reference_model.n_jobs = 1
+        expected = reference_model.predict_proba(scaler.transform(features))
+        actual = self.predict_proba(features)
+        return {
+            "rows": int(len(features)),
+            "identical": bool(np.array_equal(expected, actual)),
+            "max_abs_diff": float(np.max(np.abs(expected - actual))) if len(features) else 0.0
+        }
+    
+    def save(self, directory: str):
+        """Write every array as its own .npy file (loadable memory-mapped)"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "max_depth.npy"), np.array(self.max_depth))
+    
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "CompiledForest":
+        """
+        Load arrays written by save(); needs NumPy only
+        With mmap_mode='r' the arrays stay in the page cache, shared by every process
+        """
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in cls.ARRAYS
+        }
+        max_depth = int(np.load(os.path.join(directory, "max_depth.npy"), allow_pickle=False))
+        return cls(max_depth=max_depth, **arrays)
+    
+    def get_info(self) -> Dict:
+        """Size of the compiled forest"""
+        return {
+            "trees": self.n_trees,
+            "nodes": self.n_nodes,
+            "max_depth": self.max_depth,
+            "features": self.n_features
+        }
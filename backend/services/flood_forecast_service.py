@@ -0,0 +1,162 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+from .harmonic_tide import HarmonicTideEngine
+from .tide_series_cache import to_epoch
+
+load_dotenv()
+
+class FloodForecastService:
+    """
+    Hourly flood risk outlook for the next hours (up to FORECAST_MAX_HOURS)
+    Feature rows for every location and hour are built as arrays, then scored with a
+    single model call:
+    - tide follows the harmonic prediction of the nearest gauge, shifted to the current
+      reading; the shift (surge or datum difference) decays over FORECAST_SURGE_DECAY_HOURS
+    - weather and waves relax from the current reading towards climatology over
+      FORECAST_PERSISTENCE_HOURS, with the usual diurnal cycle on top
+    """
+    
+    # Typical coastal Gujarat conditions the extrapolation relaxes towards, in model
+    # feature order (the tide column comes from the tide curve instead)
+    CLIMATOLOGY = np.array([28.0, 75.0, 20.0, 1010.0, 0.0, 1.5])
+    
+    # Diurnal cycle per feature: amplitude, local hour of the maximum, period in hours.
+    # Temperature peaks mid-afternoon, humidity before dawn, the sea breeze in the
+    # afternoon, and pressure has its semidiurnal maxima around 10:00 and 22:00
+    DIURNAL = np.array([
+        [4.0, 14.0, 24.0],
+        [10.0, 5.0, 24.0],
+        [5.0, 15.0, 24.0],
+        [1.5, 10.0, 12.0],
+        [0.0, 0.0, 24.0],
+        [0.0, 0.0, 24.0]
+    ])
+    
+    # Physical bounds of the extrapolated features
+    LOWER = np.array([-np.inf, 0.0, 0.0, -np.inf, -np.inf, 0.0])
+    UPPER = np.array([np.inf, 100.0, np.inf, np.inf, np.inf, np.inf])
+    
+    # Coastal Gujarat local time (IST)
+    UTC_OFFSET_HOURS = 5.5
+    
+    def __init__(self, flood_predictor, tide_engine: Optional[HarmonicTideEngine] = None,
+                 persistence_hours: Optional[float] = None, surge_decay_hours: Optional[float] = None,
+                 max_hours: Optional[int] = None):
+        self.flood_predictor = flood_predictor
+        self.tide_engine = tide_engine or HarmonicTideEngine()
+        self.persistence_hours = persistence_hours or float(os.getenv("FORECAST_PERSISTENCE_HOURS", "24"))
+        self.surge_decay_hours = surge_decay_hours or float(os.getenv("FORECAST_SURGE_DECAY_HOURS", "12"))
+        self.max_hours = max_hours or int(os.getenv("FORECAST_MAX_HOURS", "72"))
+    
+    def _diurnal(self, local_hours: np.ndarray) -> np.ndarray:
+        """Diurnal anomaly of every feature at the given local hours, shape (times, features)"""
+        amplitude, peak, period = self.DIURNAL.T
+        return amplitude * np.cos(2 * np.pi * (local_hours[:, None] - peak) / period)
+    
+    def _tide_curves(self, station_ids: List[Optional[str]], times: np.ndarray) -> np.ndarray:
+        """
+        Predicted tide per site and time, shape (sites, times)
+        Sites with a harmonic gauge share one engine call; the others get the simple
+        daily cycle the data service falls back to
+        """
+        hours_utc = (times / 3600.0) % 24
+        curves = np.repeat((2.0 + 1.5 * np.sin((hours_utc - 6) * np.pi / 12))[None, :], len(station_ids), axis=0)
+        
+        gauged = [index for index, station_id in enumerate(station_ids) if station_id is not None]
+        if gauged:
+            stations = list(dict.fromkeys(station_ids[index] for index in gauged))
+            heights = self.tide_engine.predict(times, stations)
+            rows = [stations.index(station_ids[index]) for index in gauged]
+            curves[gauged] = heights[rows]
+        return curves
+    
+    def forecast(self, sites: List[Dict], hours: int = 24, start: Optional[datetime] = None) -> Dict:
+        """
+        Hourly flood probability timeline and peak risk per site
+        
+        Args:
+            sites: [{"location": str, "conditions": {"weather", "tide", "ocean"}, "station_id": Optional[str]}]
+            hours: Forecast horizon; the timeline holds the origin plus one point per hour
+            start: Forecast origin (naive UTC), the current minute by default
+        
+        Returns:
+            {"forecasts": [per-site timeline and peak], "model_version", "hours", "issued_at"}
+        """
+        if not 1 <= hours <= self.max_hours:
+            raise ValueError(f"hours must be between 1 and {self.max_hours}")
+        
+        start = (start or datetime.utcnow()).replace(second=0, microsecond=0)
+        if not sites:
+            return {"forecasts": [], "hours": hours, "issued_at": start.isoformat(), "model_version": None, "rows_scored": 0}
+        times = to_epoch(start) + 3600.0 * np.arange(hours + 1)
+        lead = (times - times[0]) / 3600.0
+        
+        # Current readings: (sites, features)
+        current = self.flood_predictor.feature_matrix([site["conditions"] for site in sites])
+        
+        # Weather and waves: damped persistence of the current anomaly plus the diurnal cycle
+        local_hours = (times / 3600.0 + self.UTC_OFFSET_HOURS) % 24
+        diurnal = self._diurnal(local_hours)
+        persistence = np.exp(-lead / self.persistence_hours)[None, :, None]
+        anomaly = current - self.CLIMATOLOGY - diurnal[0]
+        features = self.CLIMATOLOGY + diurnal[None, :, :] + anomaly[:, None, :] * persistence
+        
+        # Tide: predicted curve plus the decaying difference to the current reading
+        curves = self._tide_curves([site.get("station_id") for site in sites], times)
+        offset = current[:, 4] - curves[:, 0]
+        features[:, :, 4] = curves + offset[:, None] * np.exp(-lead / self.surge_decay_hours)[None, :]
+        
+        features = np.clip(features, self.LOWER, self.UPPER)
+        
+        # Every site and hour in one model call
+        scored, probabilities, model_version = self.flood_predictor.score_features(
+            features.reshape(-1, features.shape[-1])
+        )
+        scored = scored.reshape(features.shape)
+        probabilities = probabilities.reshape(len(sites), len(times))
+        
+        time_labels = [(start + timedelta(hours=step)).isoformat() for step in range(len(times))]
+        forecasts = []
+        for index, site in enumerate(sites):
+            site_probabilities = probabilities[index]
+            timeline = [
+                {
+                    "time": time_labels[step],
+                    "hours_ahead": step,
+                    "flood_probability": round(float(probability) * 100, 2),
+                    "risk_level": self.flood_predictor.risk_level(float(probability)),
+                    "temperature": round(float(row[0]), 1),
+                    "humidity": round(float(row[1]), 1),
+                    "wind_speed": round(float(row[2]), 1),
+                    "pressure": round(float(row[3]), 1),
+                    "tide_height": round(float(row[4]), 2),
+                    "wave_height": round(float(row[5]), 2)
+                }
+                for step, (probability, row) in enumerate(zip(site_probabilities, scored[index]))
+            ]
+            peak = int(np.argmax(site_probabilities))
+            forecasts.append({
+                "location": site["location"],
+                "city_name": site.get("city_name", site["location"]),
+                "tide_station": site.get("station_id"),
+                "tide_source": "harmonic_prediction" if site.get("station_id") else "daily_cycle",
+                "peak": {
+                    "time": time_labels[peak],
+                    "hours_ahead": peak,
+                    "flood_probability": timeline[peak]["flood_probability"],
+                    "risk_level": timeline[peak]["risk_level"]
+                },
+                "timeline": timeline
+            })
+        
+        return {
+            "forecasts": forecasts,
+            "hours": hours,
+            "issued_at": time_labels[0],
+            "model_version": model_version,
+            "rows_scored": int(probabilities.size)
+        }
@@ -1,103 +1,143 @@
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+from .model_registry import ModelRegistry, flood_model_registry
+from .model_store import ModelStore
+from .prediction_cache import PredictionCache
+
 class FloodPredictionService:
     """
     AI-Powered Flood Prediction Service for Gujarat Coastal Areas
     Uses machine learning to predict flood occurrences based on environmental conditions
     """
     
-    def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.is_trained = False
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or flood_model_registry
+        # Pre-versioning pickles, imported into the model store on first start
         self.model_path = "flood_prediction_model.pkl"
         self.scaler_path = "flood_scaler.pkl"
-        self.csv_path = "flood_data_1000.csv"
+        self.csv_path = os.getenv("FLOOD_TRAINING_DATA", "flood_data_1000.csv")
+        self.store = ModelStore()
+        self.compiled_inference = os.getenv("FLOOD_COMPILED_INFERENCE", "true").lower() in ("1", "true", "yes")
+        # Repeated (near-)identical conditions are answered from the cache instead of the forest
+        self.prediction_cache = (
+            PredictionCache() if os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes") else None
+        )
         
-        # Try to load existing model, otherwise train new one
-        self._load_or_train_model()
+        # Try to load existing model, otherwise train new one (once per process)
+        self.registry.get_or_load(self._load_or_train_model)
+    
+    @property
+    def model(self):
+        """sklearn model of the current version (None while serving from the compiled arrays)"""
+        handle = self.registry.current
+        return handle.model if handle is not None else None
+    
+    @property
+    def scaler(self):
+        handle = self.registry.current
+        return handle.scaler if handle is not None else None
     
-    def _load_or_train_model(self):
-        """Load existing trained model or train a new one"""
+    @property
+    def is_trained(self) -> bool:
+        return self.registry.current is not None
+    
+    def _load_or_train_model(self) -> Optional[Tuple]:
+        """Load the current stored model or train a new one; returns (model, scaler, source, compiled)"""
         try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                self.model = joblib.load(self.model_path)
-                self.scaler = joblib.load(self.scaler_path)
-                self.is_trained = True
-                print("✅ Loaded existing flood prediction model")
+            if (self.store.current_version() is None
+                    and os.path.exists(self.model_path) and os.path.exists(self.scaler_path)):
+                self._import_legacy_model()
+            
+            version = self.store.current_version()
+            if version is not None:
+                loaded = self._load_version(version, "store")
+                print(f"✅ Loaded flood prediction model {version}")
+                return loaded
             else:
                 print("🔄 Training new flood prediction model...")
-                self._train_model()
+                return self._train_model()
         except Exception as e:
             print(f"⚠️ Error loading model: {e}")
             print("🔄 Training new flood prediction model...")
-            self._train_model()
+            return self._train_model()
     
-    def _train_model(self):
-        """Train the flood prediction model on the CSV data"""
+    def _load_version(self, version: str, source: str) -> Tuple:
+        """
+        (model, scaler, source, compiled) of a stored version
+        The compiled arrays are memory-mapped; the sklearn objects are only unpickled
+        when serving without them
+        """
+        compiled = self.store.load_compiled(version) if self.compiled_inference else None
+        if compiled is not None:
+            return None, None, f"{source}:{version}", compiled
+        model, scaler = self.store.load_sklearn(version)
+        return model, scaler, f"{source}:{version}", None
+    
+    def _import_legacy_model(self) -> Optional[str]:
+        """
+        Store the pre-versioning pickles as the first model version, if they pass the
+        checks a retrained candidate must pass (holdout accuracy, valid probabilities,
+        exact compiled forest); returns the version, or None if they were rejected
+        """
+        from .flood_training import _evaluate, build_manifest, compile_model, load_training_sample
+        
+        model = joblib.load(self.model_path)
+        scaler = joblib.load(self.scaler_path)
+        min_accuracy = float(os.getenv("RETRAIN_MIN_ACCURACY", "0.75"))
+        compiled = compile_model(model, scaler)
         try:
-            # Load and prepare data
-            df = pd.read_csv(self.csv_path)
-            print(f"📊 Loaded {len(df)} flood data records")
-            
-            # Prepare features (input variables)
-            feature_columns = [
-                'Temperature (°C)', 'Humidity (%)', 'Wind Speed (km/h)', 
-                'Pressure (hPa)', 'Tide Height (m)', 'Ocean Wave Height (m)'
-            ]
-            
-            X = df[feature_columns].values
-            y = df['Flood Occurred'].values
-            
-            # Split data for training and testing
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
-            
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            _, _, (X_test, y_test), _ = load_training_sample(self.csv_path)
+            metrics = _evaluate(model, scaler, X_test, y_test)
+        except Exception as e:
+            print(f"⚠️ Could not evaluate {self.model_path}: {e}")
+            metrics = None
+        
+        # The pickles do not record which data they were trained on
+        version = self.store.save(model, scaler, build_manifest(None, metrics, "legacy_pickle", model),
+                                  compiled, make_current=False)
+        checks = {
+            "min_accuracy": metrics is not None and metrics["accuracy"] >= min_accuracy,
+            "valid_probabilities": self.store.valid_probabilities(version),
+            "compiled_verified": compiled is not None
+        }
+        if not all(checks.values()):
+            self.store.discard(version)
+            failed = ", ".join(name for name, passed in checks.items() if not passed)
+            print(f"🚫 Not importing {self.model_path}: failed {failed}")
+            return None
+        
+        self.store.set_current(version)
+        print(f"📦 Imported {self.model_path} into the model store as {version}")
+        return version
+    
+    def _train_model(self) -> Optional[Tuple]:
+        """Train the flood prediction model on the CSV data; returns (model, scaler, source, compiled)"""
+        # Imported here: serving a stored version must not load sklearn
+        from .flood_training import build_manifest, compile_model, fit_flood_model
+        
+        try:
+            model, scaler, metrics, _ = fit_flood_model(self.csv_path)
             
-            # Train Random Forest model
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1
+            # Save model, scaler and compiled arrays as a new current version
+            version = self.store.save(
+                model, scaler, build_manifest(self.csv_path, metrics, "trained", model), compile_model(model, scaler)
             )
-            
-            self.model.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            y_pred = self.model.predict(X_test_scaled)
-            accuracy = accuracy_score(y_test, y_pred)
-            
-            print(f"🎯 Model trained successfully!")
-            print(f"📈 Accuracy: {accuracy:.2%}")
-            print(f"📊 Classification Report:")
-            print(classification_report(y_test, y_pred))
-            
-            # Save model and scaler
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
-            
-            self.is_trained = True
-            print("💾 Model saved successfully")
+            return self._load_version(version, "trained")
             
         except Exception as e:
             print(f"❌ Error training model: {e}")
-            self.is_trained = False
+            return None
+    
+    def promote_version(self, version: str):
+        """Make a stored (validated) version current and serve it to every consumer"""
+        self.store.set_current(version)
+        return self.registry.swap(*self._load_version(version, "retrained"))
     
     def predict_flood(self, weather_data: Dict, tide_data: Dict, ocean_data: Dict) -> Dict:
         """
@@ -111,8 +151,22 @@ class FloodPredictionService:
         Returns:
             Dictionary with flood prediction results
         """
-        if not self.is_trained:
-            return {
+        return self.predict_flood_batch([{"weather": weather_data, "tide": tide_data, "ocean": ocean_data}])[0]
+    
+    def predict_flood_batch(self, conditions: List[Dict]) -> List[Dict]:
+        """
+        Predict flood probability for many condition sets in one vectorized call
+        
+        Args:
+            conditions: List of {"weather": {...}, "tide": {...}, "ocean": {...}}
+            
+        Returns:
+            One prediction dictionary per condition set, in the same order
+        """
+        # One handle per call so a concurrent hot swap cannot mix model and scaler
+        handle = self.registry.current
+        if handle is None:
+            return [{
                 "flood_probability": 0.0,
                 "flood_risk": "Unknown",
                 "risk_level": "unknown",
@@ -120,52 +174,28 @@ class FloodPredictionService:
                 "warning_message": "Model not trained",
                 "recommendations": ["System not ready for predictions"],
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            } for _ in conditions]
+        
+        if not conditions:
+            return []
         
         try:
-            # Extract features in the same order as training data
-            features = np.array([
-                weather_data.get('temperature', 25.0),
-                weather_data.get('humidity', 70.0),
-                weather_data.get('wind_speed', 20.0),
-                weather_data.get('pressure', 1013.0),
-                tide_data.get('tide_height', 2.0),
-                ocean_data.get('wave_height', 1.5)
-            ]).reshape(1, -1)
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Make prediction
-            flood_probability = self.model.predict_proba(features_scaled)[0][1]
-            
-            # Determine risk level and message
-            risk_level, risk_label, warning_message = self._get_risk_assessment(flood_probability)
+            features = self.feature_matrix(conditions)
+            _, probabilities = self._score(features, handle)
+            timestamp = datetime.utcnow().isoformat()
             
-            # Generate recommendations
-            recommendations = self._get_recommendations(flood_probability, weather_data, tide_data, ocean_data)
-            
-            return {
-                "flood_probability": round(flood_probability * 100, 2),
-                "flood_risk": risk_label,
-                "risk_level": risk_level,
-                "confidence": round(self._get_confidence_score(flood_probability), 2),
-                "warning_message": warning_message,
-                "recommendations": recommendations,
-                "timestamp": datetime.utcnow().isoformat(),
-                "features_used": {
-                    "temperature": features[0][0],
-                    "humidity": features[0][1],
-                    "wind_speed": features[0][2],
-                    "pressure": features[0][3],
-                    "tide_height": features[0][4],
-                    "wave_height": features[0][5]
-                }
-            }
+            return [
+                self._build_prediction(
+                    float(probability), row,
+                    condition.get("weather") or {}, condition.get("tide") or {}, condition.get("ocean") or {},
+                    timestamp
+                )
+                for probability, row, condition in zip(probabilities, features, conditions)
+            ]
             
         except Exception as e:
             print(f"❌ Error making flood prediction: {e}")
-            return {
+            return [{
                 "flood_probability": 0.0,
                 "flood_risk": "Error",
                 "risk_level": "error",
@@ -173,7 +203,81 @@ class FloodPredictionService:
                 "warning_message": f"Prediction error: {str(e)}",
                 "recommendations": ["Contact system administrator"],
                 "timestamp": datetime.utcnow().isoformat()
+            } for _ in conditions]
+    
+    def score_features(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Flood probabilities of a raw (n, 6) feature matrix in one model call
+        Goes through the prediction cache like predict_flood_batch, so the features
+        returned are the (snapped) values that were actually scored
+        Returns (features, probabilities, model version)
+        """
+        handle = self.registry.current
+        if handle is None:
+            raise RuntimeError("Flood prediction model not trained")
+        features, probabilities = self._score(features, handle)
+        return features, probabilities, handle.version
+    
+    def _score(self, features: np.ndarray, handle) -> Tuple[np.ndarray, np.ndarray]:
+        """(scored features, probabilities) with one handle, through the prediction cache if enabled"""
+        if self.prediction_cache is not None:
+            return self.prediction_cache.probabilities(
+                handle.version, features, lambda rows: self.predict_probabilities(rows, handle)
+            )
+        return features, self.predict_probabilities(features, handle)
+    
+    def predict_probabilities(self, features: np.ndarray, handle=None) -> np.ndarray:
+        """Flood probabilities for an (n, 6) raw feature matrix with one predict_proba call"""
+        handle = handle or self.registry.current
+        if handle.compiled is not None:
+            return handle.compiled.predict_positive(features)
+        features_scaled = handle.scaler.transform(features)
+        return handle.model.predict_proba(features_scaled)[:, 1]
+    
+    def feature_matrix(self, conditions: List[Dict]) -> np.ndarray:
+        """Extract features in the same order as training data, one row per condition set"""
+        return np.array([
+            [
+                (condition.get("weather") or {}).get('temperature', 25.0),
+                (condition.get("weather") or {}).get('humidity', 70.0),
+                (condition.get("weather") or {}).get('wind_speed', 20.0),
+                (condition.get("weather") or {}).get('pressure', 1013.0),
+                (condition.get("tide") or {}).get('tide_height', 2.0),
+                (condition.get("ocean") or {}).get('wave_height', 1.5)
+            ]
+            for condition in conditions
+        ], dtype=float)
+    
+    def _build_prediction(self, flood_probability: float, features: np.ndarray,
+                          weather_data: Dict, tide_data: Dict, ocean_data: Dict, timestamp: str) -> Dict:
+        """Prediction dictionary for one scored condition set (features are the raw readings)"""
+        # Determine risk level and message
+        risk_level, risk_label, warning_message = self._get_risk_assessment(flood_probability)
+        
+        # Generate recommendations
+        recommendations = self._get_recommendations(flood_probability, weather_data, tide_data, ocean_data)
+        
+        return {
+            "flood_probability": round(flood_probability * 100, 2),
+            "flood_risk": risk_label,
+            "risk_level": risk_level,
+            "confidence": round(self._get_confidence_score(flood_probability), 2),
+            "warning_message": warning_message,
+            "recommendations": recommendations,
+            "timestamp": timestamp,
+            "features_used": {
+                "temperature": float(features[0]),
+                "humidity": float(features[1]),
+                "wind_speed": float(features[2]),
+                "pressure": float(features[3]),
+                "tide_height": float(features[4]),
+                "wave_height": float(features[5])
             }
+        }
+    
+    def risk_level(self, probability: float) -> str:
+        """Risk level (minimal/low/medium/high/critical) of a flood probability"""
+        return self._get_risk_assessment(probability)[0]
     
     def _get_risk_assessment(self, probability: float) -> Tuple[str, str, str]:
         """Determine risk level and warning message based on probability"""
@@ -226,8 +330,26 @@ class FloodPredictionService:
         
         return recommendations
     
+    def store_version(self) -> Optional[str]:
+        """Model store version (e.g. v0002) this process serves, or None"""
+        handle = self.registry.current
+        if handle is None or ":" not in handle.source:
+            return None
+        return handle.source.split(":", 1)[1]
+    
+    def _serving_manifest(self) -> Optional[Dict]:
+        """Manifest of the stored version this process serves"""
+        version = self.store_version()
+        if version is None:
+            return None
+        try:
+            return self.store.manifest(version)
+        except (OSError, ValueError):
+            return None
+    
     def get_model_info(self) -> Dict:
         """Get information about the trained model"""
+        manifest = self._serving_manifest()
         return {
             "is_trained": self.is_trained,
             "model_type": "Random Forest Classifier",
@@ -237,18 +359,15 @@ class FloodPredictionService:
             ],
             "target": "Flood Occurred (True/False)",
             "training_data_size": "1000+ records",
-            "last_trained": datetime.fromtimestamp(
-                os.path.getmtime(self.model_path) if os.path.exists(self.model_path) else 0
-            ).isoformat() if self.is_trained else "Never"
+            "last_trained": manifest["created_at"] if manifest else ("Unknown" if self.is_trained else "Never"),
+            "artifact": {
+                "version": manifest["version"],
+                "source": manifest["source"],
+                "training_data": manifest["training_data"],
+                "metrics": manifest["metrics"],
+                "feature_order": manifest["feature_order"]
+            } if manifest else None,
+            "model_store": self.store.get_info(),
+            "prediction_cache": self.prediction_cache.get_stats() if self.prediction_cache is not None else None,
+            **self.registry.get_info()
         }
-    
-    def retrain_model(self) -> Dict:
-        """Retrain the model with current data"""
-        print("🔄 Retraining flood prediction model...")
-        self._train_model()
-        return {
-            "status": "success" if self.is_trained else "failed",
-            "message": "Model retrained successfully" if self.is_trained else "Failed to retrain model",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-
@@ -0,0 +1,127 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class FloodSweepService:
+    """
+    Sensitivity of the flood probability to one or two features
+    The chosen features are varied over a grid while the others stay at the current
+    conditions; the whole grid is scored with one model call. Risk threshold crossings
+    are found by linear interpolation between grid points, along x (for every y value
+    of a 2D sweep)
+    """
+    
+    # Model feature order and the sweep range used when none is given (about the
+    # range covered by the training data)
+    FEATURES = {
+        "temperature": (20.0, 36.0),
+        "humidity": (40.0, 100.0),
+        "wind_speed": (0.0, 120.0),
+        "pressure": (960.0, 1020.0),
+        "tide_height": (0.0, 6.0),
+        "wave_height": (0.0, 6.0)
+    }
+    
+    # Probabilities at which the risk level steps up (FloodPredictionService._get_risk_assessment)
+    THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+    
+    def __init__(self, flood_predictor, max_points: Optional[int] = None):
+        self.flood_predictor = flood_predictor
+        self.max_points = max_points or int(os.getenv("SWEEP_MAX_POINTS", "10000"))
+        self.feature_names = list(self.FEATURES)
+    
+    def _axis(self, feature: str, low: Optional[float], high: Optional[float], steps: int) -> Tuple[int, np.ndarray]:
+        """Column index and grid values of one swept feature"""
+        if feature not in self.FEATURES:
+            raise ValueError(f"Unknown feature {feature}; use one of {', '.join(self.feature_names)}")
+        if steps < 2:
+            raise ValueError("A sweep needs at least 2 steps per feature")
+        default_low, default_high = self.FEATURES[feature]
+        low = default_low if low is None else low
+        high = default_high if high is None else high
+        if not low < high:
+            raise ValueError(f"{feature}: the minimum must be below the maximum")
+        return self.feature_names.index(feature), np.linspace(low, high, steps)
+    
+    def _crossings(self, x: np.ndarray, probabilities: np.ndarray) -> List[Tuple[int, float, bool, float]]:
+        """
+        Where each row of a (rows, x) probability grid crosses each risk threshold
+        Returns (row, threshold, rising, x) tuples ordered by threshold, row and x
+        """
+        crossings = []
+        for threshold in self.THRESHOLDS:
+            above = probabilities >= threshold
+            rows, columns = np.nonzero(above[:, 1:] != above[:, :-1])
+            p0 = probabilities[rows, columns]
+            p1 = probabilities[rows, columns + 1]
+            x_cross = x[columns] + (threshold - p0) * (x[columns + 1] - x[columns]) / (p1 - p0)
+            crossings.extend(zip(rows.tolist(), [threshold] * len(rows), (p1 > p0).tolist(), x_cross.tolist()))
+        return crossings
+    
+    def sweep(self, conditions: Dict, x: str, x_min: Optional[float] = None, x_max: Optional[float] = None,
+              x_steps: int = 50, y: Optional[str] = None, y_min: Optional[float] = None,
+              y_max: Optional[float] = None, y_steps: int = 25) -> Dict:
+        """
+        Flood probability over a 1D or 2D feature grid around the given conditions
+        
+        Args:
+            conditions: {"weather": {...}, "tide": {...}, "ocean": {...}} held fixed
+            x, y: Swept feature names (y optional); see FEATURES
+            *_min, *_max, *_steps: Grid of each swept feature
+        
+        Returns:
+            Grid values, probabilities (percent; rows follow y), risk levels and threshold crossings
+        """
+        x_column, x_values = self._axis(x, x_min, x_max, x_steps)
+        if y is not None:
+            if y == x:
+                raise ValueError("x and y must be different features")
+            y_column, y_values = self._axis(y, y_min, y_max, y_steps)
+        else:
+            y_column, y_values = None, np.zeros(1)
+        if len(x_values) * len(y_values) > self.max_points:
+            raise ValueError(f"A sweep may have at most {self.max_points} grid points")
+        
+        handle = self.flood_predictor.registry.current
+        if handle is None:
+            raise RuntimeError("Flood prediction model not trained")
+        
+        base = self.flood_predictor.feature_matrix([conditions])[0]
+        grid = np.repeat(base[None, None, :], len(y_values), axis=0).repeat(len(x_values), axis=1)
+        grid[:, :, x_column] = x_values[None, :]
+        if y_column is not None:
+            grid[:, :, y_column] = y_values[:, None]
+        
+        # The whole grid in one model call; sweeps bypass the prediction cache so they
+        # neither snap the grid nor evict entries live traffic relies on
+        probabilities = self.flood_predictor.predict_probabilities(grid.reshape(-1, len(base)), handle)
+        probabilities = probabilities.reshape(len(y_values), len(x_values))
+        
+        crossings = []
+        for row, threshold, rising, x_cross in self._crossings(x_values, probabilities):
+            crossing = {
+                "threshold": round(threshold * 100, 2),
+                "risk_level": self.flood_predictor.risk_level(threshold),
+                "direction": "up" if rising else "down",
+                x: round(x_cross, 4)
+            }
+            if y_column is not None:
+                crossing[y] = round(float(y_values[row]), 4)
+            crossings.append(crossing)
+        
+        risk_levels = [[self.flood_predictor.risk_level(float(probability)) for probability in row] for row in probabilities]
+        percent = np.round(probabilities * 100, 2).tolist()
+        return {
+            "base_conditions": dict(zip(self.feature_names, (round(float(value), 4) for value in base))),
+            "x": {"feature": x, "values": np.round(x_values, 4).tolist()},
+            "y": {"feature": y, "values": np.round(y_values, 4).tolist()} if y_column is not None else None,
+            # A 1D sweep is one curve; a 2D surface has one row per y value
+            "flood_probability": percent if y_column is not None else percent[0],
+            "risk_levels": risk_levels if y_column is not None else risk_levels[0],
+            "crossings": crossings,
+            "points": int(probabilities.size),
+            "model_version": handle.version
+        }
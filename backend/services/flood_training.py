@@ -0,0 +1,402 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import accuracy_score, classification_report, f1_score, precision_score, recall_score, roc_auc_score
+import sklearn
+import warnings
+from dotenv import load_dotenv
+warnings.filterwarnings('ignore')
+
+from .compiled_forest import CompiledForest
+from .model_store import ModelStore, file_sha256
+
+load_dotenv()
+
+# Training columns of the flood CSV, in model feature order
+FEATURE_COLUMNS = [
+    'Temperature (°C)', 'Humidity (%)', 'Wind Speed (km/h)',
+    'Pressure (hPa)', 'Tide Height (m)', 'Ocean Wave Height (m)'
+]
+TARGET_COLUMN = 'Flood Occurred'
+
+# Only the training columns are parsed; sensor readings fit float32 comfortably
+CSV_DTYPES = {**{column: np.float32 for column in FEATURE_COLUMNS}, TARGET_COLUMN: bool}
+
+# Bumped whenever the layout of the columnar cache changes
+CACHE_FORMAT = 1
+
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Holdout split of every trained version: each row is assigned by a seeded hash of
+# its position, so membership is decided inside the chunk loop without a row count
+# and a row keeps its side of the split when rows are appended. Versions recording
+# the same split and training data hash were evaluated on the same holdout rows
+HOLDOUT_SPLIT = {"method": "row_hash", "test_size": TEST_SIZE, "seed": RANDOM_STATE}
+
+# Data of at most this many rows keeps the train_test_split over row positions the
+# flood model has always been evaluated with (it is buffered whole to apply it)
+EXACT_SPLIT_MAX_ROWS = 100_000
+EXACT_HOLDOUT_SPLIT = {"method": "train_test_split", "test_size": TEST_SIZE, "random_state": RANDOM_STATE}
+
+def _cache_dir(csv_path: str) -> str:
+    root = os.getenv("TRAINING_CACHE_PATH", "training_cache")
+    return os.path.join(root, os.path.splitext(os.path.basename(csv_path))[0])
+
+def _source_key(csv_path: str) -> Dict:
+    """Identifies the CSV contents a columnar cache was built from"""
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def _open_columnar_cache(csv_path: str) -> Optional[Tuple[List[np.ndarray], np.ndarray]]:
+    """Memory-mapped (features, target) columns of a CSV, or None if there is no up-to-date cache"""
+    directory = _cache_dir(csv_path)
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get("format") != CACHE_FORMAT or meta.get("source") != _source_key(csv_path):
+        return None
+    
+    rows = meta["rows"]
+    if rows == 0:
+        return [], np.empty(0, dtype=bool)
+    columns = [
+        np.memmap(os.path.join(directory, f"feature_{index}.bin"), dtype=np.float32, mode="r", shape=(rows,))
+        for index in range(len(FEATURE_COLUMNS))
+    ]
+    target = np.memmap(os.path.join(directory, "target.bin"), dtype=bool, mode="r", shape=(rows,))
+    return columns, target
+
+def iter_training_chunks(csv_path: str, chunk_rows: Optional[int] = None,
+                         build_cache: Optional[bool] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream (features, target) chunks of the flood CSV with bounded memory
+    Reads the memory-mapped columnar cache when it matches the CSV; otherwise the
+    CSV is parsed in typed chunks and, once fully read, the cache is written for the
+    next run. Features come back float32 in model feature order
+    """
+    chunk_rows = chunk_rows or int(os.getenv("TRAINING_CHUNK_ROWS", "250000"))
+    if build_cache is None:
+        build_cache = os.getenv("TRAINING_COLUMNAR_CACHE", "true").lower() in ("1", "true", "yes")
+    
+    cached = _open_columnar_cache(csv_path)
+    if cached is not None:
+        columns, target = cached
+        for start in range(0, len(target), chunk_rows):
+            stop = start + chunk_rows
+            yield np.column_stack([column[start:stop] for column in columns]), np.asarray(target[start:stop])
+        return
+    
+    staging = None
+    if build_cache:
+        directory = _cache_dir(csv_path)
+        staging = os.path.join(os.path.dirname(directory) or ".", f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+    source = _source_key(csv_path)
+    
+    try:
+        rows = 0
+        reader = pd.read_csv(
+            csv_path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, chunksize=chunk_rows
+        )
+        with reader:
+            for chunk in reader:
+                features = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+                target = chunk[TARGET_COLUMN].to_numpy(dtype=bool)
+                if staging:
+                    for index in range(features.shape[1]):
+                        with open(os.path.join(staging, f"feature_{index}.bin"), "ab") as f:
+                            np.ascontiguousarray(features[:, index]).tofile(f)
+                    with open(os.path.join(staging, "target.bin"), "ab") as f:
+                        target.tofile(f)
+                rows += len(target)
+                yield features, target
+        
+        if staging:
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "format": CACHE_FORMAT,
+                    "source": source,
+                    "rows": rows,
+                    "feature_order": FEATURE_COLUMNS
+                }, f, indent=2)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.rename(staging, directory)
+            staging = None
+            print(f"🗂️ Columnar training cache written for {rows} rows ({directory})")
+    finally:
+        if staging:
+            # Not fully read (or failed): never leave a partial cache behind
+            shutil.rmtree(staging, ignore_errors=True)
+
+def _row_hash_holdout(start: int, rows: int) -> np.ndarray:
+    """Holdout membership of rows start..start+rows under HOLDOUT_SPLIT (splitmix64 of the row position)"""
+    z = np.arange(start, start + rows, dtype=np.uint64) + np.uint64(RANDOM_STATE << 32)
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)) * (1.0 / (1 << 53)) < TEST_SIZE
+
+def _exact_holdout(rows: int) -> np.ndarray:
+    """Rows train_test_split(test_size=TEST_SIZE, random_state=RANDOM_STATE) puts in the holdout"""
+    mask = np.zeros(rows, dtype=bool)
+    if rows > 1:
+        _, test_index = train_test_split(np.arange(rows), test_size=TEST_SIZE, random_state=RANDOM_STATE)
+        mask[test_index] = True
+    return mask
+
+def split_training_chunks(chunks: Iterator[Tuple[np.ndarray, np.ndarray]]) -> Tuple[Dict, Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Assign holdout membership to streamed (features, target) chunks
+    Up to EXACT_SPLIT_MAX_ROWS rows are read ahead: data that ends within them gets
+    EXACT_HOLDOUT_SPLIT, anything larger HOLDOUT_SPLIT row by row, so memory stays
+    bounded either way. Returns (split, iterator of (features, target, is_test))
+    """
+    buffered, rows = deque(), 0
+    for features, target in chunks:
+        buffered.append((features, target))
+        rows += len(target)
+        if rows > EXACT_SPLIT_MAX_ROWS:
+            break
+    else:
+        in_holdout = _exact_holdout(rows)
+        
+        def exact():
+            start = 0
+            while buffered:
+                features, target = buffered.popleft()
+                yield features, target, in_holdout[start:start + len(target)]
+                start += len(target)
+        return dict(EXACT_HOLDOUT_SPLIT), exact()
+    
+    def hashed():
+        start = 0
+        while buffered:
+            features, target = buffered.popleft()
+            yield features, target, _row_hash_holdout(start, len(target))
+            start += len(target)
+        for features, target in chunks:
+            yield features, target, _row_hash_holdout(start, len(target))
+            start += len(target)
+    return dict(HOLDOUT_SPLIT), hashed()
+
+def _keep_smallest(sample: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]], keys: np.ndarray,
+                   features: np.ndarray, target: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge rows into a bounded sample that keeps the rows with the smallest random keys
+    With i.i.d. uniform keys this is a uniform sample without replacement of every row
+    seen so far, and it never holds more than limit rows plus one chunk
+    """
+    if sample is not None:
+        sample_keys, sample_features, sample_target = sample
+        if len(sample_keys) >= limit:
+            # Rows above the current cut-off can never enter the sample
+            below = keys < sample_keys.max()
+            keys, features, target = keys[below], features[below], target[below]
+        keys = np.concatenate([sample_keys, keys])
+        features = np.concatenate([sample_features, features])
+        target = np.concatenate([sample_target, target])
+    if len(keys) > limit:
+        keep = np.argpartition(keys, limit - 1)[:limit]
+        keys, features, target = keys[keep], features[keep], target[keep]
+    return keys, features, target
+
+def load_training_sample(csv_path: str, sample_rows: Optional[int] = None,
+                         chunk_rows: Optional[int] = None) -> Tuple[StandardScaler, Tuple, Tuple, Dict]:
+    """
+    Streaming pass over the training data
+    Rows are split into training and holdout by position (split_training_chunks), so
+    every version trained on the same data is evaluated on the same holdout rows (and
+    rows a previous version trained on never end up in it). The scaler is fitted
+    incrementally on every training row, while the rows the model is fitted on are a
+    bounded uniform sample drawn with per-row random keys (the holdout is bounded in
+    proportion). Data that fits within the sample is used whole. Neither depends on
+    the chunk size or on whether the columnar cache was used
+    Returns (scaler, (X_train, y_train), (X_test, y_test), stats)
+    """
+    chunk_rows = chunk_rows or int(os.getenv("TRAINING_CHUNK_ROWS", "250000"))
+    sample_rows = sample_rows or int(os.getenv("TRAINING_SAMPLE_ROWS", "500000"))
+    test_rows_limit = max(1, int(sample_rows * TEST_SIZE / (1 - TEST_SIZE)))
+    rng = np.random.default_rng(RANDOM_STATE)
+    from_cache = _open_columnar_cache(csv_path) is not None
+    split, chunks = split_training_chunks(iter_training_chunks(csv_path, chunk_rows))
+    
+    scaler = StandardScaler()
+    train_sample, test_sample = None, None
+    total_rows, train_pool_rows = 0, 0
+    for features, target, is_test in chunks:
+        draws = rng.random(len(target))
+        is_train = ~is_test
+        
+        if is_train.any():
+            scaler.partial_fit(features[is_train].astype(np.float64))
+            train_sample = _keep_smallest(
+                train_sample, draws[is_train], features[is_train], target[is_train], sample_rows
+            )
+        if is_test.any():
+            test_sample = _keep_smallest(
+                test_sample, draws[is_test], features[is_test], target[is_test], test_rows_limit
+            )
+        total_rows += len(target)
+        train_pool_rows += int(is_train.sum())
+    
+    if train_sample is None or test_sample is None:
+        raise ValueError(f"Not enough flood data in {csv_path} to train and evaluate a model ({total_rows} rows)")
+    
+    # Ordered by key, so the fit does not depend on chunk boundaries
+    train_order, test_order = np.argsort(train_sample[0]), np.argsort(test_sample[0])
+    X_train = train_sample[1][train_order].astype(np.float64)
+    y_train = train_sample[2][train_order]
+    X_test = test_sample[1][test_order].astype(np.float64)
+    y_test = test_sample[2][test_order]
+    stats = {
+        "total_rows": total_rows,
+        "train_pool_rows": train_pool_rows,
+        "sampled": train_pool_rows > len(y_train),
+        "data_source": "columnar_cache" if from_cache else "csv",
+        "holdout_split": split
+    }
+    return scaler, (X_train, y_train), (X_test, y_test), stats
+
+def _evaluate(model, scaler, X_test: np.ndarray, y_test: np.ndarray) -> Dict:
+    """Holdout metrics of a model and its scaler"""
+    X_test_scaled = scaler.transform(X_test)
+    y_pred = model.predict(X_test_scaled)
+    metrics = {
+        "accuracy": round(float(accuracy_score(y_test, y_pred)), 4),
+        "precision": round(float(precision_score(y_test, y_pred, zero_division=0)), 4),
+        "recall": round(float(recall_score(y_test, y_pred, zero_division=0)), 4),
+        "f1": round(float(f1_score(y_test, y_pred, zero_division=0)), 4)
+    }
+    if len(np.unique(y_test)) > 1:
+        metrics["roc_auc"] = round(float(roc_auc_score(y_test, model.predict_proba(X_test_scaled)[:, 1])), 4)
+    return metrics
+
+def fit_flood_model(csv_path: str, sample_rows: Optional[int] = None) -> Tuple[RandomForestClassifier, StandardScaler, Dict, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Train the flood Random Forest on the CSV data (streamed, see load_training_sample)
+    Returns (model, scaler, holdout metrics, (X_test, y_test))
+    """
+    started = time.monotonic()
+    
+    # Stream the data: scaler statistics over every training row, bounded samples to fit and score on
+    scaler, (X_train, y_train), (X_test, y_test), data_stats = load_training_sample(csv_path, sample_rows)
+    read_seconds = time.monotonic() - started
+    print(f"📊 Loaded {data_stats['total_rows']} flood data records from {data_stats['data_source']} "
+          f"({len(y_train)} training rows{', sampled' if data_stats['sampled'] else ''}, {len(y_test)} holdout rows)")
+    
+    # Train Random Forest model
+    model = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=10,
+        random_state=RANDOM_STATE,
+        n_jobs=-1
+    )
+    model.fit(scaler.transform(X_train), y_train)
+    
+    # Evaluate model
+    metrics = _evaluate(model, scaler, X_test, y_test)
+    metrics.update({
+        **data_stats,
+        "train_rows": int(len(X_train)),
+        "test_rows": int(len(X_test)),
+        "read_seconds": round(read_seconds, 3),
+        "training_seconds": round(time.monotonic() - started, 3)
+    })
+    
+    print(f"🎯 Model trained successfully!")
+    print(f"📈 Accuracy: {metrics['accuracy']:.2%}")
+    print(f"📊 Classification Report:")
+    print(classification_report(y_test, model.predict(scaler.transform(X_test))))
+    
+    return model, scaler, metrics, (X_test, y_test)
+
+def compile_model(model, scaler) -> Optional[CompiledForest]:
+    """Compiled form of a model, or None if it does not reproduce predict_proba exactly"""
+    try:
+        compiled = CompiledForest.from_sklearn(model, scaler)
+        check = compiled.verify(model, scaler)
+    except Exception as e:
+        print(f"⚠️ Could not compile flood model: {e}")
+        return None
+    if not check["identical"]:
+        print(f"⚠️ Compiled flood model differs from predict_proba (max diff {check['max_abs_diff']:.3g})")
+        return None
+    print(f"⚡ Compiled flood model ready ({compiled.n_trees} trees, {compiled.n_nodes} nodes, verified on {check['rows']} rows)")
+    return compiled
+
+def build_manifest(csv_path: Optional[str], metrics: Optional[Dict], source: str, model=None) -> Dict:
+    """Metadata stored with a model version"""
+    data = None
+    if csv_path and os.path.exists(csv_path):
+        data = {"path": csv_path, "sha256": file_sha256(csv_path)}
+    return {
+        "source": source,
+        "feature_order": FEATURE_COLUMNS,
+        "target": TARGET_COLUMN,
+        "training_data": data,
+        # Only known for versions trained here
+        "holdout_split": (metrics or {}).get("holdout_split") if data is not None else None,
+        "metrics": metrics,
+        "model_type": type(model).__name__ if model is not None else None,
+        "model_params": {
+            key: getattr(model, key, None) for key in ("n_estimators", "max_depth", "random_state")
+        } if model is not None else None,
+        "sklearn_version": sklearn.__version__
+    }
+
+def shares_holdout(manifest: Dict, other: Dict) -> bool:
+    """Whether two versions were trained on the same data with the same holdout split"""
+    data, other_data = manifest.get("training_data"), other.get("training_data")
+    return (
+        data is not None and other_data is not None and data.get("sha256") == other_data.get("sha256")
+        and manifest.get("holdout_split") is not None and manifest.get("holdout_split") == other.get("holdout_split")
+    )
+
+def train_candidate(csv_path: str, store_root: str) -> Dict:
+    """
+    Train a candidate model and store it as a new, not yet current, version (run in a worker process)
+    When the current version shares the candidate's holdout (shares_holdout) it is
+    scored on those rows so the caller can compare the two before promoting the
+    candidate; otherwise current_metrics is None, since the current version may have
+    been trained on rows of the candidate's holdout
+    """
+    store = ModelStore(store_root)
+    current_version = store.current_version()
+    
+    model, scaler, metrics, (X_test, y_test) = fit_flood_model(csv_path)
+    manifest = build_manifest(csv_path, metrics, "retrained", model)
+    version = store.save(model, scaler, manifest, compile_model(model, scaler), make_current=False)
+    
+    current_metrics = None
+    comparable = False
+    if current_version is not None:
+        try:
+            comparable = shares_holdout(store.manifest(current_version), manifest)
+            if comparable:
+                current_metrics = _evaluate(*store.load_sklearn(current_version), X_test, y_test)
+            else:
+                print(f"ℹ️ Flood model {current_version} was not trained on this data and holdout split; "
+                      f"skipping the comparison with {version}")
+        except Exception as e:
+            print(f"⚠️ Could not evaluate the current flood model: {e}")
+    
+    return {
+        "version": version,
+        "metrics": metrics,
+        "current_version": current_version,
+        "current_metrics": current_metrics,
+        "current_comparable": comparable
+    }
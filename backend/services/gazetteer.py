@@ -0,0 +1,208 @@
+import csv
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class _TrieNode:
+    __slots__ = ("children", "entry_ids")
+    
+    def __init__(self):
+        self.children = {}
+        self.entry_ids = set()
+
+class Gazetteer:
+    """
+    Offline gazetteer of coastal Gujarat place names
+    Names and alternate names are indexed in a prefix trie for autocomplete and a
+    trigram index for fuzzy lookup (candidates reranked by edit distance), so most
+    location inputs resolve locally without calling the geocoding APIs
+    """
+    
+    # Suffixes users add to place names that carry no information here
+    REGION_SUFFIXES = re.compile(r"(\s*\b(gujarat|india))+$")
+    
+    def __init__(self, path: Optional[str] = None, max_distance_ratio: Optional[float] = None):
+        self.path = path or os.getenv("GAZETTEER_PATH", "gujarat_gazetteer.csv")
+        # A fuzzy match may differ from the query by this share of its length
+        self.max_distance_ratio = max_distance_ratio or float(os.getenv("GAZETTEER_MAX_DISTANCE_RATIO", "0.25"))
+        
+        self.entries = []
+        self._exact = {}                     # normalized name or alternate name -> entry id
+        self._trie = _TrieNode()
+        self._trigrams = defaultdict(set)    # trigram -> normalized names
+        
+        try:
+            self._load()
+            print(f"✅ Loaded gazetteer with {len(self.entries)} places")
+        except Exception as e:
+            print(f"⚠️ Gazetteer not available: {e}")
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, strip punctuation and collapse whitespace"""
+        text = re.sub(r"[^a-z0-9\s]", " ", text.lower())
+        return " ".join(text.split())
+    
+    def _load(self):
+        """Read the CSV and build the exact, prefix and trigram indexes"""
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                entry_id = len(self.entries)
+                self.entries.append({
+                    "name": row["name"],
+                    "alt_names": [name for name in row["alt_names"].split("|") if name],
+                    "district": row["district"],
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "port_type": row["port_type"],
+                    "place_type": row["place_type"]
+                })
+                for name in [row["name"]] + self.entries[-1]["alt_names"]:
+                    self._index_name(self.normalize(name), entry_id)
+    
+    def _index_name(self, name: str, entry_id: int):
+        """Add one (normalized) name of an entry to every index"""
+        if not name:
+            return
+        self._exact.setdefault(name, entry_id)
+        
+        # Every word starts a trie path, so "beach" completes "Dumas Beach" too
+        words = name.split()
+        for i in range(len(words)):
+            node = self._trie
+            for char in " ".join(words[i:]):
+                node = node.children.setdefault(char, _TrieNode())
+                node.entry_ids.add(entry_id)
+        
+        for trigram in self._name_trigrams(name):
+            self._trigrams[trigram].add(name)
+    
+    @staticmethod
+    def _name_trigrams(name: str) -> set:
+        """Character trigrams of a name, padded so short names still produce some"""
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    @staticmethod
+    def _edit_distance(a: str, b: str, max_distance: int) -> int:
+        """Levenshtein distance, giving up (returning max_distance + 1) once it is exceeded"""
+        if abs(len(a) - len(b)) > max_distance:
+            return max_distance + 1
+        if len(a) < len(b):
+            a, b = b, a
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b)
+                ))
+            if min(current) > max_distance:
+                return max_distance + 1
+            previous = current
+        return previous[-1]
+    
+    def _clean_query(self, query: str) -> str:
+        """Normalize a query and drop trailing ', Gujarat' style suffixes"""
+        query = self.normalize(query)
+        stripped = self.REGION_SUFFIXES.sub("", query).strip()
+        return stripped or query
+    
+    def _prefix_matches(self, prefix: str) -> set:
+        """Entry ids with a name (or a word of a name) starting with prefix"""
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.entry_ids
+    
+    def _fuzzy_matches(self, query: str, limit: int) -> List[tuple]:
+        """
+        Closest names by trigram overlap, reranked by edit distance
+        Returns (distance, entry_id) pairs within the allowed distance, best first
+        """
+        query_trigrams = self._name_trigrams(query)
+        overlap = defaultdict(int)
+        for trigram in query_trigrams:
+            for name in self._trigrams.get(trigram, ()):
+                overlap[name] += 1
+        
+        # Only the best trigram candidates are worth an edit-distance computation
+        candidates = sorted(overlap, key=overlap.get, reverse=True)[:max(limit * 4, 20)]
+        
+        best = {}
+        for name in candidates:
+            max_distance = max(1, int(len(name) * self.max_distance_ratio))
+            distance = self._edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                entry_id = self._exact[name]
+                if entry_id not in best or distance < best[entry_id]:
+                    best[entry_id] = distance
+        
+        return sorted((distance, entry_id) for entry_id, distance in best.items())[:limit]
+    
+    def lookup(self, query: str) -> Optional[Dict]:
+        """Best gazetteer entry for a free-text location, or None if nothing is close enough"""
+        if not self.entries or not query:
+            return None
+        query = self._clean_query(query)
+        
+        entry_id = self._exact.get(query)
+        if entry_id is not None:
+            return self.entries[entry_id]
+        
+        matches = self._fuzzy_matches(query, 1)
+        if matches:
+            return self.entries[matches[0][1]]
+        return None
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Autocomplete: exact and prefix matches first, then fuzzy matches"""
+        if not self.entries or not query:
+            return []
+        query = self._clean_query(query)
+        
+        ranked = []
+        seen = set()
+        
+        exact_id = self._exact.get(query)
+        if exact_id is not None:
+            ranked.append((exact_id, "exact"))
+            seen.add(exact_id)
+        
+        # Shorter names first among prefix matches: "Dwarka" before "Dwarka Temple"
+        prefix_ids = sorted(self._prefix_matches(query) - seen,
+                            key=lambda entry_id: (len(self.entries[entry_id]["name"]), self.entries[entry_id]["name"]))
+        for entry_id in prefix_ids:
+            ranked.append((entry_id, "prefix"))
+            seen.add(entry_id)
+        
+        if len(ranked) < limit:
+            for _, entry_id in self._fuzzy_matches(query, limit):
+                if entry_id not in seen:
+                    ranked.append((entry_id, "fuzzy"))
+                    seen.add(entry_id)
+        
+        return [{**self.entries[entry_id], "match": match} for entry_id, match in ranked[:limit]]
+    
+    def to_location_info(self, entry: Dict) -> Dict:
+        """Location info in the format used by UnifiedDataService"""
+        return {
+            "name": f"{entry['name']}, Gujarat",
+            "lat": entry["lat"],
+            "lon": entry["lon"],
+            "state": "Gujarat",
+            "country": "India",
+            "timezone": "IST",
+            "port_type": entry["port_type"],
+            "district": entry["district"],
+            "coordinates": f"{entry['lat']},{entry['lon']}",
+            "source": "gazetteer"
+        }
@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class GeocodingCache:
+    """
+    Two-tier cache for geocoding results
+    Bounded in-memory LRU in front of a SQLite store that survives restarts
+    """
+    
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, negative_ttl_seconds: Optional[float] = None):
+        self.db_path = db_path or os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.db")
+        self.max_entries = max_entries or int(os.getenv("GEOCODE_CACHE_SIZE", "1024"))
+        # Place coordinates practically never change; unresolvable names are retried sooner
+        self.ttl_seconds = ttl_seconds or float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+        self.negative_ttl_seconds = negative_ttl_seconds or float(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))
+        
+        self._entries = OrderedDict()  # key -> (expires_at, negative, value)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0}
+        
+        self._open_store()
+    
+    @staticmethod
+    def normalize_key(location_input: str) -> str:
+        """Normalize free-text input so 'Dwarka ', 'dwarka' and 'DWARKA' share an entry"""
+        return " ".join(location_input.lower().split())
+    
+    def _open_store(self):
+        """Open the on-disk store, falling back to memory-only caching on failure"""
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "negative INTEGER NOT NULL DEFAULT 0, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Geocoding cache store unavailable, using memory only: {e}")
+            self._conn = None
+    
+    def get(self, location_input: str) -> Optional[Dict]:
+        """Return a cached location (including cached 'not found' results) or None"""
+        key = self.normalize_key(location_input)
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, negative, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats["negative_hits" if negative else "memory_hits"] += 1
+                    return dict(value)
+                del self._entries[key]
+            
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, negative, expires_at FROM geocode_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Error reading geocoding cache: {e}")
+                    row = None
+                
+                if row is not None and row[2] > now:
+                    value = json.loads(row[0])
+                    negative = bool(row[1])
+                    self._remember(key, row[2], negative, value)
+                    self.stats["negative_hits" if negative else "disk_hits"] += 1
+                    return dict(value)
+            
+            self.stats["misses"] += 1
+            return None
+    
+    def put(self, location_input: str, value: Dict, negative: bool = False):
+        """Cache a geocoding result; negative entries expire after the shorter negative TTL"""
+        key = self.normalize_key(location_input)
+        expires_at = time.time() + (self.negative_ttl_seconds if negative else self.ttl_seconds)
+        
+        with self._lock:
+            self._remember(key, expires_at, negative, dict(value))
+            
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO geocode_cache (key, value, negative, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), int(negative), expires_at)
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Error writing geocoding cache: {e}")
+    
+    def _remember(self, key: str, expires_at: float, negative: bool, value: Dict):
+        """Insert into the in-memory LRU, evicting the least recently used entries"""
+        self._entries[key] = (expires_at, negative, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached entry from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM geocode_cache")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Error clearing geocoding cache: {e}")
+    
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss counters and sizing"""
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._conn is not None,
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds
+            }
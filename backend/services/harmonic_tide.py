@@ -0,0 +1,172 @@
+import csv
+import os
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+J2000_EPOCH_SECONDS = 946728000.0  # 2000-01-01 12:00 UTC
+SECONDS_PER_CENTURY = 36525 * 86400.0
+
+class HarmonicTideEngine:
+    """
+    Harmonic tide prediction from per-station constituents in tide_constituents.csv
+    h(t) = Z0 + sum over constituents of f * A * cos(V(t) + u - g), where V comes from
+    the Doodson numbers and the mean astronomical longitudes, and f/u are the nodal
+    corrections. Evaluated as matrix products over (stations x constituents) and
+    (constituents x times), so a week at one-minute steps for every station is a few
+    NumPy operations
+    """
+    
+    # Doodson multipliers of (tau, s, h, p, N', p1) and phase offset in degrees
+    CONSTITUENTS = {
+        "M2": ((2, 0, 0, 0, 0, 0), 0),
+        "S2": ((2, 2, -2, 0, 0, 0), 0),
+        "N2": ((2, -1, 0, 1, 0, 0), 0),
+        "K2": ((2, 2, 0, 0, 0, 0), 0),
+        "K1": ((1, 1, 0, 0, 0, 0), 90),
+        "O1": ((1, -1, 0, 0, 0, 0), -90),
+        "P1": ((1, 1, -2, 0, 0, 0), -90),
+        "Q1": ((1, -2, 0, 1, 0, 0), -90),
+        "M4": ((4, 0, 0, 0, 0, 0), 0),
+        "MS4": ((4, 2, -2, 0, 0, 0), 0)
+    }
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("TIDE_CONSTITUENTS_PATH", "tide_constituents.csv")
+        self.constituent_names = list(self.CONSTITUENTS)
+        self._doodson = np.array([self.CONSTITUENTS[name][0] for name in self.constituent_names], dtype=float)
+        self._offsets = np.array([self.CONSTITUENTS[name][1] for name in self.constituent_names], dtype=float)
+        
+        self.station_ids = []
+        self._index = {}
+        self.z0 = np.zeros(0)
+        self._a_cos = np.zeros((0, len(self.constituent_names)))
+        self._a_sin = np.zeros((0, len(self.constituent_names)))
+        
+        try:
+            self._load()
+            print(f"✅ Loaded harmonic constituents for {len(self.station_ids)} tide stations")
+        except Exception as e:
+            print(f"⚠️ Harmonic tide constituents not available: {e}")
+    
+    def _load(self):
+        """Read amplitudes and Greenwich phase lags into (stations x constituents) matrices"""
+        z0 = {}
+        amplitudes = {}
+        phases = {}
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                station_id = row["station_id"]
+                if station_id not in self._index:
+                    self._index[station_id] = len(self.station_ids)
+                    self.station_ids.append(station_id)
+                    amplitudes[station_id] = np.zeros(len(self.constituent_names))
+                    phases[station_id] = np.zeros(len(self.constituent_names))
+                
+                if row["constituent"] == "Z0":
+                    z0[station_id] = float(row["amplitude_m"])
+                elif row["constituent"] in self.CONSTITUENTS:
+                    column = self.constituent_names.index(row["constituent"])
+                    amplitudes[station_id][column] = float(row["amplitude_m"])
+                    phases[station_id][column] = np.radians(float(row["phase_deg"]))
+        
+        self.z0 = np.array([z0.get(station_id, 0.0) for station_id in self.station_ids])
+        amplitude = np.array([amplitudes[station_id] for station_id in self.station_ids])
+        phase = np.array([phases[station_id] for station_id in self.station_ids])
+        # cos(X - g) = cos X cos g + sin X sin g, so each station reduces to two coefficient rows
+        self._a_cos = amplitude * np.cos(phase)
+        self._a_sin = amplitude * np.sin(phase)
+    
+    def has_station(self, station_id: str) -> bool:
+        return station_id in self._index
+    
+    @staticmethod
+    def astronomical_arguments(times: np.ndarray) -> np.ndarray:
+        """
+        Mean longitudes (tau, s, h, p, N', p1) in degrees for epoch times, shape (6, n)
+        tau is mean lunar time; N' = -N so every argument enters V with a plain multiplier
+        """
+        T = (times - J2000_EPOCH_SECONDS) / SECONDS_PER_CENTURY
+        s = 218.3164477 + 481267.88123421 * T
+        h = 280.46646 + 36000.76983 * T
+        p = 83.3532465 + 4069.0137287 * T
+        N = 125.04452 - 1934.136261 * T
+        p1 = 282.93735 + 1.71946 * T
+        
+        hours_ut = np.mod(times, 86400.0) / 3600.0
+        tau = 180.0 + 15.0 * hours_ut + h - s
+        return np.vstack([tau, s, h, p, -N, p1])
+    
+    def nodal_corrections(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Node factors f and nodal angles u (radians), shape (constituents, n)"""
+        T = (times - J2000_EPOCH_SECONDS) / SECONDS_PER_CENTURY
+        N = np.radians(125.04452 - 1934.136261 * T)
+        cos_n, cos_2n, cos_3n = np.cos(N), np.cos(2 * N), np.cos(3 * N)
+        sin_n, sin_2n, sin_3n = np.sin(N), np.sin(2 * N), np.sin(3 * N)
+        ones, zeros = np.ones_like(N), np.zeros_like(N)
+        
+        f_m2 = 1.0004 - 0.0373 * cos_n + 0.0002 * cos_2n
+        u_m2 = -2.14 * sin_n
+        f_k1 = 1.0060 + 0.1150 * cos_n - 0.0088 * cos_2n + 0.0006 * cos_3n
+        u_k1 = -8.86 * sin_n + 0.68 * sin_2n - 0.07 * sin_3n
+        f_o1 = 1.0089 + 0.1871 * cos_n - 0.0147 * cos_2n + 0.0014 * cos_3n
+        u_o1 = 10.80 * sin_n - 1.34 * sin_2n + 0.19 * sin_3n
+        f_k2 = 1.0241 + 0.2863 * cos_n + 0.0083 * cos_2n - 0.0015 * cos_3n
+        u_k2 = -17.74 * sin_n + 0.68 * sin_2n - 0.04 * sin_3n
+        
+        corrections = {
+            "M2": (f_m2, u_m2),
+            "S2": (ones, zeros),
+            "N2": (f_m2, u_m2),
+            "K2": (f_k2, u_k2),
+            "K1": (f_k1, u_k1),
+            "O1": (f_o1, u_o1),
+            "P1": (ones, zeros),
+            "Q1": (f_o1, u_o1),
+            "M4": (f_m2 ** 2, 2 * u_m2),
+            "MS4": (f_m2, u_m2)
+        }
+        f = np.vstack([corrections[name][0] for name in self.constituent_names])
+        u = np.vstack([corrections[name][1] for name in self.constituent_names])
+        return f, np.radians(u)
+    
+    def _station_rows(self, station_ids: Optional[Sequence[str]]) -> np.ndarray:
+        """Row indexes for the requested stations (all stations when None)"""
+        if station_ids is None:
+            return np.arange(len(self.station_ids))
+        return np.array([self._index[station_id] for station_id in station_ids], dtype=int)
+    
+    def predict(self, times, station_ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Tide heights above chart datum, shape (stations, times)
+        times are epoch seconds (UTC); station_ids defaults to every station
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        rows = self._station_rows(station_ids)
+        
+        # Equilibrium arguments V for every constituent and time: (constituents x times)
+        V = np.radians(self._doodson @ self.astronomical_arguments(times) + self._offsets[:, None])
+        f, u = self.nodal_corrections(times)
+        argument = V + u
+        
+        return (self.z0[rows][:, None]
+                + self._a_cos[rows] @ (f * np.cos(argument))
+                + self._a_sin[rows] @ (f * np.sin(argument)))
+    
+    def predict_range(self, start: datetime, hours: float, step_minutes: float = 1,
+                      station_ids: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Evenly spaced predictions from start (naive UTC): (epoch times, heights per station)"""
+        start_seconds = (start - datetime(1970, 1, 1)).total_seconds()
+        times = start_seconds + np.arange(0, hours * 3600 + 1, step_minutes * 60, dtype=float)
+        return times, self.predict(times, station_ids)
+    
+    def get_info(self) -> Dict:
+        """Stations and constituents available to the engine"""
+        return {
+            "stations": list(self.station_ids),
+            "constituents": list(self.constituent_names),
+            "datum": "chart datum (Z0 above it)"
+        }
@@ -0,0 +1,85 @@
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class ModelHandle:
+    """
+    Immutable snapshot of a loaded model, its scaler and (optionally) its compiled form
+    Consumers read model and scaler from the same handle so a concurrent swap can
+    never pair a new model with an old scaler; the objects are shared and must be
+    treated as read-only
+    """
+    
+    __slots__ = ("model", "scaler", "compiled", "version", "loaded_at", "source")
+    
+    def __init__(self, model: Any, scaler: Any, version: int, source: str, compiled: Any = None):
+        object.__setattr__(self, "model", model)
+        object.__setattr__(self, "scaler", scaler)
+        object.__setattr__(self, "compiled", compiled)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "loaded_at", datetime.utcnow())
+        object.__setattr__(self, "source", source)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelHandle is read-only")
+
+class ModelRegistry:
+    """
+    Process-wide holder of the current flood model
+    The model is loaded (or trained) once by whichever consumer asks first; later
+    consumers share the same handle. swap() publishes a new model atomically, so
+    a retrain takes effect for every consumer without a restart
+    """
+    
+    def __init__(self):
+        self._handle = None
+        self._lock = threading.Lock()
+        self._version = 0
+    
+    @property
+    def current(self) -> Optional[ModelHandle]:
+        """The current handle, or None before the first load (no locking needed)"""
+        return self._handle
+    
+    def get_or_load(self, loader: Callable[[], Optional[Tuple]]) -> Optional[ModelHandle]:
+        """
+        Return the current handle, loading it with loader() exactly once if empty
+        loader returns (model, scaler, source[, compiled]) or None if nothing could be loaded
+        """
+        handle = self._handle
+        if handle is not None:
+            return handle
+        
+        with self._lock:
+            if self._handle is None:
+                loaded = loader()
+                if loaded is not None:
+                    self._publish(*loaded)
+            return self._handle
+    
+    def swap(self, model: Any, scaler: Any, source: str, compiled: Any = None) -> ModelHandle:
+        """Atomically replace the current model and scaler for all consumers"""
+        with self._lock:
+            return self._publish(model, scaler, source, compiled)
+    
+    def _publish(self, model: Any, scaler: Any, source: str, compiled: Any = None) -> ModelHandle:
+        """Install a new handle (lock must be held)"""
+        self._version += 1
+        self._handle = ModelHandle(model, scaler, self._version, source, compiled)
+        print(f"📦 Flood model v{self._version} active ({source})")
+        return self._handle
+    
+    def get_info(self) -> Dict:
+        """Version and load time of the current model"""
+        handle = self._handle
+        if handle is None:
+            return {"model_version": None, "loaded_at": None, "model_source": None, "compiled_inference": False}
+        return {
+            "model_version": handle.version,
+            "loaded_at": handle.loaded_at.isoformat(),
+            "model_source": handle.source,
+            "compiled_inference": handle.compiled is not None
+        }
+
+# Shared by every FloodPredictionService in the process
+flood_model_registry = ModelRegistry()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import joblib
+import numpy as np
+from dotenv import load_dotenv
+
+from .compiled_forest import CompiledForest
+
+load_dotenv()
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, used to record which training data produced a model"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ModelStore:
+    """
+    Versioned flood model artifacts
+    Every version is an immutable directory (v0001, v0002, ...) holding the sklearn
+    model and scaler, the compiled forest as one .npy file per array, and a
+    manifest.json (training data hash, metrics, feature order). The CURRENT file
+    names the version to serve and is replaced atomically, so promoting or rolling
+    back a model is a single os.replace. Compiled arrays are loaded memory-mapped:
+    every worker process shares one page-cached copy instead of unpickling its own
+    """
+    
+    VERSION_PATTERN = re.compile(r"^v(\d{4,})$")
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("MODEL_STORE_PATH", "model_store")
+        os.makedirs(self.root, exist_ok=True)
+    
+    def _path(self, version: str, *parts: str) -> str:
+        return os.path.join(self.root, version, *parts)
+    
+    def versions(self) -> List[str]:
+        """Stored versions, oldest first"""
+        return sorted(
+            (name for name in os.listdir(self.root) if self.VERSION_PATTERN.match(name)),
+            key=lambda name: int(name[1:])
+        )
+    
+    def current_version(self) -> Optional[str]:
+        """Version named by CURRENT, or None if nothing has been promoted yet"""
+        try:
+            with open(os.path.join(self.root, "CURRENT"), encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version if os.path.isdir(self._path(version)) else None
+    
+    def set_current(self, version: str):
+        """Point CURRENT at a stored version (atomic for every reader)"""
+        if not os.path.isdir(self._path(version)):
+            raise ValueError(f"Unknown model version {version}")
+        temp_path = os.path.join(self.root, f"CURRENT.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(temp_path, os.path.join(self.root, "CURRENT"))
+    
+    def save(self, model: Any, scaler: Any, manifest: Dict, compiled: Optional[CompiledForest] = None,
+             make_current: bool = True) -> str:
+        """
+        Store a model as a new version and return its name
+        Files are written to a staging directory that is renamed into place, so a
+        version directory is either complete or absent
+        """
+        staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            # Uncompressed, so numpy arrays inside the pickles can be memory-mapped on load
+            joblib.dump(model, os.path.join(staging, "model.joblib"))
+            joblib.dump(scaler, os.path.join(staging, "scaler.joblib"))
+            if compiled is not None:
+                compiled.save(os.path.join(staging, "compiled"))
+            
+            while True:
+                existing = self.versions()
+                version = f"v{(int(existing[-1][1:]) + 1) if existing else 1:04d}"
+                manifest = {
+                    **manifest,
+                    "version": version,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "compiled": compiled.get_info() if compiled is not None else None
+                }
+                with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                try:
+                    os.rename(staging, self._path(version))
+                    break
+                except OSError:
+                    # Another process took this number first
+                    if not os.path.isdir(self._path(version)):
+                        raise
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        
+        if make_current:
+            self.set_current(version)
+        print(f"💾 Stored flood model {version}{' (current)' if make_current else ''}")
+        return version
+    
+    def discard(self, version: str):
+        """Delete a version that was never promoted"""
+        if version == self.current_version():
+            raise ValueError(f"Model version {version} is current")
+        shutil.rmtree(self._path(version), ignore_errors=True)
+    
+    def manifest(self, version: str) -> Dict:
+        with open(self._path(version, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    
+    def load_compiled(self, version: str, mmap_mode: Optional[str] = "r") -> Optional[CompiledForest]:
+        """Compiled forest of a version (memory-mapped), or None if it was stored without one"""
+        directory = self._path(version, "compiled")
+        if not os.path.isdir(directory):
+            return None
+        return CompiledForest.load(directory, mmap_mode=mmap_mode)
+    
+    def load_sklearn(self, version: str, mmap_mode: Optional[str] = "r") -> Tuple[Any, Any]:
+        """sklearn model and scaler of a version"""
+        model = joblib.load(self._path(version, "model.joblib"), mmap_mode=mmap_mode)
+        scaler = joblib.load(self._path(version, "scaler.joblib"), mmap_mode=mmap_mode)
+        return model, scaler
+    
+    def valid_probabilities(self, version: str, rows: int = 256) -> bool:
+        """Whether a version's probabilities on probe rows around its training distribution are finite and within [0, 1]"""
+        rng = np.random.default_rng(0)
+        compiled = self.load_compiled(version)
+        if compiled is not None:
+            probe = compiled.mean + compiled.scale * rng.normal(0.0, 2.0, size=(rows, compiled.n_features))
+            probabilities = compiled.predict_proba(probe)
+        else:
+            model, scaler = self.load_sklearn(version)
+            probe = scaler.mean_ + scaler.scale_ * rng.normal(0.0, 2.0, size=(rows, len(scaler.mean_)))
+            probabilities = model.predict_proba(scaler.transform(probe))
+        return bool(np.all(np.isfinite(probabilities)) and np.all((probabilities >= 0) & (probabilities <= 1)))
+    
+    def get_info(self) -> Dict:
+        """Stored versions and the current one"""
+        return {
+            "root": self.root,
+            "current_version": self.current_version(),
+            "versions": self.versions()
+        }
@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class PredictionCache:
+    """
+    LRU cache of flood probabilities in front of the model
+    Feature vectors are snapped to sensor precision and keyed together with the model
+    version, so a retrain never serves an old model's result. Rows are always scored
+    on their snapped values (rounded to the decimals of each step), which makes a
+    cache hit return exactly what a miss would have computed. Batches larger than
+    PREDICTION_CACHE_MAX_BATCH skip the per-row lookup and are scored directly, still
+    on snapped values so they agree with cached results
+    """
+    
+    # Sensor precision in model feature order: temperature (°C), humidity (%), wind speed
+    # (km/h), pressure (hPa), tide height (m), wave height (m)
+    DEFAULT_STEPS = (0.1, 1.0, 0.5, 1.0, 0.01, 0.1)
+    
+    def __init__(self, steps: Optional[Sequence[float]] = None, max_entries: Optional[int] = None):
+        if steps is None:
+            configured = os.getenv("PREDICTION_CACHE_STEPS")
+            steps = [float(step) for step in configured.split(",")] if configured else self.DEFAULT_STEPS
+        self.steps = np.asarray(steps, dtype=np.float64)
+        # Decimals of each step, so snapped values carry no float artefacts (0.30000000000000004)
+        self.decimals = [
+            next((digits for digits in range(12) if round(step, digits) == step), 12) for step in self.steps.tolist()
+        ]
+        self.max_entries = max_entries or int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+        # Bulk callers (forecasts, batch requests) would pay a Python key per row for few hits
+        self.max_batch = int(os.getenv("PREDICTION_CACHE_MAX_BATCH", "64"))
+        
+        self._entries = OrderedDict()  # quantized feature bytes -> probability
+        self._model_version = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "bypassed": 0}
+    
+    def quantize(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid indexes of feature rows and the snapped feature values they stand for"""
+        grid = np.rint(np.asarray(features, dtype=np.float64) / self.steps).astype(np.int64)
+        snapped = grid * self.steps
+        for column, digits in enumerate(self.decimals):
+            snapped[:, column] = np.round(snapped[:, column], digits)
+        return grid, snapped
+    
+    def probabilities(self, model_version: int, features: np.ndarray,
+                      score: Callable[[np.ndarray], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flood probabilities of feature rows, scoring only rows not cached yet
+        score() is called at most once, on the distinct missing rows
+        Returns (snapped features, probabilities)
+        """
+        grid, snapped = self.quantize(features)
+        if len(grid) > self.max_batch:
+            with self._lock:
+                self.stats["bypassed"] += len(grid)
+            return snapped, score(snapped)
+        
+        keys = [row.tobytes() for row in grid]
+        probabilities = np.empty(len(keys))
+        
+        missing = {}  # key -> row indexes waiting for that key
+        with self._lock:
+            if model_version != self._model_version:
+                # Entries of a replaced model can never be hit again
+                self._entries.clear()
+                self._model_version = model_version
+            for index, key in enumerate(keys):
+                probability = self._entries.get(key)
+                if probability is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._entries.move_to_end(key)
+                    probabilities[index] = probability
+            missed = sum(len(indexes) for indexes in missing.values())
+            self.stats["misses"] += missed
+            self.stats["hits"] += len(keys) - missed
+        
+        if missing:
+            first_rows = [indexes[0] for indexes in missing.values()]
+            scored = score(snapped[first_rows])
+            for indexes, probability in zip(missing.values(), scored):
+                probabilities[indexes] = probability
+            
+            with self._lock:
+                if model_version == self._model_version:
+                    for key, probability in zip(missing, scored):
+                        self._entries[key] = float(probability)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.stats["evictions"] += 1
+        
+        return snapped, probabilities
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counters, hit rate and size"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_batch": self.max_batch,
+                "model_version": self._model_version,
+                "steps": self.steps.tolist()
+            }
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class PrefetchScheduler:
+    """
+    Background refresher for the registered Gujarat coastal cities
+    Periodically fetches comprehensive data, flood predictions and alerts for every
+    city in coastal_cities and keeps the latest results as an in-memory snapshot,
+    so requests for known cities are answered without touching upstream providers
+    """
+    
+    def __init__(self, data_service, alert_service, flood_predictor,
+                 interval_seconds: Optional[float] = None, max_age_seconds: Optional[float] = None,
+                 on_cycle: Optional[Callable[[List[Dict]], None]] = None):
+        self.data_service = data_service
+        self.alert_service = alert_service
+        self.flood_predictor = flood_predictor
+        
+        self.enabled = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.interval_seconds = interval_seconds or float(os.getenv("PREFETCH_INTERVAL_SECONDS", "300"))
+        # Snapshots older than this are not served (e.g. when refresh cycles keep failing)
+        self.max_age_seconds = max_age_seconds or float(
+            os.getenv("PREFETCH_MAX_AGE_SECONDS", str(self.interval_seconds * 2))
+        )
+        # Called with the refreshed entries after every cycle (used to persist readings once per cycle)
+        self.on_cycle = on_cycle
+        
+        self._snapshot = {}
+        self._task = None
+        self.stats = {
+            "cycles": 0,
+            "failed_refreshes": 0,
+            "last_cycle_started_at": None,
+            "last_cycle_duration_seconds": None
+        }
+    
+    async def start(self):
+        """Start the refresh loop (called from the application startup event)"""
+        if not self.enabled:
+            print("⏸️ Prefetch scheduler disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+            print(f"✅ Prefetch scheduler started ({len(self.data_service.coastal_cities)} cities every {self.interval_seconds:.0f}s)")
+    
+    async def stop(self):
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        """Refresh every city, then sleep until the next cycle"""
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                print(f"❌ Prefetch cycle failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+    
+    async def refresh_all(self) -> List[Dict]:
+        """Refresh all registered cities concurrently and return the new snapshot entries"""
+        started = time.monotonic()
+        self.stats["last_cycle_started_at"] = datetime.utcnow().isoformat()
+        
+        city_keys = list(self.data_service.coastal_cities.keys())
+        results = await asyncio.gather(
+            *[self._refresh_city(city_key) for city_key in city_keys],
+            return_exceptions=True
+        )
+        
+        refreshed = []
+        for city_key, result in zip(city_keys, results):
+            if isinstance(result, Exception):
+                self.stats["failed_refreshes"] += 1
+                print(f"⚠️ Prefetch failed for {city_key}: {result}")
+            else:
+                refreshed.append(result)
+        
+        # Score every refreshed city with one vectorized model call, build the alerts from
+        # those predictions, then publish the entries
+        if refreshed:
+            predictions = self.flood_predictor.predict_flood_batch([
+                {
+                    "weather": entry["data"].get("weather") or {},
+                    "tide": entry["data"].get("tide") or {},
+                    "ocean": entry["data"].get("ocean") or {}
+                }
+                for entry in refreshed
+            ])
+            published = []
+            for entry, prediction in zip(refreshed, predictions):
+                data = entry["data"]
+                entry["flood_prediction"] = prediction
+                try:
+                    entry["alerts"] = self.alert_service.generate_alerts_from_data(
+                        data.get("weather"), data.get("tide"), data.get("ocean"), data.get("pollution"),
+                        flood_prediction=prediction
+                    )
+                except Exception as e:
+                    self.stats["failed_refreshes"] += 1
+                    print(f"⚠️ Prefetch failed for {entry['city_key']}: {e}")
+                    continue
+                self._snapshot[entry["city_key"]] = entry
+                published.append(entry)
+            refreshed = published
+        
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_duration_seconds"] = round(time.monotonic() - started, 3)
+        
+        if self.on_cycle and refreshed:
+            try:
+                # Blocking I/O (DB writes) stays off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.on_cycle, refreshed)
+            except Exception as e:
+                print(f"⚠️ Error handling prefetched data: {e}")
+        
+        return refreshed
+    
+    async def _refresh_city(self, city_key: str) -> Dict:
+        """Fetch data for one city (flood predictions and alerts are added per cycle, scored in one batch)"""
+        comprehensive_data = await self.data_service.get_comprehensive_data(city_key)
+        
+        entry = {
+            "city_key": city_key,
+            "data": comprehensive_data,
+            "refreshed_at": datetime.utcnow(),
+            "_refreshed_monotonic": time.monotonic()
+        }
+        return entry
+    
+    def get(self, location: str) -> Optional[Dict]:
+        """Snapshot entry for a registered city, or None if unknown or too old"""
+        entry = self._snapshot.get(" ".join(location.lower().split()))
+        if entry is None:
+            return None
+        if time.monotonic() - entry["_refreshed_monotonic"] > self.max_age_seconds:
+            return None
+        return entry
+    
+    def freshness(self, entry: Dict) -> Dict:
+        """Freshness metadata for a snapshot entry"""
+        return {
+            "served_from": "prefetch_snapshot",
+            "refreshed_at": entry["refreshed_at"].isoformat(),
+            "age_seconds": round(time.monotonic() - entry["_refreshed_monotonic"], 1)
+        }
+    
+    def get_status(self) -> Dict:
+        """Get scheduler state and snapshot coverage"""
+        fresh = [city_key for city_key in self._snapshot if self.get(city_key) is not None]
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "cities_registered": len(self.data_service.coastal_cities),
+            "cities_fresh": len(fresh),
+            **self.stats
+        }
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class ProviderCache:
+    """
+    Response cache for provider data (weather, tide, ocean, pollution)
+    Entries are keyed by source and rounded coordinates, expire after a per-source TTL,
+    and stay servable as stale data while a single background refresh runs. Simulated
+    fallback data (a provider was down or unconfigured) is only kept for
+    CACHE_SIMULATED_TTL and never served stale, so real data replaces it as soon as
+    the provider answers again
+    """
+    
+    # Source label of the services' simulated fallback data
+    SIMULATED_SOURCE = "realistic_simulation"
+    
+    # Default freshness per source in seconds: weather changes within minutes; tide
+    # readings are interpolated from a series cached for a day, so they are cheap to redo
+    DEFAULT_TTLS = {
+        "weather": 300,
+        "tide": 300,
+        "ocean": 900,
+        "pollution": 1800
+    }
+    
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_stale_factor: Optional[float] = None,
+                 precision: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttls = {
+            source: float(os.getenv(f"CACHE_TTL_{source.upper()}", str(default)))
+            for source, default in self.DEFAULT_TTLS.items()
+        }
+        if ttls:
+            self.ttls.update(ttls)
+        
+        # Entries older than ttl * max_stale_factor are too old to serve even as stale data
+        self.max_stale_factor = max_stale_factor or float(os.getenv("CACHE_MAX_STALE_FACTOR", "6"))
+        # 2 decimal places is roughly 1 km, finer than any provider's grid
+        self.precision = precision if precision is not None else int(os.getenv("CACHE_COORD_PRECISION", "2"))
+        self.max_entries = max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+        self.simulated_ttl = float(os.getenv("CACHE_SIMULATED_TTL", "30"))
+        
+        self._entries = OrderedDict()  # key -> (fetched_at, value, simulated)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {}
+        for source in self.ttls:
+            self._source_stats(source)
+    
+    def _source_stats(self, source: str) -> Dict:
+        """Counters for one source, created on first use"""
+        return self.stats.setdefault(source, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0})
+    
+    def make_key(self, source: str, location_info: Dict) -> Optional[Tuple[str, float, float]]:
+        """Cache key for a source at a location, or None for unresolved locations"""
+        lat, lon = location_info.get("lat"), location_info.get("lon")
+        if lat is None or lon is None:
+            return None
+        return (source, round(float(lat), self.precision), round(float(lon), self.precision))
+    
+    def lookup(self, source: str, location_info: Dict) -> Tuple[Optional[Dict], str]:
+        """
+        Look up cached data for a source
+        Returns (value, state) where state is 'fresh', 'stale' or 'miss'
+        """
+        key = self.make_key(source, location_info)
+        if key is None:
+            return None, "miss"
+        
+        now = time.time()
+        ttl = self.ttls.get(source, 300)
+        stats = self._source_stats(source)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fetched_at, value, simulated = entry
+                age = now - fetched_at
+                if age <= (min(ttl, self.simulated_ttl) if simulated else ttl):
+                    self._entries.move_to_end(key)
+                    stats["hits"] += 1
+                    return dict(value), "fresh"
+                if not simulated and age <= ttl * self.max_stale_factor:
+                    self._entries.move_to_end(key)
+                    stats["stale_hits"] += 1
+                    return dict(value), "stale"
+                del self._entries[key]
+            
+            stats["misses"] += 1
+            return None, "miss"
+    
+    def store(self, source: str, location_info: Dict, value: Dict):
+        """Cache freshly fetched data for a source"""
+        key = self.make_key(source, location_info)
+        if key is None or value is None:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.time(), dict(value), value.get("source") == self.SIMULATED_SOURCE)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def begin_refresh(self, source: str, location_info: Dict) -> bool:
+        """Claim the background refresh for a stale entry; False if one is already running"""
+        key = self.make_key(source, location_info)
+        if key is None:
+            return False
+        
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._source_stats(source)["refreshes"] += 1
+            return True
+    
+    def end_refresh(self, source: str, location_info: Dict):
+        """Release the refresh claim taken by begin_refresh"""
+        key = self.make_key(source, location_info)
+        with self._lock:
+            self._refreshing.discard(key)
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Get per-source hit/miss counters and overall hit rate"""
+        with self._lock:
+            per_source = {source: dict(counts) for source, counts in self.stats.items()}
+            served = sum(c["hits"] + c["stale_hits"] for c in per_source.values())
+            total = served + sum(c["misses"] for c in per_source.values())
+            return {
+                "sources": per_source,
+                "hit_rate": round(served / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "refreshes_in_flight": len(self._refreshing),
+                "ttl_seconds": dict(self.ttls),
+                "simulated_ttl_seconds": self.simulated_ttl
+            }
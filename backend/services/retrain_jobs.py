@@ -0,0 +1,186 @@
+import asyncio
+import multiprocessing
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class RetrainJobManager:
+    """
+    Background retraining of the flood model
+    Training runs in a worker process, so the event loop keeps serving requests and
+    the current model keeps answering predictions. The candidate is validated
+    (holdout accuracy, no large regression against the serving model, sane
+    probabilities) and only then promoted: the model store's CURRENT pointer is
+    replaced atomically and the registry swap publishes it to every consumer at once
+    """
+    
+    # Progress reported for each stage of a job
+    STAGES = {
+        "queued": 0,
+        "training": 10,
+        "validating": 70,
+        "promoting": 90,
+        "completed": 100,
+        "rejected": 100,
+        "failed": 100
+    }
+    FINISHED = ("completed", "rejected", "failed")
+    
+    def __init__(self, flood_predictor, min_accuracy: Optional[float] = None,
+                 max_accuracy_drop: Optional[float] = None, jobs_kept: Optional[int] = None):
+        self.flood_predictor = flood_predictor
+        self.min_accuracy = min_accuracy or float(os.getenv("RETRAIN_MIN_ACCURACY", "0.75"))
+        # Largest holdout accuracy drop against the serving model that is still promoted
+        self.max_accuracy_drop = (max_accuracy_drop if max_accuracy_drop is not None
+                                  else float(os.getenv("RETRAIN_MAX_ACCURACY_DROP", "0.02")))
+        self.jobs_kept = jobs_kept or int(os.getenv("RETRAIN_JOBS_KEPT", "20"))
+        # spawn keeps the worker clear of the server's threads and open connections
+        self.mp_context = os.getenv("RETRAIN_MP_CONTEXT", "spawn")
+        
+        self._jobs = OrderedDict()
+        self._active_job_id = None
+        self._executor = None
+        # Running jobs; the event loop only keeps weak references to tasks
+        self._background_tasks = set()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Single training worker, started on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context(self.mp_context)
+            )
+        return self._executor
+    
+    def submit(self) -> Dict:
+        """
+        Start a retraining job and return its record (must be called from the event loop)
+        Only one job runs at a time; while one is active its record is returned instead
+        """
+        active = self._jobs.get(self._active_job_id)
+        if active is not None and active["status"] not in self.FINISHED:
+            return {**active, "already_running": True}
+        
+        job_id = uuid.uuid4().hex[:12]
+        self._jobs[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "stage": "queued",
+            "progress": self.STAGES["queued"],
+            "submitted_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "metrics": None,
+            "current_metrics": None,
+            "current_comparable": None,
+            "validation": None,
+            "candidate_version": None,
+            "model_version": None,
+            "error": None
+        }
+        self._active_job_id = job_id
+        
+        # Forget the oldest finished jobs
+        while len(self._jobs) > self.jobs_kept:
+            oldest = next(iter(self._jobs))
+            if oldest == job_id:
+                break
+            del self._jobs[oldest]
+        
+        task = asyncio.ensure_future(self._run(job_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        print(f"🔄 Flood model retraining job {job_id} queued")
+        return dict(self._jobs[job_id])
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Current record of a job, or None if it is unknown"""
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+    
+    def list_jobs(self) -> List[Dict]:
+        """Records of the retained jobs, newest first"""
+        return [dict(job) for job in reversed(self._jobs.values())]
+    
+    def _set_stage(self, job: Dict, stage: str):
+        job["stage"] = stage
+        job["progress"] = self.STAGES[stage]
+        job["status"] = stage if stage in self.FINISHED else "running"
+    
+    async def _run(self, job_id: str):
+        """Train in the worker process, validate, then promote the candidate version"""
+        job = self._jobs[job_id]
+        predictor = self.flood_predictor
+        store = predictor.store
+        loop = asyncio.get_running_loop()
+        
+        try:
+            # Imported here: only the worker process needs sklearn
+            from .flood_training import train_candidate
+            
+            job["started_at"] = datetime.utcnow().isoformat()
+            self._set_stage(job, "training")
+            result = await loop.run_in_executor(
+                self._get_executor(), train_candidate, predictor.csv_path, store.root
+            )
+            job["candidate_version"] = result["version"]
+            job["metrics"] = result["metrics"]
+            job["current_metrics"] = result["current_metrics"]
+            job["current_comparable"] = result["current_comparable"]
+            
+            self._set_stage(job, "validating")
+            job["validation"] = await loop.run_in_executor(
+                None, self._validate, store, result["version"], result["metrics"], result["current_metrics"]
+            )
+            if not job["validation"]["passed"]:
+                store.discard(result["version"])
+                self._set_stage(job, "rejected")
+                print(f"⚠️ Retraining job {job_id} rejected: {job['validation']['checks']}")
+                return
+            
+            self._set_stage(job, "promoting")
+            handle = await loop.run_in_executor(None, predictor.promote_version, result["version"])
+            job["model_version"] = handle.version
+            self._set_stage(job, "completed")
+            print(f"✅ Retraining job {job_id} promoted flood model {result['version']} (v{handle.version})")
+            
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # The worker died (e.g. out of memory); the next job starts a fresh one
+                self._executor = None
+            if job["candidate_version"] and job["candidate_version"] != store.current_version():
+                store.discard(job["candidate_version"])
+            job["error"] = str(e)
+            self._set_stage(job, "failed")
+            print(f"❌ Retraining job {job_id} failed: {e}")
+            
+        finally:
+            job["finished_at"] = datetime.utcnow().isoformat()
+    
+    def _validate(self, store, version: str, metrics: Dict, current_metrics: Optional[Dict]) -> Dict:
+        """Checks a candidate must pass before it replaces the serving model"""
+        checks = {"min_accuracy": metrics["accuracy"] >= self.min_accuracy}
+        if current_metrics is not None:
+            checks["no_regression"] = metrics["accuracy"] >= current_metrics["accuracy"] - self.max_accuracy_drop
+        
+        # Probabilities on probe rows around the training distribution must be valid
+        checks["valid_probabilities"] = store.valid_probabilities(version)
+        
+        return {
+            "passed": all(checks.values()),
+            "checks": checks,
+            "min_accuracy": self.min_accuracy,
+            "max_accuracy_drop": self.max_accuracy_drop
+        }
+    
+    def shutdown(self):
+        """Stop the training worker (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,250 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+# Add the ml directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ml'))
+from smart_threat_detector import SmartThreatDetector
+from .harmonic_tide import HarmonicTideEngine
+from .model_store import ModelStore
+
+load_dotenv()
+
+# Scorers loaded by this process, keyed by (store root, version)
+_scorers = {}
+
+def _load_scorer(store_root: str, version: str):
+    """Flood probability function of a stored version: compiled arrays (memory-mapped) when available"""
+    key = (store_root, version)
+    if key not in _scorers:
+        store = ModelStore(store_root)
+        compiled = store.load_compiled(version)
+        if compiled is not None:
+            _scorers[key] = compiled.predict_positive
+        else:
+            model, scaler = store.load_sklearn(version)
+            _scorers[key] = lambda features: model.predict_proba(scaler.transform(features))[:, 1]
+    return _scorers[key]
+
+def simulate_chunk(task: Dict) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Draw and score one chunk of storm samples (runs in a pool worker or inline)
+    Returns (features, flood probabilities, threat levels per threat kind)
+    """
+    profile = task["profile"]
+    n = task["samples"]
+    rng = np.random.default_rng(task["seed"])
+    
+    # One shared intensity shock: a deeper low comes with stronger wind, surge and waves
+    rho = profile["intensity_correlation"]
+    intensity = rng.standard_normal(n)
+    
+    def draw(name: str, direction: float) -> np.ndarray:
+        noise = rho * direction * intensity + np.sqrt(1 - rho ** 2) * rng.standard_normal(n)
+        return profile[name] + profile[f"{name}_spread"] * noise
+    
+    pressure = draw("pressure", -1.0)
+    wind_speed = np.maximum(draw("wind_speed", 1.0), 0.0)
+    surge = np.maximum(draw("surge", 1.0), 0.0)
+    wave_height = np.maximum(draw("wave_height", 1.0), 0.0)
+    temperature = profile["temperature"] + profile["temperature_spread"] * rng.standard_normal(n)
+    humidity = np.clip(profile["humidity"] + profile["humidity_spread"] * rng.standard_normal(n), 0.0, 100.0)
+    # Landfall at a random moment of the window, on top of the astronomical tide at that moment
+    tide_height = task["tide_curve"][rng.integers(0, len(task["tide_curve"]), size=n)] + surge
+    
+    features = np.column_stack([temperature, humidity, wind_speed, pressure, tide_height, wave_height])
+    probabilities = _load_scorer(task["store_root"], task["version"])(features)
+    
+    threat_levels = SmartThreatDetector().threat_levels_batch(
+        {"wind_speed": wind_speed, "tide_height": tide_height, "pressure": pressure}, task["location"]
+    )
+    return features, probabilities, threat_levels
+
+class ScenarioEngine:
+    """
+    Monte Carlo what-if analysis for a storm profile
+    Every location gets `samples` perturbed condition sets around the profile: pressure,
+    wind, surge and waves share an intensity shock, and the astronomical tide is taken
+    at a random moment of the landfall window from the harmonic engine. Samples are
+    drawn and scored in fixed-size chunks (each with its own seed, so results do not
+    depend on the number of workers) by a process pool; workers load the serving model
+    version from the model store memory-mapped and never import sklearn when it has
+    compiled arrays. Results are percentiles of flood probability, the share of
+    samples per risk level and the SmartThreatDetector severity distribution
+    """
+    
+    # Storm profile: centre values and 1-sigma spreads. Defaults reproduce the cyclone
+    # of AlertService.simulate_cyclone_alert (wind speed in the units of the weather feeds)
+    DEFAULT_PROFILE = {
+        "temperature": 25.0, "temperature_spread": 1.5,
+        "humidity": 95.0, "humidity_spread": 4.0,
+        "wind_speed": 45.0, "wind_speed_spread": 10.0,
+        "pressure": 950.0, "pressure_spread": 12.0,
+        "surge": 1.0, "surge_spread": 0.5,
+        "wave_height": 4.0, "wave_height_spread": 1.0,
+        "intensity_correlation": 0.7
+    }
+    
+    PERCENTILES = (5, 25, 50, 75, 95, 99)
+    
+    # Flood risk levels and the probabilities they start at (FloodPredictionService._get_risk_assessment)
+    RISK_LEVELS = ("minimal", "low", "medium", "high", "critical")
+    RISK_BOUNDS = (0.2, 0.4, 0.6, 0.8)
+    
+    SEVERITIES = ("none", "low", "medium", "high", "critical")
+    
+    def __init__(self, flood_predictor, tide_engine: Optional[HarmonicTideEngine] = None,
+                 workers: Optional[int] = None, chunk_samples: Optional[int] = None,
+                 max_samples: Optional[int] = None):
+        self.flood_predictor = flood_predictor
+        self.tide_engine = tide_engine or HarmonicTideEngine()
+        self.workers = workers or int(os.getenv("SCENARIO_WORKERS", "0")) or os.cpu_count() or 1
+        self.chunk_samples = chunk_samples or int(os.getenv("SCENARIO_CHUNK_SAMPLES", "25000"))
+        # Upper bound on samples per request, over all locations
+        self.max_samples = max_samples or int(os.getenv("SCENARIO_MAX_SAMPLES", "1000000"))
+        # Requests smaller than this are scored in-process; the pool only pays off for large runs
+        self.pool_min_samples = int(os.getenv("SCENARIO_POOL_MIN_SAMPLES", "50000"))
+        self.mp_context = os.getenv("SCENARIO_MP_CONTEXT", "spawn")
+        self._executor = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Scoring workers, started on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(self.mp_context)
+            )
+        return self._executor
+    
+    def _tide_curve(self, station_id: Optional[str], start: datetime, window_hours: float) -> np.ndarray:
+        """Astronomical tide over the landfall window at 10 minute steps"""
+        if station_id is not None and self.tide_engine.has_station(station_id):
+            _, heights = self.tide_engine.predict_range(start, window_hours, 10, [station_id])
+            return heights[0]
+        # No harmonic gauge: the data service's simple daily cycle
+        hours = (start.hour + start.minute / 60 + np.arange(0, window_hours * 60 + 1, 10) / 60) % 24
+        return 2.0 + 1.5 * np.sin((hours - 6) * np.pi / 12)
+    
+    def run(self, sites: List[Dict], samples: int, profile: Optional[Dict] = None,
+            window_hours: float = 24, seed: Optional[int] = None) -> Dict:
+        """
+        Simulate a storm profile at every site
+        
+        Args:
+            sites: [{"location": str, "city_name": str, "station_id": Optional[str]}]
+            samples: Condition sets drawn per location
+            profile: Overrides of DEFAULT_PROFILE
+            window_hours: Landfall window starting now, over which the astronomical tide is sampled
+            seed: Makes a run reproducible
+        
+        Returns:
+            Per-location percentiles and distributions, plus run statistics
+        """
+        if samples < 1 or samples * len(sites) > self.max_samples:
+            raise ValueError(f"samples x locations must be between 1 and {self.max_samples}")
+        unknown = set(profile or {}) - set(self.DEFAULT_PROFILE)
+        if unknown:
+            raise ValueError(f"Unknown storm profile fields: {', '.join(sorted(unknown))}")
+        profile = {**self.DEFAULT_PROFILE, **{key: float(value) for key, value in (profile or {}).items()}}
+        if not 0 <= profile["intensity_correlation"] < 1:
+            raise ValueError("intensity_correlation must be in [0, 1)")
+        
+        version = self.flood_predictor.store_version()
+        if version is None:
+            raise RuntimeError("No stored flood model version is being served")
+        store_root = self.flood_predictor.store.root
+        
+        started = time.monotonic()
+        start = datetime.utcnow()
+        seeds = iter(np.random.SeedSequence(seed).spawn(
+            sum(-(-samples // self.chunk_samples) for _ in sites)
+        ))
+        tasks = []
+        for index, site in enumerate(sites):
+            tide_curve = self._tide_curve(site.get("station_id"), start, window_hours)
+            for offset in range(0, samples, self.chunk_samples):
+                tasks.append((index, {
+                    "store_root": store_root,
+                    "version": version,
+                    "profile": profile,
+                    "tide_curve": tide_curve,
+                    "location": site.get("city_name", site["location"]),
+                    "samples": min(self.chunk_samples, samples - offset),
+                    "seed": next(seeds)
+                }))
+        
+        use_pool = self.workers > 1 and samples * len(sites) >= self.pool_min_samples
+        if use_pool:
+            try:
+                outcomes = list(self._get_executor().map(simulate_chunk, [task for _, task in tasks]))
+            except BrokenProcessPool:
+                # A worker died; the next run starts a fresh pool
+                self._executor = None
+                raise
+        else:
+            outcomes = [simulate_chunk(task) for _, task in tasks]
+        
+        results = []
+        for index, site in enumerate(sites):
+            chunks = [outcome for (site_index, _), outcome in zip(tasks, outcomes) if site_index == index]
+            results.append({
+                "location": site["location"],
+                "city_name": site.get("city_name", site["location"]),
+                "tide_station": site.get("station_id"),
+                **self._summarize(
+                    np.concatenate([features for features, _, _ in chunks]),
+                    np.concatenate([probabilities for _, probabilities, _ in chunks]),
+                    {kind: np.concatenate([levels[kind] for _, _, levels in chunks]) for kind in chunks[0][2]}
+                )
+            })
+        
+        return {
+            "locations": results,
+            "profile": profile,
+            "samples_per_location": samples,
+            "samples_total": samples * len(sites),
+            "window_hours": window_hours,
+            "seed": seed,
+            "model_version": version,
+            "chunks": len(tasks),
+            "workers": self.workers if use_pool else 1,
+            "elapsed_seconds": round(time.monotonic() - started, 3)
+        }
+    
+    def _summarize(self, features: np.ndarray, probabilities: np.ndarray, threat_levels: Dict[str, np.ndarray]) -> Dict:
+        """Percentiles and distributions of one location's samples"""
+        def percentiles(values: np.ndarray, scale: float = 1.0, digits: int = 2) -> Dict:
+            points = np.percentile(values, self.PERCENTILES) * scale
+            return {
+                "mean": round(float(values.mean() * scale), digits),
+                **{f"p{level}": round(float(point), digits) for level, point in zip(self.PERCENTILES, points)}
+            }
+        
+        risk_counts = np.bincount(np.searchsorted(self.RISK_BOUNDS, probabilities, side="right"),
+                                  minlength=len(self.RISK_LEVELS))
+        highest = np.maximum.reduce(list(threat_levels.values()))
+        severity_counts = np.bincount(highest, minlength=len(self.SEVERITIES))
+        n = len(probabilities)
+        
+        return {
+            "flood_probability": percentiles(probabilities, 100),
+            "risk_levels": {level: round(int(count) / n, 4) for level, count in zip(self.RISK_LEVELS, risk_counts)},
+            "threat_severity": {level: round(int(count) / n, 4) for level, count in zip(self.SEVERITIES, severity_counts)},
+            "threat_probability": {kind: round(float(np.mean(levels > 0)), 4) for kind, levels in threat_levels.items()},
+            "conditions": {
+                name: percentiles(features[:, column])
+                for column, name in enumerate(("temperature", "humidity", "wind_speed", "pressure", "tide_height", "wave_height"))
+            }
+        }
+    
+    def shutdown(self):
+        """Stop the scoring workers (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import random
 import sys
 import os
@@ -15,7 +15,7 @@ class SimpleAlertService:
     Now with SMART ML that works with minimal data!
     """
     
-    def __init__(self):
+    def __init__(self, flood_predictor: Optional[FloodPredictionService] = None):
         self.alert_types = {
             "flood_risk": "AI Flood Prediction Alert",
             "high_tide": "High tide warning",
@@ -30,16 +30,22 @@ class SimpleAlertService:
         # Initialize the smart ML threat detector
         self.ml_detector = SmartThreatDetector()
         
-        # Initialize the flood prediction service
-        self.flood_predictor = FloodPredictionService()
+        # Initialize the flood prediction service (shares the process-wide model registry)
+        self.flood_predictor = flood_predictor or FloodPredictionService()
     
-    def generate_alerts_from_data(self, weather_data: Dict, tide_data: Dict, ocean_data: Dict, pollution_data: Dict) -> List[Dict]:
-        """Generate alerts using AI Flood Prediction and SMART ML"""
+    def generate_alerts_from_data(self, weather_data: Dict, tide_data: Dict, ocean_data: Dict, pollution_data: Dict,
+                                  flood_prediction: Optional[Dict] = None) -> List[Dict]:
+        """
+        Generate alerts using AI Flood Prediction and SMART ML
+        flood_prediction is a prediction already made for these conditions (e.g. in a
+        batch); without one the flood model is called here
+        """
         alerts = []
         
         # Generate AI-powered flood prediction alert
         if weather_data and tide_data and ocean_data:
-            flood_prediction = self.flood_predictor.predict_flood(weather_data, tide_data, ocean_data)
+            if flood_prediction is None:
+                flood_prediction = self.flood_predictor.predict_flood(weather_data, tide_data, ocean_data)
             
             # Create flood prediction alert
             flood_alert = self._create_flood_alert(flood_prediction, weather_data.get('city_name', 'Unknown Location'))
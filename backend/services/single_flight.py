@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    """
+    Request coalescing for identical async computations
+    The first caller for a key runs the computation; callers that arrive while it is
+    still in flight await the same result instead of starting their own
+    """
+    
+    def __init__(self):
+        self._in_flight = {}
+        self.stats = {"executions": 0, "shared": 0}
+    
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run func(*args, **kwargs) once per key at a time
+        Returns (result, shared) where shared is True for callers that joined an in-flight call
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["shared"] += 1
+            # Shield so one caller disconnecting does not cancel the result for the others
+            return await asyncio.shield(task), True
+        
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        self._in_flight[key] = task
+        self.stats["executions"] += 1
+        task.add_done_callback(lambda finished: self._forget(key, finished))
+        
+        return await asyncio.shield(task), False
+    
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        """Drop a finished computation so the next request recomputes"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+    
+    def get_stats(self) -> Dict:
+        """Get coalescing counters"""
+        total = self.stats["executions"] + self.stats["shared"]
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": round(self.stats["shared"] / total, 4) if total else 0.0
+        }
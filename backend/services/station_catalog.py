@@ -0,0 +1,128 @@
+import csv
+import os
+from typing import Dict, List, Optional
+import numpy as np
+from scipy.spatial import cKDTree
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EARTH_RADIUS_KM = 6371.0
+
+def _unit_vectors(lat_deg: np.ndarray, lon_deg: np.ndarray) -> np.ndarray:
+    """Points on the unit sphere for latitudes/longitudes in degrees, shape (n, 3)"""
+    lat, lon = np.radians(lat_deg), np.radians(lon_deg)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Great-circle distance of a unit-sphere chord length"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+def _km_to_chord(distance_km: float) -> float:
+    """Unit-sphere chord length of a great-circle distance (whole sphere beyond half the circumference)"""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+class StationCatalog:
+    """
+    Catalog of tide gauges loaded from tide_stations.csv
+    Stations are indexed in KD trees over their unit vectors on the sphere (one over
+    every station and one per provider). The chord between two unit vectors grows
+    monotonically with their great-circle distance, so nearest-station and radius
+    queries on the chord give exact haversine results while staying logarithmic in
+    catalog size; scipy's cKDTree keeps sklearn out of the serving process
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("TIDE_STATIONS_PATH", "tide_stations.csv")
+        
+        self.stations = []
+        self._by_id = {}
+        self._trees = {}  # provider (None for all) -> (cKDTree, station indexes)
+        
+        try:
+            self._load()
+            print(f"✅ Loaded tide station catalog with {len(self.stations)} stations")
+        except Exception as e:
+            print(f"⚠️ Tide station catalog not available: {e}")
+    
+    def _load(self):
+        """Read the catalog and build the spatial indexes"""
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                station = {
+                    "station_id": row["station_id"],
+                    "name": row["name"],
+                    "provider": row["provider"],
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "country": row["country"],
+                    "region": row["region"]
+                }
+                self._by_id[station["station_id"]] = len(self.stations)
+                self.stations.append(station)
+        
+        if not self.stations:
+            return
+        
+        points = _unit_vectors(
+            np.array([station["lat"] for station in self.stations]),
+            np.array([station["lon"] for station in self.stations])
+        )
+        providers = np.array([station["provider"] for station in self.stations])
+        
+        self._trees[None] = (cKDTree(points), np.arange(len(self.stations)))
+        for provider in np.unique(providers):
+            indexes = np.flatnonzero(providers == provider)
+            self._trees[str(provider)] = (cKDTree(points[indexes]), indexes)
+    
+    @property
+    def providers(self) -> List[str]:
+        """Providers present in the catalog"""
+        return [provider for provider in self._trees if provider is not None]
+    
+    def get(self, station_id: str) -> Optional[Dict]:
+        """Station by id, or None if it is not in the catalog"""
+        index = self._by_id.get(station_id)
+        return dict(self.stations[index]) if index is not None else None
+    
+    def nearest(self, lat: float, lon: float, k: int = 1, provider: Optional[str] = None,
+                max_km: Optional[float] = None) -> List[Dict]:
+        """
+        The k nearest stations (optionally of one provider), closest first
+        Stations further than max_km are left out
+        """
+        tree_entry = self._trees.get(provider)
+        if tree_entry is None:
+            return []
+        
+        tree, indexes = tree_entry
+        k = min(k, len(indexes))
+        bound = _km_to_chord(max_km) if max_km is not None else np.inf
+        chords, positions = tree.query(_unit_vectors(lat, lon)[0], k=k, distance_upper_bound=bound)
+        
+        results = []
+        # Neighbours beyond the bound come back with an infinite distance
+        for chord, position in zip(np.atleast_1d(chords), np.atleast_1d(positions)):
+            distance_km = float(_chord_to_km(chord)) if np.isfinite(chord) else np.inf
+            if max_km is not None and distance_km > max_km:
+                break
+            results.append({**self.stations[indexes[position]], "distance_km": round(distance_km, 2)})
+        return results
+    
+    def within_radius(self, lat: float, lon: float, radius_km: float,
+                      provider: Optional[str] = None) -> List[Dict]:
+        """All stations (optionally of one provider) within radius_km, closest first"""
+        tree_entry = self._trees.get(provider)
+        if tree_entry is None:
+            return []
+        
+        tree, indexes = tree_entry
+        point = _unit_vectors(lat, lon)[0]
+        positions = np.array(tree.query_ball_point(point, r=_km_to_chord(radius_km)), dtype=np.int64)
+        distances = _chord_to_km(np.linalg.norm(tree.data[positions] - point, axis=1))
+        order = np.argsort(distances, kind="stable")
+        return [
+            {**self.stations[indexes[positions[index]]], "distance_km": round(float(distances[index]), 2)}
+            for index in order
+            if distances[index] <= radius_km
+        ]
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from scipy.interpolate import CubicSpline
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def to_epoch(moment: datetime) -> float:
+    """Seconds since the epoch for a naive UTC (or timezone-aware) datetime"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def format_epoch(seconds: float) -> str:
+    """Display form of an epoch time, as used for next high/low tide"""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+class TideSeries:
+    """
+    Tide prediction series of one station, interpolated with a cubic spline
+    High and low waters are the roots of the spline derivative, so their times
+    are not limited to the sampling interval of the series
+    """
+    
+    def __init__(self, station_id: str, times: np.ndarray, heights: np.ndarray):
+        order = np.argsort(times)
+        self.station_id = station_id
+        self.times = np.asarray(times, dtype=float)[order]
+        self.heights = np.asarray(heights, dtype=float)[order]
+        self.fetched_at = time.time()
+        
+        self.spline = CubicSpline(self.times, self.heights)
+        derivative = self.spline.derivative()
+        extreme_times = derivative.roots(extrapolate=False)
+        # Curvature tells highs (negative) from lows (positive)
+        curvature = derivative.derivative()(extreme_times)
+        keep = curvature != 0
+        self.extreme_times = extreme_times[keep]
+        self.extreme_heights = self.spline(self.extreme_times)
+        self.extreme_is_high = curvature[keep] < 0
+    
+    @property
+    def start(self) -> float:
+        return float(self.times[0])
+    
+    @property
+    def end(self) -> float:
+        return float(self.times[-1])
+    
+    def covers(self, start: float, end: float) -> bool:
+        """Whether the series spans [start, end] (epoch seconds)"""
+        return self.start <= start and end <= self.end
+    
+    def height_at(self, times) -> np.ndarray:
+        """Interpolated heights at one or many epoch times"""
+        return self.spline(np.asarray(times, dtype=float))
+    
+    def next_extreme(self, after: float, high: bool) -> Optional[Dict]:
+        """Next high (or low) water after an epoch time, or None if beyond the series"""
+        mask = (self.extreme_times > after) & (self.extreme_is_high == high)
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return None
+        index = candidates[0]
+        return {"time": float(self.extreme_times[index]), "height": float(self.extreme_heights[index])}
+    
+    def extremes_between(self, start: float, end: float) -> List[Dict]:
+        """High and low waters between two epoch times"""
+        mask = (self.extreme_times >= start) & (self.extreme_times <= end)
+        return [
+            {
+                "time": format_epoch(moment),
+                "height": round(float(height), 3),
+                "type": "high" if is_high else "low"
+            }
+            for moment, height, is_high in zip(
+                self.extreme_times[mask], self.extreme_heights[mask], self.extreme_is_high[mask]
+            )
+        ]
+    
+    def state_at(self, moment: datetime) -> Dict:
+        """Height, rising/falling state and next high/low water at a moment"""
+        now = to_epoch(moment)
+        height = float(self.spline(now))
+        slope = float(self.spline(now, 1))
+        next_high = self.next_extreme(now, high=True)
+        next_low = self.next_extreme(now, high=False)
+        
+        # Within 20 minutes of a turning point the water is effectively slack
+        nearest = np.abs(self.extreme_times - now)
+        if len(nearest) and nearest.min() <= 1200:
+            tide_type = "high" if self.extreme_is_high[np.argmin(nearest)] else "low"
+        else:
+            tide_type = "rising" if slope > 0 else "falling"
+        
+        state = {
+            "tide_height": round(height, 2),
+            "tide_type": tide_type,
+            "status": {"high": "High Tide", "low": "Low Tide", "rising": "Rising", "falling": "Falling"}[tide_type],
+            "high_tide": round(next_high["height"], 2) if next_high else None,
+            "low_tide": round(next_low["height"], 2) if next_low else None,
+            "next_high_tide": format_epoch(next_high["time"]) if next_high else None,
+            "next_low_tide": format_epoch(next_low["time"]) if next_low else None
+        }
+        state["tide_range"] = (
+            round(state["high_tide"] - state["low_tide"], 2)
+            if next_high and next_low else None
+        )
+        return state
+
+class TideSeriesCache:
+    """
+    Per-station cache of tide prediction series
+    One upstream download per station per TTL serves every tide request for that
+    station; readings are interpolated locally for the requested time
+    """
+    
+    def __init__(self, ttl_seconds: Optional[float] = None, window_hours: Optional[int] = None,
+                 lookback_hours: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("TIDE_SERIES_TTL_SECONDS", "86400"))
+        # Downloaded window: lookback_hours before now through window_hours - lookback_hours after
+        self.window_hours = window_hours or int(os.getenv("TIDE_SERIES_WINDOW_HOURS", "72"))
+        self.lookback_hours = lookback_hours or int(os.getenv("TIDE_SERIES_LOOKBACK_HOURS", "12"))
+        
+        self._series = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+    
+    def get(self, station_id: str, until: Optional[datetime] = None) -> Optional[TideSeries]:
+        """Cached series for a station if it is fresh and covers now (and until, if given)"""
+        now = time.time()
+        end = to_epoch(until) if until is not None else now
+        with self._lock:
+            series = self._series.get(station_id)
+            if (series is not None and now - series.fetched_at <= self.ttl_seconds
+                    and series.covers(now, max(now, end))):
+                self.stats["hits"] += 1
+                return series
+            self.stats["misses"] += 1
+            return None
+    
+    def store(self, station_id: str, times: np.ndarray, heights: np.ndarray) -> Optional[TideSeries]:
+        """Cache a downloaded or predicted series; None if it has too few points to interpolate"""
+        if len(times) < 4:
+            return None
+        series = TideSeries(station_id, times, heights)
+        with self._lock:
+            self._series[station_id] = series
+            self.stats["stored"] += 1
+        return series
+    
+    def store_noaa(self, station_id: str, data: Dict) -> Optional[TideSeries]:
+        """Cache a NOAA predictions response (requested with time_zone=gmt)"""
+        predictions = data.get("predictions") or []
+        if not predictions:
+            return None
+        times = np.array(
+            [prediction["t"].replace(" ", "T") for prediction in predictions], dtype="datetime64[m]"
+        ).astype("datetime64[s]").astype(float)
+        heights = np.array([float(prediction["v"]) for prediction in predictions])
+        return self.store(station_id, times, heights)
+    
+    def request_window(self, hours: int = 0) -> Dict[str, str]:
+        """begin_date/range parameters for a NOAA download covering the next `hours` too"""
+        begin = datetime.utcfromtimestamp(time.time() - self.lookback_hours * 3600)
+        span = max(self.window_hours, hours + self.lookback_hours)
+        return {"begin_date": begin.strftime("%Y%m%d %H:%M"), "range": str(span)}
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and cached stations"""
+        with self._lock:
+            return {**self.stats, "stations": len(self._series), "ttl_seconds": self.ttl_seconds}
@@ -1,79 +1,170 @@
 import requests
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from dotenv import load_dotenv
 
+from .station_catalog import StationCatalog
+from .tide_series_cache import TideSeriesCache, format_epoch
+from .harmonic_tide import HarmonicTideEngine
+
 load_dotenv()
 
 class TideService:
-    def __init__(self):
+    def __init__(self, tide_series: Optional[TideSeriesCache] = None,
+                 station_catalog: Optional[StationCatalog] = None,
+                 tide_engine: Optional[HarmonicTideEngine] = None):
         self.api_key = os.getenv("NOAA_API_KEY")
         self.base_url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+        # Pass the UnifiedDataService instances to share catalogs and downloaded series
+        self.station_catalog = station_catalog or StationCatalog()
+        self.tide_series = tide_series or TideSeriesCache()
+        self.tide_engine = tide_engine or HarmonicTideEngine()
         
     def get_tide_data(self, station_id: str = "9447130", hours: int = 24) -> Dict:
-        """Fetch tide data from NOAA API or return mock data"""
+        """
+        Tide reading for a station interpolated from its cached NOAA prediction series
+        The series is downloaded at most once per day and reaches at least `hours` ahead
+        """
         if self.api_key:
             try:
-                end_date = datetime.utcnow()
-                begin_date = end_date - timedelta(hours=hours)
-                
-                params = {
-                    "begin_date": begin_date.strftime("%Y%m%d %H:%M"),
-                    "end_date": end_date.strftime("%Y%m%d %H:%M"),
-                    "station": station_id,
-                    "product": "predictions",
-                    "datum": "MLLW",
-                    "time_zone": "lst_ldt",
-                    "interval": "h",
-                    "units": "metric",
-                    "format": "json"
-                }
+                series = self.tide_series.get(station_id, datetime.utcnow() + timedelta(hours=hours))
+                if series is None:
+                    params = {
+                        "station": station_id,
+                        "product": "predictions",
+                        "datum": "MLLW",
+                        "time_zone": "gmt",
+                        "interval": "h",
+                        "units": "metric",
+                        "format": "json",
+                        **self.tide_series.request_window(hours)
+                    }
+                    
+                    response = requests.get(self.base_url, params=params, timeout=10)
+                    if response.status_code == 200:
+                        series = self.tide_series.store_noaa(station_id, response.json())
                 
-                response = requests.get(self.base_url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_tide_data(data, station_id)
+                if series is not None:
+                    return self._tide_from_series(series, station_id)
             except Exception as e:
                 print(f"Error fetching tide data: {e}")
         
         # Return mock data if API fails or no key
         return self._get_mock_tide_data(station_id)
     
-    def _parse_tide_data(self, data: Dict, station_id: str) -> Dict:
-        """Parse NOAA API response"""
-        if "predictions" not in data:
-            return self._get_mock_tide_data(station_id)
-            
-        predictions = data["predictions"]
-        if not predictions:
-            return self._get_mock_tide_data(station_id)
-            
-        # Get the most recent prediction
-        latest = predictions[-1]
-        
+    def _tide_from_series(self, series, station_id: str) -> Dict:
+        """Current reading and next high/low water from a cached series"""
+        now = datetime.utcnow()
         return {
-            "timestamp": datetime.utcnow(),
+            "timestamp": now,
             "location": station_id,
-            "tide_height": float(latest["v"]),
-            "tide_type": self._determine_tide_type(predictions),
+            **series.state_at(now),
             "source": "noaa"
         }
     
-    def _determine_tide_type(self, predictions: List[Dict]) -> str:
-        """Determine if tide is high, low, rising, or falling"""
-        if len(predictions) < 2:
-            return "unknown"
+    @staticmethod
+    def find_extremes(times: np.ndarray, heights: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        High and low waters of one or many evenly sampled series (rows of heights)
+        Turning points are sign changes of the first difference; each is refined by
+        fitting a parabola through its three samples, so times and heights are not
+        limited to the sampling step
+        Returns (row, time, height, is_high) arrays ordered by row and time
+        """
+        heights = np.atleast_2d(heights)
+        step = times[1] - times[0]
+        
+        slope = np.sign(np.diff(heights, axis=1))
+        # Flat samples take the sign before them so a plateau counts as one turning point
+        for _ in range(2):
+            flat = slope == 0
+            if not flat.any():
+                break
+            slope[:, 1:][flat[:, 1:]] = slope[:, :-1][flat[:, 1:]]
+        
+        turning = slope[:, :-1] != slope[:, 1:]
+        turning &= (slope[:, :-1] != 0) & (slope[:, 1:] != 0)
+        rows, columns = np.nonzero(turning)
+        
+        y0 = heights[rows, columns]
+        y1 = heights[rows, columns + 1]
+        y2 = heights[rows, columns + 2]
+        curvature = y0 - 2 * y1 + y2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offset = np.where(curvature != 0, 0.5 * (y0 - y2) / curvature, 0.0)
+        offset = np.clip(offset, -0.5, 0.5)
+        
+        extreme_times = times[columns + 1] + offset * step
+        extreme_heights = y1 - 0.25 * (y0 - y2) * offset
+        is_high = slope[rows, columns] > 0
+        return rows, extreme_times, extreme_heights, is_high
+    
+    def get_tide_extremes(self, station_ids: Optional[Sequence[str]] = None, days: float = 1,
+                          start: Optional[datetime] = None, step_minutes: float = 6) -> List[Dict]:
+        """
+        High/low water times and heights, tidal range and current state for harmonic stations
+        All stations and the whole horizon are evaluated in one vectorized pass
+        """
+        if station_ids is None:
+            station_ids = list(self.tide_engine.station_ids)
+        station_ids = [station_id for station_id in station_ids if self.tide_engine.has_station(station_id)]
+        if not station_ids:
+            return []
+        
+        start = start or datetime.utcnow()
+        # One extra step each side so turning points at the edges are still bracketed
+        times, heights = self.tide_engine.predict_range(
+            start - timedelta(minutes=step_minutes), days * 24 + 2 * step_minutes / 60,
+            step_minutes, station_ids
+        )
+        rows, extreme_times, extreme_heights, is_high = self.find_extremes(times, heights)
+        
+        now = times[1]
+        current_heights = heights[:, 1]
+        rising = heights[:, 2] > heights[:, 0]
+        boundaries = np.searchsorted(rows, np.arange(len(station_ids) + 1))
+        
+        results = []
+        for row, station_id in enumerate(station_ids):
+            lo, hi = boundaries[row], boundaries[row + 1]
+            station_times = extreme_times[lo:hi]
+            station_heights = extreme_heights[lo:hi]
+            station_highs = is_high[lo:hi]
             
-        current = float(predictions[-1]["v"])
-        previous = float(predictions[-2]["v"])
+            # Range of every consecutive high/low pair
+            ranges = np.abs(np.diff(station_heights))
+            upcoming = np.flatnonzero(station_times >= now)
+            next_high = upcoming[station_highs[upcoming]][:1]
+            next_low = upcoming[~station_highs[upcoming]][:1]
+            
+            station = self.station_catalog.get(station_id) or {"name": station_id, "lat": None, "lon": None}
+            results.append({
+                "station_id": station_id,
+                "name": station["name"],
+                "lat": station["lat"],
+                "lon": station["lon"],
+                "current": {
+                    "time": format_epoch(now),
+                    "tide_height": round(float(current_heights[row]), 2),
+                    "state": "rising" if rising[row] else "falling"
+                },
+                "next_high_tide": format_epoch(station_times[next_high[0]]) if len(next_high) else None,
+                "next_low_tide": format_epoch(station_times[next_low[0]]) if len(next_low) else None,
+                "tidal_range": {
+                    "max": round(float(ranges.max()), 2) if len(ranges) else None,
+                    "mean": round(float(ranges.mean()), 2) if len(ranges) else None
+                },
+                "high_waters": int(station_highs.sum()),
+                "low_waters": int((~station_highs).sum()),
+                "extremes": [
+                    {"time": format_epoch(moment), "height": round(float(height), 2), "type": "high" if high else "low"}
+                    for moment, height, high in zip(station_times, station_heights, station_highs)
+                ]
+            })
         
-        if current > previous:
-            return "rising"
-        elif current < previous:
-            return "falling"
-        else:
-            return "stable"
+        return results
     
     def _get_mock_tide_data(self, station_id: str) -> Dict:
         """Generate mock tide data for testing"""
@@ -93,25 +184,20 @@ class TideService:
     
     def get_station_info(self, station_id: str = "9447130") -> Dict:
         """Get information about a tide station"""
-        # Mock station info for now
-        stations = {
-            "9447130": {
-                "name": "Seattle, WA",
-                "lat": 47.6023,
-                "lon": -122.3393,
-                "state": "WA"
-            },
-            "9447130": {
-                "name": "Mumbai, India",
-                "lat": 19.0760,
-                "lon": 72.8777,
-                "state": "Maharashtra"
+        station = self.station_catalog.get(station_id)
+        if station is not None:
+            return {
+                "name": station["name"],
+                "lat": station["lat"],
+                "lon": station["lon"],
+                "state": station["region"],
+                "country": station["country"],
+                "provider": station["provider"]
             }
-        }
         
-        return stations.get(station_id, {
+        return {
             "name": f"Station {station_id}",
             "lat": 0.0,
             "lon": 0.0,
             "state": "Unknown"
-        })
+        }
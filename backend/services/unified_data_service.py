@@ -1,11 +1,22 @@
 import requests
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 import random
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+
+from .geocoding_cache import GeocodingCache
+from .gazetteer import Gazetteer
+from .station_catalog import StationCatalog
+from .tide_series_cache import TideSeriesCache
+from .harmonic_tide import HarmonicTideEngine
+from .provider_cache import ProviderCache
+from .circuit_breaker import CircuitBreaker
 
 load_dotenv()
 
@@ -16,10 +27,19 @@ class UnifiedDataService:
     """
     
     def __init__(self):
+        # Provider fetches for one location run concurrently (see _fetch_all_sources)
+        self.fetch_workers = int(os.getenv("DATA_FETCH_WORKERS", "16"))
+        self.fetch_deadline = float(os.getenv("DATA_FETCH_DEADLINE", "8.0"))
+        self.fetch_executor = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="provider-fetch")
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        # Size the keep-alive pool so concurrent fetches do not discard connections
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.fetch_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
         # Gujarat coastal cities with coordinates
         self.coastal_cities = {
@@ -34,173 +54,296 @@ class UnifiedDataService:
             "diu": {"name": "Diu, Gujarat", "lat": 20.7144, "lon": 70.9874, "state": "Gujarat", "country": "India", "timezone": "IST", "port_type": "Tourist Port"},
             "ghogha": {"name": "Ghogha, Gujarat", "lat": 22.3333, "lon": 72.2833, "state": "Gujarat", "country": "India", "timezone": "IST", "port_type": "Minor Port"}
         }
+        
+        # Offline index of coastal Gujarat places, consulted before any geocoding API
+        self.gazetteer = Gazetteer()
+        
+        # Tide gauges with a haversine spatial index; stations further than this are not used
+        self.station_catalog = StationCatalog()
+        self.tide_station_max_km = float(os.getenv("TIDE_STATION_MAX_KM", "150"))
+        # Whole prediction series per station, downloaded once a day and interpolated locally
+        self.tide_series = TideSeriesCache()
+        # Offline harmonic predictions for gauges with known constituents (simulation fallback)
+        self.tide_engine = HarmonicTideEngine()
+        
+        # Free-text geocoding results (Nominatim/Google) survive restarts
+        self.geocode_cache = GeocodingCache()
+        
+        # Provider responses keyed by rounded coordinates, served stale while refreshing
+        self.provider_cache = ProviderCache()
+        
+        # One circuit breaker per upstream provider; open breakers skip straight to fallbacks
+        self.breakers = {
+            provider: CircuitBreaker(provider)
+            for provider in ["nominatim", "google_geocoding", "openweather", "noaa", "waqi"]
+        }
     
     def get_location_info(self, location_input: str) -> Dict:
-        """Get location information dynamically from external APIs"""
+        """Get location information locally when possible, otherwise from external APIs"""
         try:
-            # Check if it's a predefined Gujarat coastal city (fallback)
-            if location_input.lower() in self.coastal_cities:
-                city_info = self.coastal_cities[location_input.lower()]
-                return {
-                    "name": city_info["name"],
-                    "lat": city_info["lat"],
-                    "lon": city_info["lon"],
-                    "state": city_info["state"],
-                    "country": city_info["country"],
-                    "timezone": city_info["timezone"],
-                    "port_type": city_info["port_type"],
-                    "coordinates": f"{city_info['lat']},{city_info['lon']}"
-                }
-            
-            # Check if it's coordinates (lat,lon format) - validate if within Gujarat coastal region
-            if "," in location_input:
-                try:
-                    lat, lon = map(float, location_input.split(","))
-                    # Check if coordinates are within Gujarat coastal region (approximate bounds)
-                    if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
-                        return {
-                            "name": f"Custom Gujarat Location ({lat:.4f}, {lon:.4f})",
-                            "lat": lat,
-                            "lon": lon,
-                            "state": "Gujarat",
-                            "country": "India",
-                            "timezone": "IST",
-                            "port_type": "Custom",
-                            "coordinates": f"{lat},{lon}"
-                        }
-                    else:
-                        # If outside Gujarat, default to Kandla
-                        print(f"Coordinates {lat}, {lon} are outside Gujarat coastal region. Defaulting to Kandla.")
-                        return self.coastal_cities["kandla"]
-                except ValueError:
-                    pass
+            local_info = self._resolve_local_location(location_input)
+            if local_info is not None:
+                return local_info
             
-            # NEW: Dynamic location search via external APIs
-            print(f"Searching for location: {location_input}")
+            # Free-text names: answer from the geocoding cache before going to the network
+            cached_info = self.geocode_cache.get(location_input)
+            if cached_info is not None:
+                return cached_info
             
-            # Try OpenStreetMap Nominatim API for location search
-            try:
-                search_query = f"{location_input}, Gujarat, India"
-                nominatim_url = "https://nominatim.openstreetmap.org/search"
-                params = {
-                    "q": search_query,
-                    "format": "json",
-                    "limit": 1,
-                    "addressdetails": 1
-                }
-                
-                response = self.session.get(nominatim_url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data and len(data) > 0:
-                        location = data[0]
-                        lat = float(location["lat"])
-                        lon = float(location["lon"])
-                        
-                        # Check if coordinates are within Gujarat coastal region
-                        if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
-                            # Determine port type based on location details
-                            port_type = self._determine_port_type(location, location_input)
-                            
-                            return {
-                                "name": f"{location_input}, Gujarat",
-                                "lat": lat,
-                                "lon": lon,
-                                "state": "Gujarat",
-                                "country": "India",
-                                "timezone": "IST",
-                                "port_type": port_type,
-                                "coordinates": f"{lat},{lon}",
-                                "source": "nominatim_api"
-                            }
-                        else:
-                            print(f"Location {location_input} found but outside Gujarat coastal region.")
-                            # Return error information instead of defaulting to Kandla
-                            return {
-                                "name": f"{location_input}",
-                                "lat": lat,
-                                "lon": lon,
-                                "state": "Outside Gujarat",
-                                "country": "India",
-                                "timezone": "IST",
-                                "port_type": "Outside Gujarat Region",
-                                "coordinates": f"{lat},{lon}",
-                                "source": "nominatim_api",
-                                "error": "Location outside Gujarat coastal region"
-                            }
-            except Exception as e:
-                print(f"Error calling Nominatim API: {e}")
+            location_info, cacheable = self._geocode_location(location_input)
+            self._cache_geocode_result(location_input, location_info, cacheable)
+            return location_info
             
-            # Try Google Geocoding API as fallback (if API key available)
+        except Exception as e:
+            print(f"Error getting location info: {e}")
+            return self.coastal_cities["kandla"]
+    
+    def _call_provider(self, provider: str, url: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+        """
+        GET an upstream provider through its circuit breaker, bounded by its latency budget
+        Returns None without any network call while the breaker is open
+        """
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            return None
+        
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, params=params, timeout=breaker.latency_budget)
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        
+        self._record_provider_response(breaker, response.status_code, time.monotonic() - started)
+        return response
+    
+    def _record_provider_response(self, breaker: CircuitBreaker, status_code: int, latency: float):
+        """Server errors and rate limiting count against a provider; other responses are healthy"""
+        if status_code >= 500 or status_code == 429:
+            breaker.record_failure(latency)
+        else:
+            breaker.record_success(latency)
+    
+    def get_provider_status(self) -> Dict:
+        """Get circuit breaker state for every upstream provider"""
+        return {provider: breaker.get_status() for provider, breaker in self.breakers.items()}
+    
+    def _resolve_local_location(self, location_input: str) -> Optional[Dict]:
+        """Resolve predefined cities, 'lat,lon' input and gazetteer places without any network call"""
+        # Check if it's a predefined Gujarat coastal city (fallback)
+        if location_input.lower() in self.coastal_cities:
+            city_info = self.coastal_cities[location_input.lower()]
+            return {
+                "name": city_info["name"],
+                "lat": city_info["lat"],
+                "lon": city_info["lon"],
+                "state": city_info["state"],
+                "country": city_info["country"],
+                "timezone": city_info["timezone"],
+                "port_type": city_info["port_type"],
+                "coordinates": f"{city_info['lat']},{city_info['lon']}"
+            }
+        
+        # Check if it's coordinates (lat,lon format) - validate if within Gujarat coastal region
+        if "," in location_input:
             try:
-                google_key = os.getenv("GOOGLE_MAPS_API_KEY")
-                if google_key:
-                    search_query = f"{location_input}, Gujarat, India"
-                    google_url = "https://maps.googleapis.com/maps/api/geocode/json"
-                    params = {
-                        "address": search_query,
-                        "key": google_key
+                lat, lon = map(float, location_input.split(","))
+                # Check if coordinates are within Gujarat coastal region (approximate bounds)
+                if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
+                    return {
+                        "name": f"Custom Gujarat Location ({lat:.4f}, {lon:.4f})",
+                        "lat": lat,
+                        "lon": lon,
+                        "state": "Gujarat",
+                        "country": "India",
+                        "timezone": "IST",
+                        "port_type": "Custom",
+                        "coordinates": f"{lat},{lon}"
                     }
-                    
-                    response = self.session.get(google_url, params=params, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data["status"] == "OK" and data["results"]:
-                            location = data["results"][0]["geometry"]["location"]
-                            lat = location["lat"]
-                            lon = location["lng"]
-                            
-                            # Check if coordinates are within Gujarat coastal region
-                            if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
-                                port_type = self._determine_port_type_from_google(data["results"][0], location_input)
-                                
-                                return {
-                                    "name": f"{location_input}, Gujarat",
-                                    "lat": lat,
-                                    "lon": lon,
-                                    "state": "Gujarat",
-                                    "country": "India",
-                                    "timezone": "IST",
-                                    "port_type": port_type,
-                                    "coordinates": f"{lat},{lon}",
-                                    "source": "google_geocoding_api"
-                                }
-                            else:
-                                print(f"Location {location_input} found but outside Gujarat coastal region.")
-                                # Return error information instead of defaulting to Kandla
-                                return {
-                                    "name": f"{location_input}",
-                                    "lat": lat,
-                                    "lon": lon,
-                                    "state": "Outside Gujarat",
-                                    "country": "India",
-                                    "timezone": "IST",
-                                    "port_type": "Outside Gujarat Region",
-                                    "coordinates": f"{lat},{lon}",
-                                    "source": "google_geocoding_api",
-                                    "error": "Location outside Gujarat coastal region"
-                                }
-            except Exception as e:
-                print(f"Error calling Google Geocoding API: {e}")
+                else:
+                    # If outside Gujarat, default to Kandla
+                    print(f"Coordinates {lat}, {lon} are outside Gujarat coastal region. Defaulting to Kandla.")
+                    return self.coastal_cities["kandla"]
+            except ValueError:
+                pass
+        
+        # Known coastal place names, including misspellings close to one
+        entry = self.gazetteer.lookup(location_input)
+        if entry is not None:
+            return self.gazetteer.to_location_info(entry)
+        
+        return None
+    
+    def search_locations(self, query: str, limit: int = 10) -> List[Dict]:
+        """Autocomplete coastal Gujarat place names from the offline gazetteer"""
+        return self.gazetteer.search(query, limit)
+    
+    def _cache_geocode_result(self, location_input: str, location_info: Dict, cacheable: bool):
+        """Store a geocoding result; 'not found' results are cached negatively"""
+        if cacheable:
+            self.geocode_cache.put(
+                location_input, location_info,
+                negative=location_info.get("source") == "api_search_failed"
+            )
+    
+    def _geocode_location(self, location_input: str) -> Tuple[Dict, bool]:
+        """
+        Resolve a free-text location via Nominatim, then Google Geocoding
+        Returns the location info and whether it may be cached (no provider errored)
+        """
+        lookup_failed = False
+        
+        # NEW: Dynamic location search via external APIs
+        print(f"Searching for location: {location_input}")
+        
+        # Try OpenStreetMap Nominatim API for location search
+        try:
+            url, params = self._nominatim_request(location_input)
+            response = self._call_provider("nominatim", url, params)
+            if response is not None and response.status_code == 200:
+                location_info = self._parse_nominatim(location_input, response.json())
+                if location_info is not None:
+                    return location_info, True
+            else:
+                lookup_failed = True
+        except Exception as e:
+            print(f"Error calling Nominatim API: {e}")
+            lookup_failed = True
+        
+        # Try Google Geocoding API as fallback (if API key available)
+        try:
+            google_request = self._google_geocode_request(location_input)
+            if google_request:
+                url, params = google_request
+                response = self._call_provider("google_geocoding", url, params)
+                if response is not None and response.status_code == 200:
+                    location_info = self._parse_google_geocode(location_input, response.json())
+                    if location_info is not None:
+                        return location_info, True
+                else:
+                    lookup_failed = True
+        except Exception as e:
+            print(f"Error calling Google Geocoding API: {e}")
+            lookup_failed = True
+        
+        # If no API results, return error
+        print(f"Location '{location_input}' not found via APIs.")
+        return self._location_not_found(location_input), not lookup_failed
+    
+    def _nominatim_request(self, location_input: str) -> Tuple[str, Dict]:
+        """OpenStreetMap Nominatim search request for a free-text location"""
+        search_query = f"{location_input}, Gujarat, India"
+        nominatim_url = "https://nominatim.openstreetmap.org/search"
+        params = {
+            "q": search_query,
+            "format": "json",
+            "limit": 1,
+            "addressdetails": 1
+        }
+        return nominatim_url, params
+    
+    def _parse_nominatim(self, location_input: str, data: List[Dict]) -> Optional[Dict]:
+        """Build location info from a Nominatim response, or None if nothing matched"""
+        if not data:
+            return None
+        
+        location = data[0]
+        lat = float(location["lat"])
+        lon = float(location["lon"])
+        
+        # Check if coordinates are within Gujarat coastal region
+        if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
+            # Determine port type based on location details
+            port_type = self._determine_port_type(location, location_input)
             
-            # If no API results, return error
-            print(f"Location '{location_input}' not found via APIs.")
             return {
-                "name": f"{location_input}",
-                "lat": None,
-                "lon": None,
-                "state": "Not Found",
-                "country": "Unknown",
-                "timezone": "Unknown",
-                "port_type": "Location Not Found",
-                "coordinates": "Unknown",
-                "source": "api_search_failed",
-                "error": "Location not found via geocoding APIs"
+                "name": f"{location_input}, Gujarat",
+                "lat": lat,
+                "lon": lon,
+                "state": "Gujarat",
+                "country": "India",
+                "timezone": "IST",
+                "port_type": port_type,
+                "coordinates": f"{lat},{lon}",
+                "source": "nominatim_api"
             }
+        
+        print(f"Location {location_input} found but outside Gujarat coastal region.")
+        # Return error information instead of defaulting to Kandla
+        return self._location_outside_region(location_input, lat, lon, "nominatim_api")
+    
+    def _google_geocode_request(self, location_input: str) -> Optional[Tuple[str, Dict]]:
+        """Google Geocoding request, or None when no API key is configured"""
+        google_key = os.getenv("GOOGLE_MAPS_API_KEY")
+        if not google_key:
+            return None
+        
+        search_query = f"{location_input}, Gujarat, India"
+        google_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        params = {
+            "address": search_query,
+            "key": google_key
+        }
+        return google_url, params
+    
+    def _parse_google_geocode(self, location_input: str, data: Dict) -> Optional[Dict]:
+        """Build location info from a Google Geocoding response, or None if nothing matched"""
+        if data["status"] != "OK" or not data["results"]:
+            return None
+        
+        location = data["results"][0]["geometry"]["location"]
+        lat = location["lat"]
+        lon = location["lng"]
+        
+        # Check if coordinates are within Gujarat coastal region
+        if 20.0 <= lat <= 24.5 and 69.0 <= lon <= 73.0:
+            port_type = self._determine_port_type_from_google(data["results"][0], location_input)
             
-        except Exception as e:
-            print(f"Error getting location info: {e}")
-            return self.coastal_cities["kandla"]
+            return {
+                "name": f"{location_input}, Gujarat",
+                "lat": lat,
+                "lon": lon,
+                "state": "Gujarat",
+                "country": "India",
+                "timezone": "IST",
+                "port_type": port_type,
+                "coordinates": f"{lat},{lon}",
+                "source": "google_geocoding_api"
+            }
+        
+        print(f"Location {location_input} found but outside Gujarat coastal region.")
+        # Return error information instead of defaulting to Kandla
+        return self._location_outside_region(location_input, lat, lon, "google_geocoding_api")
+    
+    def _location_outside_region(self, location_input: str, lat: float, lon: float, source: str) -> Dict:
+        """Location info for a place that was found but lies outside the Gujarat coast"""
+        return {
+            "name": f"{location_input}",
+            "lat": lat,
+            "lon": lon,
+            "state": "Outside Gujarat",
+            "country": "India",
+            "timezone": "IST",
+            "port_type": "Outside Gujarat Region",
+            "coordinates": f"{lat},{lon}",
+            "source": source,
+            "error": "Location outside Gujarat coastal region"
+        }
+    
+    def _location_not_found(self, location_input: str) -> Dict:
+        """Location info returned when no geocoder could resolve the input"""
+        return {
+            "name": f"{location_input}",
+            "lat": None,
+            "lon": None,
+            "state": "Not Found",
+            "country": "Unknown",
+            "timezone": "Unknown",
+            "port_type": "Location Not Found",
+            "coordinates": "Unknown",
+            "source": "api_search_failed",
+            "error": "Location not found via geocoding APIs"
+        }
     
     def _determine_port_type(self, nominatim_data: Dict, location_name: str) -> str:
         """Determine port type based on Nominatim data"""
@@ -274,191 +417,334 @@ class UnifiedDataService:
     
     def get_weather_data(self, location_input: str = "kandla") -> Dict:
         """Get realistic weather data based on location and time"""
+        location_info = self.get_location_info(location_input)
+        return self._cached_fetch("weather", location_info)
+    
+    def _fetch_weather(self, location_info: Dict) -> Dict:
+        """Fetch weather data for an already resolved location"""
         try:
-            location_info = self.get_location_info(location_input)
-            lat, lon = location_info["lat"], location_info["lon"]
-            
             # Try OpenWeather API first
-            api_key = os.getenv("OPENWEATHER_API_KEY")
-            if api_key:
-                url = f"http://api.openweathermap.org/data/2.5/weather"
-                params = {
-                    "lat": lat,
-                    "lon": lon,
-                    "appid": api_key,
-                    "units": "metric"
-                }
-                response = self.session.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "timestamp": datetime.utcnow(),
-                        "location": location_info["coordinates"],
-                        "city_name": location_info["name"],
-                        "country": location_info["country"],
-                        "timezone": location_info["timezone"],
-                        "temperature": data["main"]["temp"],
-                        "humidity": data["main"]["humidity"],
-                        "wind_speed": data["wind"]["speed"],
-                        "wind_direction": data["wind"]["deg"],
-                        "pressure": data["main"]["pressure"],
-                        "description": data["weather"][0]["description"],
-                        "source": "openweather_api"
-                    }
+            request = self._weather_request(location_info)
+            if request:
+                url, params = request
+                response = self._call_provider("openweather", url, params)
+                if response is not None and response.status_code == 200:
+                    return self._parse_weather(location_info, response.json())
             
             # Fallback to realistic simulation
-            return self._generate_realistic_weather(lat, lon, location_info)
+            return self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info)
             
         except Exception as e:
             print(f"Error getting weather data: {e}")
-            location_info = self.get_location_info(location_input)
             return self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info)
     
+    def _weather_request(self, location_info: Dict) -> Optional[Tuple[str, Dict]]:
+        """OpenWeather current-conditions request, or None when no API key is configured"""
+        api_key = os.getenv("OPENWEATHER_API_KEY")
+        if not api_key:
+            return None
+        
+        url = "http://api.openweathermap.org/data/2.5/weather"
+        params = {
+            "lat": location_info["lat"],
+            "lon": location_info["lon"],
+            "appid": api_key,
+            "units": "metric"
+        }
+        return url, params
+    
+    def _parse_weather(self, location_info: Dict, data: Dict) -> Dict:
+        """Build weather data from an OpenWeather response"""
+        return {
+            "timestamp": datetime.utcnow(),
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"],
+            "temperature": data["main"]["temp"],
+            "humidity": data["main"]["humidity"],
+            "wind_speed": data["wind"]["speed"],
+            "wind_direction": data["wind"]["deg"],
+            "pressure": data["main"]["pressure"],
+            "description": data["weather"][0]["description"],
+            "source": "openweather_api"
+        }
+    
     def get_tide_data(self, location_input: str = "kandla") -> Dict:
         """Get realistic tide data based on location and time"""
+        location_info = self.get_location_info(location_input)
+        return self._cached_fetch("tide", location_info)
+    
+    def _fetch_tide(self, location_info: Dict) -> Dict:
+        """Fetch tide data for an already resolved location"""
         try:
-            location_info = self.get_location_info(location_input)
-            lat, lon = location_info["lat"], location_info["lon"]
-            
-            # Try NOAA API for tide data
-            noaa_key = os.getenv("NOAA_API_KEY")
-            if noaa_key:
-                # Find nearest NOAA station
-                station_id = self._find_nearest_noaa_station(lat, lon)
-                if station_id:
-                    url = f"https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-                    params = {
-                        "station": station_id,
-                        "product": "predictions",
-                        "datum": "MLLW",
-                        "time_zone": "lst_ldt",
-                        "interval": "h",
-                        "format": "json",
-                        "range": "24",
-                        "units": "metric"
-                    }
-                    
-                    response = self.session.get(url, params=params, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "predictions" in data and data["predictions"]:
-                            latest = data["predictions"][-1]
-                            return {
-                                "timestamp": datetime.utcnow(),
-                                "location": location_info["coordinates"],
-                                "city_name": location_info["name"],
-                                "country": location_info["country"],
-                                "timezone": location_info["timezone"],
-                                "tide_height": float(latest["v"]),
-                                "tide_type": "high" if "H" in latest["type"] else "low",
-                                "source": "noaa_api"
-                            }
+            # Interpolate from the nearest NOAA station's cached prediction series
+            station_id = self._tide_station(location_info)
+            if station_id:
+                series = self.tide_series.get(station_id)
+                if series is None:
+                    url, params = self._tide_request(station_id)
+                    response = self._call_provider("noaa", url, params)
+                    if response is not None and response.status_code == 200:
+                        series = self.tide_series.store_noaa(station_id, response.json())
+                if series is not None:
+                    return self._tide_from_series(location_info, series)
             
             # Fallback to realistic simulation
             return self._generate_realistic_tide(location_info)
             
         except Exception as e:
             print(f"Error getting tide data: {e}")
-            location_info = self.get_location_info(location_input)
             return self._generate_realistic_tide(location_info)
     
+    def _tide_station(self, location_info: Dict) -> Optional[str]:
+        """Nearest NOAA station for a location, or None without an API key or nearby station"""
+        if not os.getenv("NOAA_API_KEY"):
+            return None
+        return self._find_nearest_noaa_station(location_info["lat"], location_info["lon"])
+    
+    def _tide_request(self, station_id: str) -> Tuple[str, Dict]:
+        """NOAA predictions request for a station's whole cached window (times in GMT)"""
+        url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+        params = {
+            "station": station_id,
+            "product": "predictions",
+            "datum": "MLLW",
+            "time_zone": "gmt",
+            "interval": "h",
+            "format": "json",
+            "units": "metric",
+            **self.tide_series.request_window()
+        }
+        return url, params
+    
+    def _tide_from_series(self, location_info: Dict, series) -> Dict:
+        """Tide data for the current time interpolated from a station's prediction series"""
+        now = datetime.utcnow()
+        return {
+            "timestamp": now,
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"],
+            **series.state_at(now),
+            "station_id": series.station_id,
+            "source": "noaa_api"
+        }
+    
     def get_ocean_data(self, location_input: str = "kandla") -> Dict:
         """Get realistic ocean data based on location and time"""
+        location_info = self.get_location_info(location_input)
+        return self._cached_fetch("ocean", location_info)
+    
+    def _fetch_ocean(self, location_info: Dict) -> Dict:
+        """Fetch ocean data for an already resolved location"""
         try:
-            location_info = self.get_location_info(location_input)
             lat, lon = location_info["lat"], location_info["lon"]
             
             return self._generate_realistic_ocean(lat, lon, location_info)
             
         except Exception as e:
             print(f"Error getting ocean data: {e}")
-            location_info = self.get_location_info(location_input)
             return self._generate_realistic_ocean(location_info["lat"], location_info["lon"], location_info)
     
     def get_pollution_data(self, location_input: str = "kandla") -> Dict:
         """Get realistic pollution data based on location and time"""
+        location_info = self.get_location_info(location_input)
+        return self._cached_fetch("pollution", location_info)
+    
+    def _fetch_pollution(self, location_info: Dict) -> Dict:
+        """Fetch pollution data for an already resolved location"""
         try:
-            location_info = self.get_location_info(location_input)
-            lat, lon = location_info["lat"], location_info["lon"]
-            
             # Try WAQI API for air quality data
-            api_key = os.getenv("WAQI_API_KEY")
-            if api_key:
-                url = f"https://api.waqi.info/feed/geo:{lat};{lon}/?token={api_key}"
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data["status"] == "ok":
-                        aqi = data["data"]["aqi"]
-                        return {
-                            "timestamp": datetime.utcnow(),
-                            "location": location_info["coordinates"],
-                            "city_name": location_info["name"],
-                            "country": location_info["country"],
-                            "timezone": location_info["timezone"],
-                            "water_quality": "good" if aqi < 50 else "moderate" if aqi < 100 else "poor",
-                            "pollution_level": "low" if aqi < 50 else "moderate" if aqi < 100 else "high",
-                            "alerts": [],
-                            "monitoring_data": {
-                                "turbidity": 10.0 + random.uniform(-3, 3),
-                                "dissolved_oxygen": 7.0 + random.uniform(-0.5, 0.5),
-                                "ph": 7.0 + random.uniform(-0.3, 0.3),
-                                "bacteria_count": 100 + random.randint(-30, 50)
-                            },
-                            "illegal_dumping_detected": random.choice([True, False]),
-                            "suspicious_activity": [],
-                            "source": "waqi_api"
-                        }
+            request = self._pollution_request(location_info)
+            if request:
+                url, params = request
+                response = self._call_provider("waqi", url, params)
+                if response is not None and response.status_code == 200:
+                    pollution_data = self._parse_pollution(location_info, response.json())
+                    if pollution_data is not None:
+                        return pollution_data
             
             # Fallback to realistic simulation
             return self._generate_realistic_pollution(location_info)
             
         except Exception as e:
             print(f"Error getting pollution data: {e}")
-            location_info = self.get_location_info(location_input)
             return self._generate_realistic_pollution(location_info)
     
+    def _pollution_request(self, location_info: Dict) -> Optional[Tuple[str, Dict]]:
+        """WAQI geo feed request, or None when no API key is configured"""
+        api_key = os.getenv("WAQI_API_KEY")
+        if not api_key:
+            return None
+        
+        url = f"https://api.waqi.info/feed/geo:{location_info['lat']};{location_info['lon']}/"
+        return url, {"token": api_key}
+    
+    def _parse_pollution(self, location_info: Dict, data: Dict) -> Optional[Dict]:
+        """Build pollution data from a WAQI response, or None if the feed reported an error"""
+        if data["status"] != "ok":
+            return None
+        
+        aqi = data["data"]["aqi"]
+        return {
+            "timestamp": datetime.utcnow(),
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"],
+            "water_quality": "good" if aqi < 50 else "moderate" if aqi < 100 else "poor",
+            "pollution_level": "low" if aqi < 50 else "moderate" if aqi < 100 else "high",
+            "alerts": [],
+            "monitoring_data": {
+                "turbidity": 10.0 + random.uniform(-3, 3),
+                "dissolved_oxygen": 7.0 + random.uniform(-0.5, 0.5),
+                "ph": 7.0 + random.uniform(-0.3, 0.3),
+                "bacteria_count": 100 + random.randint(-30, 50)
+            },
+            "illegal_dumping_detected": random.choice([True, False]),
+            "suspicious_activity": [],
+            "source": "waqi_api"
+        }
+    
     def get_comprehensive_data(self, location_input: str = "kandla") -> Dict:
         """Get comprehensive coastal data for any location"""
+        location_info = self.get_location_info(location_input)
         try:
-            location_info = self.get_location_info(location_input)
-            
-            # Get data from all sources
-            weather_data = self.get_weather_data(location_input)
-            tide_data = self.get_tide_data(location_input)
-            ocean_data = self.get_ocean_data(location_input)
-            pollution_data = self.get_pollution_data(location_input)
-            
-            return {
-                "timestamp": datetime.utcnow(),
-                "location": location_info["coordinates"],
-                "city_name": location_info["name"],
-                "country": location_info["country"],
-                "timezone": location_info["timezone"],
-                "weather": weather_data,
-                "tide": tide_data,
-                "ocean": ocean_data,
-                "pollution": pollution_data,
-                "source": "unified_data_service"
-            }
+            # Get data from all sources concurrently, bounded by one shared deadline
+            source_data = self._fetch_all_sources(location_info)
+            return self._assemble_comprehensive_data(location_info, source_data)
             
         except Exception as e:
             print(f"Error getting comprehensive data: {e}")
-            location_info = self.get_location_info(location_input)
             
             # Return realistic fallback data
-            return {
-                "timestamp": datetime.utcnow(),
-                "location": location_info["coordinates"],
-                "city_name": location_info["name"],
-                "country": location_info["country"],
-                "timezone": location_info["timezone"],
-                "weather": self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info),
-                "tide": self._generate_realistic_tide(location_info),
-                "ocean": self._generate_realistic_ocean(location_info["lat"], location_info["lon"], location_info),
-                "pollution": self._generate_realistic_pollution(location_info),
-                "source": "realistic_simulation"
-            }
+            return self._simulated_comprehensive_data(location_info)
+    
+    def _assemble_comprehensive_data(self, location_info: Dict, source_data: Dict) -> Dict:
+        """Combine per-source results into the comprehensive data payload"""
+        return {
+            "timestamp": datetime.utcnow(),
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"],
+            "weather": source_data["weather"],
+            "tide": source_data["tide"],
+            "ocean": source_data["ocean"],
+            "pollution": source_data["pollution"],
+            "source": "unified_data_service"
+        }
+    
+    def _simulated_comprehensive_data(self, location_info: Dict) -> Dict:
+        """Comprehensive payload built entirely from realistic simulation"""
+        return {
+            "timestamp": datetime.utcnow(),
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"],
+            "weather": self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info),
+            "tide": self._generate_realistic_tide(location_info),
+            "ocean": self._generate_realistic_ocean(location_info["lat"], location_info["lon"], location_info),
+            "pollution": self._generate_realistic_pollution(location_info),
+            "source": "realistic_simulation"
+        }
+    
+    def _fetch_all_sources(self, location_info: Dict) -> Dict:
+        """
+        Fan the provider fetches out over the worker pool
+        Latency tracks the slowest provider; any source still running at the deadline
+        is replaced by its realistic simulation
+        """
+        futures = {
+            source: self.fetch_executor.submit(self._cached_fetch, source, location_info)
+            for source in self._source_fetchers()
+        }
+        
+        done, _ = wait(futures.values(), timeout=self.fetch_deadline)
+        
+        results = {}
+        for source, future in futures.items():
+            if future in done and future.exception() is None:
+                results[source] = future.result()
+            else:
+                if future not in done:
+                    future.cancel()
+                    print(f"⏱️ {source} data missed the {self.fetch_deadline}s deadline, using simulation")
+                else:
+                    print(f"Error getting {source} data: {future.exception()}")
+                results[source] = self._simulate_source(source, location_info)
+        
+        return results
+    
+    def _source_fetchers(self) -> Dict:
+        """Uncached fetch function for each data source"""
+        return {
+            "weather": self._fetch_weather,
+            "tide": self._fetch_tide,
+            "ocean": self._fetch_ocean,
+            "pollution": self._fetch_pollution
+        }
+    
+    def _cached_fetch(self, source: str, location_info: Dict) -> Dict:
+        """
+        Serve a source from the provider cache
+        Fresh entries are returned directly; stale entries are returned immediately while
+        one background refresh runs; misses are fetched inline and cached
+        """
+        cached, state = self.provider_cache.lookup(source, location_info)
+        if state == "fresh":
+            return self._with_location(cached, location_info)
+        
+        if state == "stale":
+            if self.provider_cache.begin_refresh(source, location_info):
+                self.fetch_executor.submit(self._refresh_source, source, location_info)
+            return self._with_location(cached, location_info)
+        
+        data = self._source_fetchers()[source](location_info)
+        self.provider_cache.store(source, location_info, data)
+        return data
+    
+    def _refresh_source(self, source: str, location_info: Dict):
+        """Background refresh of a stale cache entry"""
+        try:
+            data = self._source_fetchers()[source](location_info)
+            self.provider_cache.store(source, location_info, data)
+        except Exception as e:
+            print(f"Error refreshing {source} data: {e}")
+        finally:
+            self.provider_cache.end_refresh(source, location_info)
+    
+    def _with_location(self, data: Dict, location_info: Dict) -> Dict:
+        """Label cached data with the requested location (entries are shared by nearby names)"""
+        data.update({
+            "location": location_info["coordinates"],
+            "city_name": location_info["name"],
+            "country": location_info["country"],
+            "timezone": location_info["timezone"]
+        })
+        return data
+    
+    def get_cache_stats(self) -> Dict:
+        """Get hit/miss counters for the provider, geocoding and tide series caches"""
+        return {
+            "provider_cache": self.provider_cache.get_stats(),
+            "geocode_cache": self.geocode_cache.get_stats(),
+            "tide_series_cache": self.tide_series.get_stats()
+        }
+    
+    def _simulate_source(self, source: str, location_info: Dict) -> Dict:
+        """Realistic simulation fallback for a single data source"""
+        if source == "weather":
+            return self._generate_realistic_weather(location_info["lat"], location_info["lon"], location_info)
+        elif source == "tide":
+            return self._generate_realistic_tide(location_info)
+        elif source == "ocean":
+            return self._generate_realistic_ocean(location_info["lat"], location_info["lon"], location_info)
+        else:
+            return self._generate_realistic_pollution(location_info)
     
     def get_available_locations(self) -> List[Dict]:
         """Get list of available coastal locations - Dynamic with API fallback"""
@@ -475,24 +761,15 @@ class UnifiedDataService:
         return locations
     
     def _find_nearest_noaa_station(self, lat: float, lon: float) -> Optional[str]:
-        """Find the nearest NOAA tide station to given coordinates"""
-        stations = {
-            "9447130": {"name": "Seattle", "lat": 47.6026, "lon": -122.3393},
-            "9410230": {"name": "San Diego", "lat": 32.7157, "lon": -117.1611},
-            "9413450": {"name": "Monterey", "lat": 36.6050, "lon": -121.8880},
-            "9414290": {"name": "San Francisco", "lat": 37.8063, "lon": -122.4659}
-        }
-        
-        nearest_station = None
-        min_distance = float('inf')
-        
-        for station_id, station_info in stations.items():
-            distance = math.sqrt((lat - station_info["lat"])**2 + (lon - station_info["lon"])**2)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_station = station_id
-        
-        return nearest_station
+        """Find the nearest NOAA tide station within tide_station_max_km of the given coordinates"""
+        nearest = self.station_catalog.nearest(lat, lon, provider="noaa", max_km=self.tide_station_max_km)
+        return nearest[0]["station_id"] if nearest else None
+    
+    def get_nearest_tide_stations(self, lat: float, lon: float, radius_km: Optional[float] = None,
+                                  limit: int = 10) -> List[Dict]:
+        """Tide gauges of any provider around a location, closest first"""
+        radius_km = radius_km or self.tide_station_max_km
+        return self.station_catalog.within_radius(lat, lon, radius_km)[:limit]
     
     def _generate_realistic_weather(self, lat: float, lon: float, location_info: Dict) -> Dict:
         """Generate realistic weather data based on location and current conditions"""
@@ -534,9 +811,50 @@ class UnifiedDataService:
             "source": "realistic_simulation"
         }
     
+    def nearest_harmonic_station(self, location_info: Dict) -> Optional[str]:
+        """Nearest tide gauge with harmonic constituents within tide_station_max_km"""
+        if location_info.get("lat") is None:
+            return None
+        nearby = self.station_catalog.nearest(
+            location_info["lat"], location_info["lon"], k=10, max_km=self.tide_station_max_km
+        )
+        for station in nearby:
+            if self.tide_engine.has_station(station["station_id"]):
+                return station["station_id"]
+        return None
+    
+    def _harmonic_series(self, station_id: str):
+        """Harmonic prediction series for a gauge, cached like downloaded series"""
+        key = f"harmonic:{station_id}"
+        series = self.tide_series.get(key)
+        if series is None:
+            start = datetime.utcnow() - timedelta(hours=self.tide_series.lookback_hours)
+            times, heights = self.tide_engine.predict_range(
+                start, self.tide_series.window_hours, step_minutes=10, station_ids=[station_id]
+            )
+            series = self.tide_series.store(key, times, heights[0])
+        return series
+    
     def _generate_realistic_tide(self, location_info: Dict) -> Dict:
         """Generate realistic tide data based on lunar cycles"""
         now = datetime.utcnow()
+        
+        # Harmonic prediction from the nearest gauge with known constituents
+        station_id = self.nearest_harmonic_station(location_info)
+        if station_id:
+            series = self._harmonic_series(station_id)
+            return {
+                "timestamp": now,
+                "location": location_info["coordinates"],
+                "city_name": location_info["name"],
+                "country": location_info["country"],
+                "timezone": location_info["timezone"],
+                **series.state_at(now),
+                "station_id": station_id,
+                "source": "harmonic_prediction"
+            }
+        
+        # No gauge nearby: rough daily cycle
         hour = now.hour
         
         # Enhanced tide simulation with high/low tides
@@ -0,0 +1,77 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from services.compiled_forest import CompiledForest
+from services.flood_training import FEATURE_COLUMNS, TARGET_COLUMN
+
+@pytest.fixture(scope="module")
+def flood_data():
+    """Features and target of the shipped flood CSV"""
+    df = pd.read_csv(os.path.join(BACKEND_DIR, "flood_data_1000.csv"))
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float64), df[TARGET_COLUMN].to_numpy(dtype=bool)
+
+@pytest.fixture(scope="module")
+def fitted(flood_data):
+    """Production configuration; n_jobs=1 so sklearn sums the trees in estimator order"""
+    X, y = flood_data
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, n_jobs=1)
+    model.fit(scaler.transform(X), y)
+    return model, scaler
+
+def _probe_rows(X: np.ndarray) -> np.ndarray:
+    """The data itself plus rows well outside it (every branch direction and extreme values)"""
+    rng = np.random.default_rng(0)
+    wide = X.mean(axis=0) + X.std(axis=0) * rng.normal(0.0, 3.0, size=(2000, X.shape[1]))
+    return np.vstack([X, wide])
+
+def test_predict_positive_matches_sklearn(flood_data, fitted):
+    model, scaler = fitted
+    X = _probe_rows(flood_data[0])
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    
+    expected = model.predict_proba(scaler.transform(X))
+    assert np.array_equal(compiled.predict_positive(X), expected[:, 1])
+    assert np.array_equal(compiled.predict_proba(X), expected)
+
+def test_single_rows_match_sklearn(flood_data, fitted):
+    model, scaler = fitted
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    for row in flood_data[0][:50]:
+        row = row[np.newaxis, :]
+        assert np.array_equal(compiled.predict_positive(row), model.predict_proba(scaler.transform(row))[:, 1])
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_reload_matches_sklearn(tmp_path, flood_data, fitted, mmap_mode):
+    model, scaler = fitted
+    X = _probe_rows(flood_data[0])
+    CompiledForest.from_sklearn(model, scaler).save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path), mmap_mode=mmap_mode)
+    
+    assert np.array_equal(loaded.predict_positive(X), model.predict_proba(scaler.transform(X))[:, 1])
+
+def test_verify_reports_identical(fitted):
+    model, scaler = fitted
+    check = CompiledForest.from_sklearn(model, scaler).verify(model, scaler)
+    assert check["identical"]
+    assert check["max_abs_diff"] == 0.0
+
+def test_small_forest_with_shallow_and_pure_trees():
+    # Trees of very different depths (including single-leaf trees) share the padded arrays
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 6)) * [3.0, 10.0, 20.0, 8.0, 1.0, 1.0] + [28, 75, 20, 1005, 2.5, 1.5]
+    y = X[:, 4] + 0.1 * rng.normal(size=300) > 2.5
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=15, max_depth=3, min_samples_leaf=40, random_state=0, n_jobs=1)
+    model.fit(scaler.transform(X), y)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    
+    assert np.array_equal(compiled.predict_positive(X), model.predict_proba(scaler.transform(X))[:, 1])